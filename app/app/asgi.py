@@ -2,6 +2,8 @@
 ASGI config for app project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Besides the Django views, it serves the Server-Sent Events streams of bugs
+and projects, which need a long lived connection per client.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/3.1/howto/deployment/asgi/
@@ -13,4 +15,10 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'app.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# Imported once Django is set up, as they load the models
+from bugs.events import event_routes  # noqa: E402
+from core.events import EventStreamRouter  # noqa: E402
+
+application = EventStreamRouter(django_application, event_routes)
@@ -1,4 +1,5 @@
 import os
+import tempfile
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -22,6 +23,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'widget_tweaks',
 
     'core',
@@ -31,6 +33,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.PerformanceMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -64,16 +67,116 @@ WSGI_APPLICATION = 'app.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/3.1/ref/settings/#databases
 
+# Connections are kept open for DATABASE_CONN_MAX_AGE seconds and checked
+# before their first use in each request. Set DATABASE_POOL_SIZE to share a
+# pool of at most that many connections between the threads of each worker
+# instead, waiting up to DATABASE_POOL_TIMEOUT seconds for a free one.
+
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql',
+        'ENGINE': 'core.postgresql',
         'NAME': os.environ['DATABASE_DB'],
         'USER': os.environ['DATABASE_USER'],
         'PASSWORD': os.environ['DATABASE_PASSWORD'],
-        'HOST': os.environ['DATABASE_HOST']
+        'HOST': os.environ['DATABASE_HOST'],
+        'CONN_MAX_AGE': int(os.environ.get('DATABASE_CONN_MAX_AGE', 60)),
+        'CONN_HEALTH_CHECKS': bool(
+            int(os.environ.get('DATABASE_HEALTH_CHECKS', 1))
+        ),
     }
 }
 
+if int(os.environ.get('DATABASE_POOL_SIZE', 0)):
+    # Connections go back to the pool at the end of each request
+    DATABASES['default']['CONN_MAX_AGE'] = 0
+    DATABASES['default']['POOL'] = {
+        'MAX_SIZE': int(os.environ['DATABASE_POOL_SIZE']),
+        'TIMEOUT': float(os.environ.get('DATABASE_POOL_TIMEOUT', 10)),
+        'MAX_LIFETIME': float(
+            os.environ.get('DATABASE_POOL_MAX_LIFETIME', 1800)
+        ),
+    }
+
+
+# Cache
+# https://docs.djangoproject.com/en/3.1/topics/cache/
+# Use a cache shared by all workers in production (e.g. database or
+# memcached), otherwise role maps are invalidated only in the worker that
+# made the change. The system checks fail when more than one gunicorn
+# worker (GUNICORN_WORKERS, see gunicorn.conf.py) would use a local cache.
+
+GUNICORN_WORKERS = int(os.environ.get('GUNICORN_WORKERS', 1))
+
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get(
+            'CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.environ.get('CACHE_LOCATION', ''),
+    },
+    # Rendered template fragments. Their keys hold the versions of the
+    # objects shown, kept in the shared default cache, so this one can also
+    # be local to each worker.
+    'fragments': {
+        'BACKEND': os.environ.get(
+            'FRAGMENT_CACHE_BACKEND',
+            'django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.environ.get('FRAGMENT_CACHE_LOCATION', 'fragments'),
+        'TIMEOUT': None,
+    },
+}
+
+if CACHES['fragments']['BACKEND'].endswith('LocMemCache'):
+    CACHES['fragments']['OPTIONS'] = {'MAX_ENTRIES': 10000}
+
+# The fragment versions are bumped by whichever worker or command changes
+# an object, so fragments are only cached when the default cache is shared.
+FRAGMENT_CACHE_ENABLED = not CACHES['default']['BACKEND'].endswith(
+    'LocMemCache'
+)
+
+
+# Sessions
+# https://docs.djangoproject.com/en/3.1/topics/http/sessions/
+# SESSION_STORE selects where sessions are kept: db (one query per request),
+# cache (no query, lost when evicted), cached_db (read from the cache,
+# written through to the database) or signed_cookies (kept by the browser).
+# The cache stores need a cache shared by all workers, set with
+# SESSION_CACHE_BACKEND and SESSION_CACHE_LOCATION (the default cache ones
+# otherwise). Expired database sessions are removed by sweep_sessions.
+
+SESSION_ENGINES = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cache': 'django.contrib.sessions.backends.cache',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+}
+
+SESSION_ENGINE = SESSION_ENGINES[os.environ.get('SESSION_STORE', 'db')]
+
+SESSION_CACHE_ALIAS = 'sessions'
+
+CACHES['sessions'] = {
+    'BACKEND': os.environ.get(
+        'SESSION_CACHE_BACKEND', CACHES['default']['BACKEND']
+    ),
+    'LOCATION': os.environ.get(
+        'SESSION_CACHE_LOCATION', CACHES['default']['LOCATION'] or 'sessions'
+    ),
+}
+
+
+# Performance
+# Request timings are added to histograms kept in a file mapped in memory,
+# shared by the workers of the server and reported on /admin/performance/.
+
+PERFORMANCE_STATS_PATH = os.environ.get(
+    'PERFORMANCE_STATS_PATH',
+    '/dev/shm/bugtracker-performance' if os.path.isdir('/dev/shm')
+    else os.path.join(tempfile.gettempdir(), 'bugtracker-performance')
+)
+
 
 # Password validation
 # https://docs.djangoproject.com/en/3.1/ref/settings/#auth-password-validators
@@ -115,6 +218,14 @@ STATIC_URL = '/static/'
 # STATIC_ROOT = os.path.join(BASE_DIR, "staticfiles")
 STATIC_ROOT = "/files/staticfiles"
 
+# The production image fingerprints and precompresses the collected files
+# (core.storage.CompressedManifestStaticFilesStorage), which needs
+# collectstatic to have run, so the default storage is kept elsewhere.
+STATICFILES_STORAGE = os.environ.get(
+    'STATICFILES_STORAGE',
+    'django.contrib.staticfiles.storage.StaticFilesStorage'
+)
+
 AUTH_USER_MODEL = 'members.Member'
 
 LOGIN_REDIRECT_URL = 'member-profile'
@@ -1,8 +1,46 @@
 from django.contrib import admin
 from django.urls import path, include
 
+from bugs import api as bugs_api
+from core.views import PerformanceReportView
+from members import api as members_api
+from projects import api as projects_api
+
+api_urlpatterns = [
+    path('bugs/', bugs_api.BugListApiView.as_view(), name='bug-list'),
+    path(
+        'bugs/<int:pk>', bugs_api.BugDetailApiView.as_view(),
+        name='bug-detail'
+    ),
+    path(
+        'bugs/<int:pk>/messages', bugs_api.MessageListApiView.as_view(),
+        name='bug-messages'
+    ),
+    path(
+        'projects/', projects_api.ProjectListApiView.as_view(),
+        name='project-list'
+    ),
+    path(
+        'projects/<int:pk>', projects_api.ProjectDetailApiView.as_view(),
+        name='project-detail'
+    ),
+    path(
+        'members/', members_api.MemberListApiView.as_view(),
+        name='member-list'
+    ),
+    path(
+        'members/<int:pk>', members_api.MemberDetailApiView.as_view(),
+        name='member-detail'
+    ),
+]
+
 urlpatterns = [
+    path(
+        'admin/performance/', PerformanceReportView.as_view(),
+        name='performance-report'
+    ),
     path('admin/', admin.site.urls),
+    path('api/', include((api_urlpatterns, 'api'))),
     path('', include('core.urls')),
     path('members/', include('members.urls')),
     path('projects/', include('projects.urls')),
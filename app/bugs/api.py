@@ -0,0 +1,85 @@
+from core.api import \
+    ApiDetailView, ApiError, ApiListView, Column, Nested, RelatedIds
+from projects.roles import get_role_map
+from .models import Bug, Message
+
+
+BUG_FIELDS = {
+    'id': Column('id'),
+    'title': Column('title'),
+    'description': Column('description'),
+    'status': Column('_status'),
+    'creationDate': Column('creationDate'),
+    'closingDate': Column('closingDate'),
+    'project': Nested(id='project_id', title='project__title'),
+    'creator': Nested(id='creator_id', name='creator__name'),
+    'assigned_members': RelatedIds('assigned_members'),
+}
+
+MESSAGE_FIELDS = {
+    'id': Column('id'),
+    'bug': Column('bug_id'),
+    'writer': Nested(id='writer_id', name='writer__name'),
+    'content': Column('content'),
+    'creationDate': Column('creationDate'),
+}
+
+
+def visible_bugs(user):
+    """Return the bugs of the projects the user is part of"""
+    queryset = Bug.objects.all()
+    if not user.is_superuser:
+        member_of = get_role_map(user).member_of
+        queryset = queryset.filter(project_id__in=list(member_of))
+
+    return queryset
+
+
+class BugApiMixin:
+    """Bugs visible to the user, the ones of its projects"""
+    model = Bug
+    fields = BUG_FIELDS
+
+    def get_queryset(self):
+        return visible_bugs(self.request.user)
+
+
+class BugListApiView(BugApiMixin, ApiListView):
+    """List the visible bugs, filtered by the 'project' and 'status' ones"""
+    ordering = ('-creationDate', 'id')
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+
+        project = self.request.GET.get('project')
+        if project:
+            try:
+                queryset = queryset.filter(project_id=int(project))
+            except ValueError:
+                raise ApiError('Invalid project id')
+
+        status = self.request.GET.getlist('status')
+        if set(status) - set(self.model.POSSIBLE_STATUS):
+            raise ApiError('Invalid status')
+        if status:
+            queryset = queryset.filter(_status__in=status)
+
+        return queryset
+
+
+class BugDetailApiView(BugApiMixin, ApiDetailView):
+    """Return a visible bug"""
+
+
+class MessageListApiView(ApiListView):
+    """List the messages of the board of a visible bug, newest first"""
+    model = Message
+    fields = MESSAGE_FIELDS
+    ordering = ('-creationDate', 'id')
+
+    def get_queryset(self):
+        bug_id = self.kwargs['pk']
+        if not visible_bugs(self.request.user).filter(pk=bug_id).exists():
+            raise ApiError('Not found', 404)
+
+        return self.model.objects.filter(bug_id=bug_id)
@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class BugsConfig(AppConfig):
     name = 'bugs'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,95 @@
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db.models import Count, DurationField, F, Q, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from projects.models import Project
+
+
+TOTAL_COUNTER = 'bug_count'
+STATUS_COUNTERS = {
+    'WAITING': 'waiting_bug_count',
+    'BEING WORKED': 'working_bug_count',
+    'FIXED': 'fixed_bug_count',
+    'CLOSED': 'closed_bug_count',
+}
+# Times spent waiting and being worked on by the fixed bugs, summed from
+# the bug fields so the mean time to fix is read from the project alone
+FIXED_STATUS = 'FIXED'
+FIX_TIME_SUMS = {
+    'fixed_waiting_time': 'waiting_time',
+    'fixed_working_time': 'working_time',
+}
+COUNTERS = [TOTAL_COUNTER] + list(STATUS_COUNTERS.values()) + \
+    list(FIX_TIME_SUMS)
+
+
+def empty_counters():
+    """Return the counter values of a project without bugs"""
+    return {
+        counter: timedelta() if counter in FIX_TIME_SUMS else 0
+        for counter in COUNTERS
+    }
+
+
+def counters_of(status):
+    """Return the project counters a bug with the given status counts in"""
+    if status in STATUS_COUNTERS:
+        return [TOTAL_COUNTER, STATUS_COUNTERS[status]]
+    return [TOTAL_COUNTER]
+
+
+def update_counters(removed=None, added=None, bug=None):
+    """Move a bug between project counters with atomic F() updates
+
+    Both removed and added are (project_id, status) pairs, or None when the
+    bug is being created or deleted. The times of the bug are moved along
+    when either status is the fixed one, they do not change while fixed.
+    """
+    deltas = defaultdict(dict)
+    for counted_as, sign in ((removed, -1), (added, 1)):
+        if counted_as is None:
+            continue
+
+        project_id, status = counted_as
+        counters = deltas[project_id]
+        for counter in counters_of(status):
+            counters[counter] = counters.get(counter, 0) + sign
+        if status == FIXED_STATUS and bug is not None:
+            for counter, field in FIX_TIME_SUMS.items():
+                counters[counter] = counters.get(counter, timedelta()) + \
+                    sign * getattr(bug, field)
+
+    for project_id, counters in deltas.items():
+        changes = {
+            counter: F(counter) + delta
+            for counter, delta in counters.items() if delta
+        }
+        if changes:
+            # The counters are shown on the project page
+            Project.objects.filter(pk=project_id) \
+                .update(modified_at=timezone.now(), **changes)
+
+
+def count_bugs(queryset):
+    """Return the actual counter values of each project, keyed by its id"""
+    aggregates = {TOTAL_COUNTER: Count('id')}
+    aggregates.update({
+        counter: Count('id', filter=Q(_status=status))
+        for status, counter in STATUS_COUNTERS.items()
+    })
+    aggregates.update({
+        counter: Coalesce(
+            Sum(field, filter=Q(_status=FIXED_STATUS)),
+            Value(timedelta(), output_field=DurationField())
+        )
+        for counter, field in FIX_TIME_SUMS.items()
+    })
+
+    return {
+        row.pop('project_id'): row
+        for row in queryset.values('project_id').annotate(**aggregates)
+        .order_by()
+    }
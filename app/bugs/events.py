@@ -0,0 +1,61 @@
+import time
+
+from core.events import publish
+from projects.models import Project
+from projects.roles import get_role_map
+from .models import Bug
+
+
+def bug_stream(bug_id):
+    return 'bug:%s' % bug_id
+
+
+def project_stream(project_id):
+    return 'project:%s' % project_id
+
+
+def publish_bug_event(bug, event_type, **data):
+    """Notify an event of the bug to the bug and project streams"""
+    event = {
+        'type': event_type,
+        'bug': bug.id,
+        'project': bug.project_id,
+        'sent': time.time(),
+        **data,
+    }
+
+    publish([bug_stream(bug.id), project_stream(bug.project_id)], event)
+
+
+def authorize_bug_stream(user, bug_id):
+    """Return the stream of the bug if the user can see it"""
+    bug_id = int(bug_id)
+    project_id = Bug.objects.filter(id=bug_id) \
+        .values_list('project_id', flat=True).first()
+    if project_id is None or not _can_see_project(user, project_id):
+        return None
+
+    return bug_stream(bug_id)
+
+
+def authorize_project_stream(user, project_id):
+    """Return the stream of the project if the user can see it"""
+    project_id = int(project_id)
+    if not Project.objects.filter(id=project_id).exists() or \
+            not _can_see_project(user, project_id):
+        return None
+
+    return project_stream(project_id)
+
+
+def _can_see_project(user, project_id):
+    """Return whether the user can see the project, like IsInProjectMixin"""
+    return user.is_authenticated and (
+        user.is_superuser or project_id in get_role_map(user).member_of
+    )
+
+
+event_routes = [
+    (r'^/events/bugs/(\d+)$', authorize_bug_stream),
+    (r'^/events/projects/(\d+)$', authorize_project_stream),
+]
@@ -1,6 +1,7 @@
 from django import forms
 
 from .models import Bug
+from members.widgets import MemberSearchSelect
 
 
 class BugCreateForm(forms.ModelForm):
@@ -23,6 +24,9 @@ class BugUpdateForm(forms.ModelForm):
     def __init__(self, queryset, *args, **kwargs):
         super(BugUpdateForm, self).__init__(*args, **kwargs)
         self.fields['assigned_members'].queryset = queryset
+        self.fields['assigned_members'].widget.project_id = \
+            self.instance.project_id
+        self.fields['assigned_members'].widget.scope = 'members'
 
     class Meta:
         model = Bug
@@ -33,6 +37,7 @@ class BugUpdateForm(forms.ModelForm):
             'creator',
             'project',
         ]
+        widgets = {'assigned_members': MemberSearchSelect}
 
 
 class BugCreatorUpdateForm(forms.ModelForm):
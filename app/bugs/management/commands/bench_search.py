@@ -0,0 +1,150 @@
+import itertools
+import random
+import statistics
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from bugs.models import Bug
+from bugs.search import search_bugs, update_search_vectors
+from core.pagination import KeysetPaginator
+from projects.models import Project
+
+
+SYLLABLES = (
+    'ba be bi bo bu da de di do du fa fe fi fo ka ke ki ko la le li lo lu '
+    'ma me mi mo na ne ni no pa pe pi po ra re ri ro sa se si so ta te ti '
+    'to va ve vi vo za ze zi zo'
+).split()
+
+
+def make_vocabulary(size):
+    """Return pseudo-words and their cumulative zipfian frequency weights"""
+    words = set()
+    while len(words) < size:
+        words.add(''.join(random.sample(SYLLABLES, random.randint(2, 4))))
+
+    words = sorted(words)
+    random.shuffle(words)
+    return words, list(itertools.accumulate(
+        1 / (rank + 1) for rank in range(size)
+    ))
+
+
+class Command(BaseCommand):
+    help = 'Measure the bug search query time, optionally seeding bugs first'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--seed', type=int, default=0,
+            help='Number of synthetic bugs to create before measuring'
+        )
+        parser.add_argument(
+            '--projects', type=int, default=50,
+            help='Number of projects the seeded bugs are spread over'
+        )
+        parser.add_argument(
+            '--vocabulary', type=int, default=20000,
+            help='Number of distinct words used in the seeded text'
+        )
+        parser.add_argument(
+            '--queries', type=int, default=200,
+            help='Number of searches to run'
+        )
+        parser.add_argument(
+            '--page-size', type=int, default=20,
+            help='Number of results fetched per search'
+        )
+
+    def handle(self, *args, **options):
+        random.seed(0)
+        self.words, self.cum_weights = make_vocabulary(options['vocabulary'])
+
+        if options['seed']:
+            self.seed(options['seed'], options['projects'])
+
+        member = self.get_member()
+        queryset = Bug.objects.filter(
+            project_id__in=list(member.projects.values_list('id', flat=True))
+        )
+
+        timings = []
+        cut = 0
+        for _ in range(options['queries']):
+            text = self.text(random.randint(1, 2))
+
+            # Timed as the search view runs it, matching candidates included
+            start = time.perf_counter()
+            bugs, results_cut = search_bugs(queryset, text)
+            KeysetPaginator(
+                bugs, ('-rank', 'id'), options['page_size']
+            ).get_page()
+            timings.append((time.perf_counter() - start) * 1000)
+            cut += results_cut
+
+        timings.sort()
+        self.stdout.write('Bugs: %d' % Bug.objects.count())
+        self.stdout.write('Searches: %d' % len(timings))
+        self.stdout.write('Searches cut: %d' % cut)
+        self.stdout.write('p50: %.1fms' % statistics.median(timings))
+        self.stdout.write(
+            'p95: %.1fms' % timings[int(len(timings) * 0.95) - 1]
+        )
+        self.stdout.write('max: %.1fms' % timings[-1])
+
+        bugs, _ = search_bugs(queryset, self.text(2))
+        sql, params = bugs.order_by('-rank', 'id')[:options['page_size']] \
+            .query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute('EXPLAIN ANALYZE ' + sql, params)
+            self.stdout.write('\n'.join(row[0] for row in cursor.fetchall()))
+
+    def text(self, num_words):
+        """Return random text following the vocabulary frequencies"""
+        return ' '.join(random.choices(
+            self.words, cum_weights=self.cum_weights, k=num_words
+        ))
+
+    def get_member(self):
+        """Return a member that is part of every benchmark project"""
+        member = get_user_model().objects \
+            .filter(email='bench_search@bugtracker.local').first()
+        if member is None:
+            member = get_user_model().objects.create_user(
+                name='Search Benchmark',
+                email='bench_search@bugtracker.local',
+                password=get_user_model().objects.make_random_password()
+            )
+            member.projects.add(*Project.objects.all())
+
+        return member
+
+    @transaction.atomic
+    def seed(self, count, num_projects):
+        """Create synthetic bugs with random text spread over projects"""
+        creator = self.get_member()
+        projects = Project.objects.bulk_create(
+            Project(title='Search benchmark %d' % i)
+            for i in range(num_projects)
+        )
+        creator.projects.add(*projects)
+
+        batch_size = 5000
+        first_id = None
+        for start in range(0, count, batch_size):
+            bugs = Bug.objects.bulk_create(
+                Bug(
+                    title=self.text(5),
+                    description=self.text(40),
+                    project=random.choice(projects),
+                    creator=creator,
+                )
+                for _ in range(min(batch_size, count - start))
+            )
+            first_id = first_id or bugs[0].id
+            self.stdout.write('Seeded %d bugs' % (start + len(bugs)))
+
+        update_search_vectors(Bug.objects.filter(id__gte=first_id))
+        self.stdout.write('Search vectors computed')
@@ -0,0 +1,51 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from bugs.counters import COUNTERS, count_bugs, empty_counters
+from bugs.models import Bug
+from core.modified import touch
+from projects.models import Project
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the denormalized project bug counters, reporting drift'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check', action='store_true',
+            help='Only report drifted counters and fail if any is found'
+        )
+
+    @transaction.atomic
+    def handle(self, *args, **options):
+        # Locking the projects holds back counter updates from bug writes
+        # until the rebuilt values are committed
+        projects = Project.objects.select_for_update().only('id', *COUNTERS)
+        actual = count_bugs(Bug.objects.all())
+
+        drifted = []
+        for project in projects:
+            expected = actual.get(project.id) or empty_counters()
+            stored = {
+                counter: getattr(project, counter) for counter in COUNTERS
+            }
+
+            if stored != expected:
+                self.stdout.write('Project %d: stored %s, actual %s' % (
+                    project.id, stored, expected
+                ))
+                for counter, value in expected.items():
+                    setattr(project, counter, value)
+                drifted.append(project)
+
+        if options['check']:
+            if drifted:
+                raise CommandError(
+                    '%d project(s) with drifted counters' % len(drifted)
+                )
+            self.stdout.write('No drift found')
+            return
+
+        Project.objects.bulk_update(drifted, COUNTERS)
+        touch(Project, [project.id for project in drifted])
+        self.stdout.write('Rebuilt counters of %d project(s)' % len(drifted))
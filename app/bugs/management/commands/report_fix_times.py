@@ -0,0 +1,47 @@
+from django.core.management.base import BaseCommand
+from django.db.models import DurationField, ExpressionWrapper, F
+
+from projects.models import Project
+
+
+def hours(duration):
+    return duration.total_seconds() / 3600
+
+
+class Command(BaseCommand):
+    help = (
+        'Report the mean time the fixed bugs of each project waited, were '
+        'worked on and took to fix, read from the project counters alone'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--limit', type=int, default=20,
+            help='Number of projects reported, slowest to fix first'
+        )
+
+    def handle(self, *args, **options):
+        projects = Project.objects \
+            .filter(fixed_bug_count__gt=0) \
+            .annotate(mean_time=ExpressionWrapper(
+                (F('fixed_waiting_time') + F('fixed_working_time')) /
+                F('fixed_bug_count'),
+                output_field=DurationField()
+            )) \
+            .order_by('-mean_time', 'id') \
+            .only(
+                'id', 'title', 'fixed_bug_count', 'fixed_waiting_time',
+                'fixed_working_time',
+            )[:options['limit']]
+
+        self.stdout.write('%8s  %-30s %7s %10s %10s %10s' % (
+            'project', 'title', 'fixed', 'waiting h', 'working h', 'to fix h'
+        ))
+        for project in projects:
+            count = project.fixed_bug_count
+            self.stdout.write('%8d  %-30s %7d %10.1f %10.1f %10.1f' % (
+                project.id, project.title[:30], count,
+                hours(project.fixed_waiting_time) / count,
+                hours(project.fixed_working_time) / count,
+                hours(project.mean_time_to_fix),
+            ))
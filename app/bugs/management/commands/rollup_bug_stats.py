@@ -0,0 +1,40 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from bugs.rollups import roll_up_bug_stats
+
+
+class Command(BaseCommand):
+    help = (
+        'Roll up the bug status transitions into daily counts per project '
+        'and status, computing again only the days with transitions since '
+        'the last run.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--full', action='store_true',
+            help='Compute every day again from the whole transition log'
+        )
+        parser.add_argument(
+            '--settle', type=float, default=60,
+            help='Seconds transitions are left to commit before the '
+                 'watermark moves past them'
+        )
+        parser.add_argument(
+            '--interval', type=float,
+            help='Keep running, rolling up again after that many seconds'
+        )
+
+    def handle(self, *args, **options):
+        settle = timedelta(seconds=options['settle'])
+        full = options['full']
+        while True:
+            days = roll_up_bug_stats(settle=settle, full=full)
+            self.stdout.write('Rolled up %d day(s)' % days)
+            if options['interval'] is None:
+                return
+            full = False
+            time.sleep(options['interval'])
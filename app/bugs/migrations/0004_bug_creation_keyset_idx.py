@@ -0,0 +1,17 @@
+# Generated by Django 3.1.14 on 2026-10-18 03:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bugs', '0003_message'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='bug',
+            index=models.Index(fields=['-creationDate', 'id'], name='bug_creation_keyset_idx'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 3.1.14 on 2026-10-18 04:04
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bugs', '0004_bug_creation_keyset_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bug',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunSQL(
+            """
+            UPDATE bugs_bug SET search_vector =
+                setweight(to_tsvector('english', title), 'A') ||
+                setweight(to_tsvector('english', description), 'B') ||
+                setweight(to_tsvector('english', coalesce((
+                    SELECT string_agg(content, ' ')
+                    FROM bugs_message
+                    WHERE bugs_message.bug_id = bugs_bug.id
+                ), '')), 'C');
+            """,
+            migrations.RunSQL.noop,
+        ),
+        migrations.AddIndex(
+            model_name='bug',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='bug_search_vector_idx'),
+        ),
+    ]
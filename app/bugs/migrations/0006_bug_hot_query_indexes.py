@@ -0,0 +1,21 @@
+# Generated by Django 3.1.14 on 2026-10-18 04:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bugs', '0005_bug_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='bug',
+            index=models.Index(condition=models.Q(_status__in=['WAITING', 'BEING WORKED']), fields=['-creationDate', 'id'], name='bug_active_creation_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='bug',
+            index=models.Index(fields=['project', '_status'], name='bug_project_status_idx'),
+        ),
+    ]
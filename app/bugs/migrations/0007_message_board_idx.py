@@ -0,0 +1,17 @@
+# Generated by Django 3.1.14 on 2026-10-18 04:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bugs', '0006_bug_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(fields=['bug', '-creationDate', 'id'], name='message_board_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 3.1.14 on 2026-10-18 06:31
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bugs', '0007_message_board_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bug',
+            name='modified_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+    ]
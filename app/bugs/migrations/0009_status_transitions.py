@@ -0,0 +1,60 @@
+# Generated by Django 3.1.14 on 2026-10-18 06:37
+
+import datetime
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('projects', '0007_project_fix_times'),
+        ('bugs', '0008_modified_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bug',
+            name='status_changed_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+        migrations.AddField(
+            model_name='bug',
+            name='waiting_time',
+            field=models.DurationField(default=datetime.timedelta(0), editable=False),
+        ),
+        migrations.AddField(
+            model_name='bug',
+            name='working_time',
+            field=models.DurationField(default=datetime.timedelta(0), editable=False),
+        ),
+        # The history of the existing bugs is unknown, their current status
+        # is taken to start when they were closed or else created
+        migrations.RunSQL(
+            """
+            UPDATE bugs_bug
+            SET status_changed_at = coalesce("closingDate", "creationDate");
+            """,
+            migrations.RunSQL.noop,
+        ),
+        migrations.CreateModel(
+            name='StatusTransition',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('from_status', models.CharField(blank=True, max_length=15)),
+                ('to_status', models.CharField(max_length=15)),
+                ('changed_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('elapsed', models.DurationField(blank=True, null=True)),
+                ('bug', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='transitions', to='bugs.bug')),
+                ('changed_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='projects.project')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='statustransition',
+            index=models.Index(fields=['bug', 'changed_at'], name='transition_bug_idx'),
+        ),
+    ]
@@ -0,0 +1,55 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    """Log the creation and closing of the bugs older than the log
+
+    Kept apart from 0009_status_transitions: the deferred foreign key checks
+    of the inserted rows would block the index creations of that migration
+    transaction.
+    """
+
+    dependencies = [
+        ('bugs', '0009_status_transitions'),
+    ]
+
+    operations = [
+        # The bugs from before the transition log get their creation and
+        # closing rebuilt from their dates
+        migrations.RunSQL(
+            """
+            WITH untracked AS (
+                SELECT id, project_id, _status, creator_id, "creationDate",
+                       "closingDate",
+                       "closingDate" IS NOT NULL
+                       AND _status NOT IN ('WAITING', 'BEING WORKED')
+                       AS closed
+                FROM bugs_bug AS bug
+                WHERE NOT EXISTS (
+                    SELECT FROM bugs_statustransition WHERE bug_id = bug.id
+                )
+            )
+            INSERT INTO bugs_statustransition (
+                bug_id, project_id, from_status, to_status, changed_at,
+                changed_by_id
+            )
+            SELECT bug_id, project_id, from_status, to_status, changed_at,
+                   changed_by_id
+            FROM (
+                SELECT id AS bug_id, project_id, '' AS from_status,
+                       CASE WHEN closed THEN 'WAITING' ELSE _status END
+                       AS to_status,
+                       "creationDate" AS changed_at,
+                       creator_id AS changed_by_id, 0 AS position
+                FROM untracked
+                UNION ALL
+                SELECT id, project_id, 'WAITING', _status, "closingDate",
+                       NULL, 1
+                FROM untracked
+                WHERE closed
+            ) AS history
+            ORDER BY bug_id, position;
+            """,
+            migrations.RunSQL.noop,
+        ),
+    ]
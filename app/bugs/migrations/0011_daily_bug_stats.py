@@ -0,0 +1,53 @@
+# Generated by Django 3.1.14 on 2026-10-18 06:50
+
+import datetime
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0007_project_fix_times'),
+        ('bugs', '0010_backfill_status_transitions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyBugStats',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('status', models.CharField(max_length=15)),
+                ('entered', models.PositiveIntegerField(default=0)),
+                ('left', models.PositiveIntegerField(default=0)),
+                ('created', models.PositiveIntegerField(default=0)),
+                ('closed', models.PositiveIntegerField(default=0)),
+                ('time_to_close', models.DurationField(default=datetime.timedelta(0))),
+            ],
+        ),
+        migrations.CreateModel(
+            name='RollupWatermark',
+            fields=[
+                ('name', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('last_id', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='statustransition',
+            index=models.Index(fields=['changed_at'], name='transition_day_idx'),
+        ),
+        migrations.AddField(
+            model_name='dailybugstats',
+            name='project',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_bug_stats', to='projects.project'),
+        ),
+        migrations.AddIndex(
+            model_name='dailybugstats',
+            index=models.Index(fields=['day'], name='daily_bug_stats_day_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='dailybugstats',
+            constraint=models.UniqueConstraint(fields=('project', 'day', 'status'), name='daily_bug_stats_unique'),
+        ),
+    ]
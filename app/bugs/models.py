@@ -1,13 +1,45 @@
-from django.db import models
+from datetime import timedelta
+
+from django.db import models, transaction
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
+from django.db.models import Exists, ExpressionWrapper, OuterRef, Q
 from django.contrib.auth import get_user_model
+from django.utils import timezone
 
 from projects.models import Project
 
 
+class BugQuerySet(models.QuerySet):
+    """Queryset of bugs with helpers for the views that list them"""
+
+    def for_viewer(self, viewer):
+        """Return the bugs loaded with what the viewer is shown about them
+
+        The project and creator are joined in and whether the viewer is
+        assigned to or created each bug is computed in SQL, so rendering
+        the list rows and the detail page costs no extra queries.
+        """
+        assignments = self.model.assigned_members.through.objects.filter(
+            bug_id=OuterRef('pk'), member_id=viewer.pk
+        )
+
+        return self.select_related('project', 'creator').annotate(
+            is_assigned_to_viewer=Exists(assignments),
+            is_created_by_viewer=ExpressionWrapper(
+                Q(creator_id=viewer.pk), output_field=models.BooleanField()
+            ),
+        )
+
+
+# Module level so the partial index of the active bugs can use it too
+ACTIVE_STATUS = ['WAITING', 'BEING WORKED']
+
+
 class Bug(models.Model):
     """A bug in a project to be fixed"""
     POSSIBLE_STATUS = ['BEING WORKED', 'WAITING', 'FIXED', 'CLOSED']
-    ACTIVE_STATUS = ['WAITING', 'BEING WORKED']
+    ACTIVE_STATUS = ACTIVE_STATUS
     WORKING_STATUS = 'BEING WORKED'
     WAITING_STATUS = 'WAITING'
     STATUS_CLASSES = {
@@ -22,6 +54,16 @@ class Bug(models.Model):
     _status = models.CharField(max_length=15, default='WAITING')
     creationDate = models.DateTimeField(auto_now_add=True)
     closingDate = models.DateTimeField(null=True, blank=True, default=None)
+    # Bumped by every change shown on the bug page, see core.modified
+    modified_at = models.DateTimeField(default=timezone.now, editable=False)
+    # Start of the current status and time spent in the active statuses
+    # before it, kept up to date by save along the status transitions
+    status_changed_at = models.DateTimeField(
+        default=timezone.now, editable=False
+    )
+    waiting_time = models.DurationField(default=timedelta(), editable=False)
+    working_time = models.DurationField(default=timedelta(), editable=False)
+    search_vector = SearchVectorField(null=True, blank=True, editable=False)
 
     project = models.ForeignKey(
         Project, on_delete=models.CASCADE, related_name='bugs'
@@ -33,12 +75,129 @@ class Bug(models.Model):
         get_user_model(), related_name='assigned_bugs', blank=True
     )
 
+    objects = BugQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['-creationDate', 'id'], name='bug_creation_keyset_idx'
+            ),
+            GinIndex(fields=['search_vector'], name='bug_search_vector_idx'),
+            # Partial index matching the filter of get_active
+            models.Index(
+                fields=['-creationDate', 'id'],
+                condition=Q(_status__in=ACTIVE_STATUS),
+                name='bug_active_creation_idx',
+            ),
+            models.Index(
+                fields=['project', '_status'], name='bug_project_status_idx'
+            ),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Remember the project counters the loaded bug is counted in"""
+        bug = super().from_db(db, field_names, values)
+
+        if 'project_id' in bug.__dict__ and '_status' in bug.__dict__:
+            bug._counted_as = (bug.project_id, bug._status)
+
+        return bug
+
+    def save(self, *args, **kwargs):
+        """Save the bug, its status history and project counters at once
+
+        The bug row is locked and its stored project, status and status
+        times read again first, so a concurrent save since the bug was
+        loaded is neither counted nor timed twice. A status or project
+        change appends a transition, and a status change adds the time spent
+        in the previous status to its total. The modification time is bumped
+        along any field.
+        """
+        update_fields = kwargs.get('update_fields')
+        now = timezone.now()
+        self.modified_at = now
+        saved_fields = {'modified_at'}
+        transition = None
+
+        with transaction.atomic():
+            if self._state.adding:
+                self.status_changed_at = now
+                transition = StatusTransition(
+                    to_status=self._status, changed_at=now,
+                    changed_by_id=self.creator_id,
+                )
+            elif getattr(self, '_counted_as', None) is not None and (
+                update_fields is None or
+                {'project', 'project_id', '_status'} & set(update_fields)
+            ):
+                stored = Bug.objects.select_for_update() \
+                    .filter(pk=self.pk) \
+                    .values_list(
+                        'project_id', '_status', 'status_changed_at',
+                        'waiting_time', 'working_time',
+                    ) \
+                    .first()
+                if stored is not None:
+                    self._counted_as = stored[:2]
+                    transition = self._time_status(*stored, now)
+                    saved_fields.update(
+                        ['status_changed_at', 'waiting_time', 'working_time']
+                    )
+
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, *saved_fields}
+            super().save(*args, **kwargs)
+
+            if transition is not None:
+                transition.bug = self
+                transition.project_id = self.project_id
+                if transition.changed_by_id is None:
+                    transition.changed_by = getattr(
+                        self, '_status_changed_by', None
+                    )
+                transition.save()
+                self._status_changed_by = None
+
+    def _time_status(self, project_id, status, since, waiting_time,
+                     working_time, now):
+        """Take the stored status times, returning the transition if any
+
+        The time spent in the stored status is added to its total when the
+        status changes. A move to another project keeps the status, without
+        elapsed time.
+        """
+        self.status_changed_at = since
+        self.waiting_time = waiting_time
+        self.working_time = working_time
+        if status == self._status:
+            if project_id == self.project_id:
+                return None
+            return StatusTransition(
+                from_status=status, to_status=status, changed_at=now
+            )
+
+        elapsed = now - since
+        if status == self.WAITING_STATUS:
+            self.waiting_time += elapsed
+        elif status == self.WORKING_STATUS:
+            self.working_time += elapsed
+        self.status_changed_at = now
+
+        return StatusTransition(
+            from_status=status, to_status=self._status, changed_at=now,
+            elapsed=elapsed,
+        )
+
     @property
     def status(self):
         return self._status
 
-    def set_status(self, status):
-        """Set the status of the bug checking for valid status"""
+    def set_status(self, status, changed_by=None):
+        """Set the status of the bug checking for valid status
+
+        The member changing it is recorded on the transition when saved.
+        """
         if status not in self.POSSIBLE_STATUS:
             possibleVals = str(self.POSSIBLE_STATUS).strip('[]')
             raise ValueError(
@@ -46,6 +205,7 @@ class Bug(models.Model):
             )
 
         self._status = status
+        self._status_changed_by = changed_by
 
     @property
     def status_tuples(self):
@@ -76,6 +236,13 @@ class Message(models.Model):
     creationDate = models.DateTimeField(auto_now_add=True)
     content = models.TextField()
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['bug', '-creationDate', 'id'], name='message_board_idx'
+            ),
+        ]
+
     def __str__(self):
         """Return the string representation of the message object"""
         result = self.writer.get_short_name() + ' - ' + self.content
@@ -85,3 +252,90 @@ class Message(models.Model):
         return result
 
     __repr__ = __str__
+
+
+class StatusTransition(models.Model):
+    """A change of the status of a bug, appended and never updated
+
+    The project is the one of the bug after the change, so a move to another
+    project is recorded as a transition keeping the status. Elapsed is the
+    time spent in the previous status, empty for the creation of the bug,
+    which has no previous status, and for moves.
+    """
+    bug = models.ForeignKey(
+        Bug, on_delete=models.CASCADE, related_name='transitions'
+    )
+    project = models.ForeignKey(
+        Project, on_delete=models.CASCADE, related_name='+'
+    )
+    from_status = models.CharField(max_length=15, blank=True)
+    to_status = models.CharField(max_length=15)
+    changed_at = models.DateTimeField(default=timezone.now)
+    changed_by = models.ForeignKey(
+        get_user_model(), on_delete=models.SET_NULL, null=True, blank=True,
+        related_name='+'
+    )
+    elapsed = models.DurationField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['bug', 'changed_at'], name='transition_bug_idx'
+            ),
+            models.Index(fields=['changed_at'], name='transition_day_idx'),
+        ]
+
+    def __str__(self):
+        """Return the string representation of the transition"""
+        return '%s: %s -> %s' % (
+            self.bug_id, self.from_status or '-', self.to_status
+        )
+
+    __repr__ = __str__
+
+
+class DailyBugStats(models.Model):
+    """Status transitions of the bugs of a project on a day, rolled up
+
+    Entered and left count the bugs that moved in and out of the status,
+    created the ones entering it as new bugs and closed the ones entering it
+    from an active status, whose times from creation are summed in
+    time_to_close. Rows are written by the rollup_bug_stats command.
+    """
+    project = models.ForeignKey(
+        Project, on_delete=models.CASCADE, related_name='daily_bug_stats'
+    )
+    day = models.DateField()
+    status = models.CharField(max_length=15)
+    entered = models.PositiveIntegerField(default=0)
+    left = models.PositiveIntegerField(default=0)
+    created = models.PositiveIntegerField(default=0)
+    closed = models.PositiveIntegerField(default=0)
+    time_to_close = models.DurationField(default=timedelta())
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['project', 'day', 'status'],
+                name='daily_bug_stats_unique'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['day'], name='daily_bug_stats_day_idx'),
+        ]
+
+    def __str__(self):
+        """Return the string representation of the rollup row"""
+        return '%s %s %s' % (self.project_id, self.day, self.status)
+
+    __repr__ = __str__
+
+
+class RollupWatermark(models.Model):
+    """Id of the last status transition rolled up into each rollup table"""
+    name = models.CharField(max_length=50, primary_key=True)
+    last_id = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        """Return the string representation of the watermark"""
+        return '%s: %d' % (self.name, self.last_id)
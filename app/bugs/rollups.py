@@ -0,0 +1,208 @@
+"""
+Daily rollups of the bug status transitions, read by the project metrics.
+
+Each run of roll_up_bug_stats takes the transitions appended since the
+watermark, finds the days they fall on and computes those days again from
+every transition of the day, grouped by project, day and status. Days are
+local to the current time zone. The watermark stops short of transitions
+newer than the settle time, as ids are taken before their transactions
+commit and an earlier id may still show up.
+"""
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+
+from django.db import transaction
+from django.db.models import \
+    Count, DurationField, ExpressionWrapper, F, Max, Min, OuterRef, Q, \
+    Subquery, Sum
+from django.db.models.functions import TruncDay
+from django.utils import timezone
+
+from .models import Bug, DailyBugStats, RollupWatermark, StatusTransition
+
+
+WATERMARK = 'daily_bug_stats'
+CLOSED_STATUS = [
+    status for status in Bug.POSSIBLE_STATUS
+    if status not in Bug.ACTIVE_STATUS
+]
+
+
+def day_of(value):
+    """Return the local day of a truncated datetime"""
+    return timezone.localtime(value).date()
+
+
+def day_ranges(days):
+    """Return a filter on changed_at matching the days, merging runs"""
+    condition = Q(pk__in=[])
+    days = sorted(days)
+    while days:
+        first = last = days.pop(0)
+        while days and days[0] == last + timedelta(days=1):
+            last = days.pop(0)
+        condition |= Q(
+            changed_at__gte=timezone.make_aware(datetime.combine(
+                first, time.min
+            )),
+            changed_at__lt=timezone.make_aware(datetime.combine(
+                last + timedelta(days=1), time.min
+            )),
+        )
+    return condition
+
+
+def count_days(transitions):
+    """Return the rollup rows of the transitions, by project, day, status
+
+    A transition enters its status in its project and leaves the previous
+    one in the project of the previous transition of the bug.
+    """
+    rows = defaultdict(lambda: {
+        'entered': 0, 'left': 0, 'created': 0, 'closed': 0,
+        'time_to_close': timedelta(),
+    })
+    transitions = transitions.annotate(day=TruncDay('changed_at'))
+
+    # Bugs from before the log closed with no closing date are recorded as
+    # created closed, which is not a closing
+    closing = Q(to_status__in=CLOSED_STATUS) & ~Q(
+        from_status__in=CLOSED_STATUS + ['']
+    )
+    entries = transitions \
+        .values('project_id', 'day', 'to_status') \
+        .annotate(
+            entered=Count('id'),
+            created=Count('id', filter=Q(from_status='')),
+            closed=Count('id', filter=closing),
+            time_to_close=Sum(
+                ExpressionWrapper(
+                    F('changed_at') - F('bug__creationDate'),
+                    output_field=DurationField()
+                ),
+                filter=closing
+            ),
+        ) \
+        .order_by()
+    for entry in entries:
+        row = rows[entry['project_id'], day_of(entry['day']),
+                   entry['to_status']]
+        row.update(
+            entered=entry['entered'], created=entry['created'],
+            closed=entry['closed'],
+            time_to_close=entry['time_to_close'] or timedelta(),
+        )
+
+    previous = StatusTransition.objects \
+        .filter(bug_id=OuterRef('bug_id'), id__lt=OuterRef('id')) \
+        .order_by('-id') \
+        .values('project_id')[:1]
+    exits = transitions \
+        .exclude(from_status='') \
+        .annotate(from_project_id=Subquery(previous)) \
+        .values('from_project_id', 'day', 'from_status') \
+        .annotate(left=Count('id')) \
+        .order_by()
+    for leaving in exits:
+        row = rows[leaving['from_project_id'], day_of(leaving['day']),
+                   leaving['from_status']]
+        row['left'] += leaving['left']
+
+    return rows
+
+
+def roll_up_bug_stats(settle=timedelta(minutes=1), full=False):
+    """Roll up the days changed since the watermark, returning their count
+
+    With full, every day is computed again from the whole log.
+    """
+    with transaction.atomic():
+        # Locking the watermark keeps concurrent runs apart
+        RollupWatermark.objects.get_or_create(name=WATERMARK)
+        watermark = RollupWatermark.objects.select_for_update() \
+            .get(name=WATERMARK)
+
+        pending = StatusTransition.objects.all()
+        if not full:
+            pending = pending.filter(id__gt=watermark.last_id)
+        unsettled = pending \
+            .filter(changed_at__gte=timezone.now() - settle) \
+            .aggregate(first=Min('id'))['first']
+        if unsettled is not None:
+            pending = pending.filter(id__lt=unsettled)
+        last_id = pending.aggregate(last=Max('id'))['last']
+        if last_id is None:
+            return 0
+
+        days = {
+            day_of(day) for day in pending
+            .annotate(day=TruncDay('changed_at'))
+            .values_list('day', flat=True)
+            .order_by()
+            .distinct()
+        }
+        transitions = StatusTransition.objects.filter(day_ranges(days))
+        rows = count_days(transitions)
+
+        stale = DailyBugStats.objects.all()
+        if not full:
+            stale = stale.filter(day__in=days)
+        stale.delete()
+        DailyBugStats.objects.bulk_create(
+            [
+                DailyBugStats(
+                    project_id=project_id, day=day, status=status, **stats
+                )
+                for (project_id, day, status), stats in rows.items()
+            ],
+            batch_size=1000
+        )
+
+        watermark.last_id = max(watermark.last_id, last_id)
+        watermark.save(update_fields=['last_id'])
+
+    return len(days)
+
+
+def project_metrics(project, start, end):
+    """Return the daily bug metrics of the project, read from the rollups
+
+    Each day holds the bugs created and closed on it, the mean time the
+    closed ones took from their creation and the open and closed bugs at
+    its end, which adds up the earlier days.
+    """
+    stats = project.daily_bug_stats
+    counts = dict.fromkeys(Bug.POSSIBLE_STATUS, 0)
+    for status, entered, left in stats \
+            .filter(day__lt=start) \
+            .values('status') \
+            .annotate(entered=Sum('entered'), left=Sum('left')) \
+            .values_list('status', 'entered', 'left') \
+            .order_by():
+        counts[status] = entered - left
+
+    by_day = defaultdict(list)
+    for row in stats.filter(day__gte=start, day__lte=end):
+        by_day[row.day].append(row)
+
+    days = []
+    day = start
+    while day <= end:
+        created = closed = 0
+        time_to_close = timedelta()
+        for row in by_day[day]:
+            counts[row.status] += row.entered - row.left
+            created += row.created
+            closed += row.closed
+            time_to_close += row.time_to_close
+        days.append({
+            'day': day,
+            'created': created,
+            'closed': closed,
+            'mean_time_to_close': time_to_close / closed if closed else None,
+            'open_bugs': sum(counts[s] for s in Bug.ACTIVE_STATUS),
+            'closed_bugs': sum(counts[s] for s in CLOSED_STATUS),
+        })
+        day += timedelta(days=1)
+
+    return days
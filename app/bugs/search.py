@@ -0,0 +1,120 @@
+from django.contrib.postgres.search import \
+    SearchHeadline, SearchQuery, SearchRank, SearchVector, SearchVectorField
+from django.contrib.postgres.aggregates import StringAgg
+from django.db.models import BigIntegerField, F, FloatField, Func, \
+    OuterRef, Subquery, TextField, Value
+from django.db.models.functions import Cast, Coalesce
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from .models import Bug, Message
+
+
+SEARCH_CONFIG = 'english'
+HIGHLIGHT_START = '\x02'
+HIGHLIGHT_STOP = '\x03'
+# Number of the newest matching bugs ranked by a search
+SEARCH_CANDIDATES = 1000
+# The rank is scaled to an integer, which cursors carry exactly
+RANK_SCALE = 1000000
+
+
+def bug_document():
+    """Return the expression of the full search vector of a bug
+
+    Titles weigh more than descriptions, which weigh more than the bug
+    board messages.
+    """
+    messages = Message.objects \
+        .filter(bug=OuterRef('pk')) \
+        .values('bug') \
+        .annotate(text=StringAgg('content', ' ')) \
+        .values('text')
+
+    return (
+        SearchVector('title', weight='A', config=SEARCH_CONFIG) +
+        SearchVector('description', weight='B', config=SEARCH_CONFIG) +
+        SearchVector(
+            Coalesce(Subquery(messages), Value('', output_field=TextField())),
+            weight='C',
+            config=SEARCH_CONFIG,
+        )
+    )
+
+
+def update_search_vectors(queryset):
+    """Recompute the stored search vector of the bugs in the queryset"""
+    queryset.update(search_vector=bug_document())
+
+
+def append_message_to_search_vector(message):
+    """Add the content of a new message to the search vector of its bug
+
+    Messages are never edited, so the vector is extended in place instead
+    of being rebuilt from every message of the bug.
+    """
+    empty_vector = SearchVector(Value('', output_field=TextField()))
+    message_vector = SearchVector(
+        Value(message.content, output_field=TextField()),
+        weight='C',
+        config=SEARCH_CONFIG,
+    )
+
+    Bug.objects.filter(pk=message.bug_id).update(
+        search_vector=Func(
+            Coalesce(F('search_vector'), empty_vector),
+            message_vector,
+            template='(%(expressions)s)',
+            arg_joiner=' || ',
+            output_field=SearchVectorField(),
+        )
+    )
+
+
+def search_bugs(queryset, text, candidates=SEARCH_CANDIDATES):
+    """Return the bugs matching the text, ranked and with highlights, and
+    whether older matches were left out of the ranking
+
+    Only the given number of newest matching bugs are ranked, so common
+    words do not rank a large part of the table. Their ids are fetched
+    first, with one more telling if some were left out at no extra cost.
+    The rank is a float4 that would not compare equal to itself once
+    through a cursor, so it is scaled and rounded to an integer.
+    """
+    query = SearchQuery(text, config=SEARCH_CONFIG, search_type='websearch')
+    highlight = {
+        'config': SEARCH_CONFIG,
+        'start_sel': HIGHLIGHT_START,
+        'stop_sel': HIGHLIGHT_STOP,
+    }
+
+    matches = list(
+        queryset
+        .filter(search_vector=query)
+        .order_by('-creationDate', 'id')
+        .values_list('pk', flat=True)[:candidates + 1]
+    )
+
+    bugs = queryset.filter(pk__in=matches[:candidates]).annotate(
+        rank=Cast(
+            SearchRank(F('search_vector'), query) *
+            Value(RANK_SCALE, output_field=FloatField()),
+            BigIntegerField()
+        ),
+        title_headline=SearchHeadline(
+            'title', query, highlight_all=True, **highlight
+        ),
+        description_headline=SearchHeadline(
+            'description', query, max_fragments=2, **highlight
+        ),
+    )
+    return bugs, len(matches) > candidates
+
+
+def render_headline(headline):
+    """Return the headline as safe html with the matches marked"""
+    return mark_safe(
+        escape(headline)
+        .replace(HIGHLIGHT_START, '<mark>')
+        .replace(HIGHLIGHT_STOP, '</mark>')
+    )
@@ -0,0 +1,109 @@
+from django.db.models import Q
+from django.db.models.signals import m2m_changed, post_save, post_delete
+from django.dispatch import receiver
+
+from core.fragments import bump_versions
+from core.jobs import enqueue
+from core.modified import touch
+from members.models import Member
+from projects.models import Project
+
+from .models import Bug, Message
+from .search import append_message_to_search_vector
+from .counters import update_counters
+from .tasks import refresh_search_vector
+
+
+SEARCHABLE_FIELDS = {'title', 'description'}
+COUNTED_FIELDS = {'project', 'project_id', '_status'}
+
+
+@receiver(post_save, sender=Bug)
+def bug_saved(sender, instance, created, update_fields, **kwargs):
+    """Queue the refresh of the search vector of the bug with its text
+
+    Rebuilding the vector aggregates every message of the bug, so it is
+    left to the job workers instead of slowing down the save. The job
+    commits with the save, and the bug is searchable once it has run.
+    """
+    if update_fields is None or SEARCHABLE_FIELDS & set(update_fields):
+        enqueue(refresh_search_vector, instance.pk)
+
+
+@receiver(post_save, sender=Bug)
+def bug_counted(sender, instance, created, update_fields, **kwargs):
+    """Move the bug to the counters of its current project and status"""
+    if update_fields is not None and not COUNTED_FIELDS & set(update_fields):
+        return
+
+    counted_as = getattr(instance, '_counted_as', None)
+    if not created and counted_as is None:
+        # Bugs saved without being loaded are left to rebuild_bug_counters
+        return
+
+    current = (instance.project_id, instance._status)
+    if created or counted_as != current:
+        update_counters(removed=counted_as, added=current, bug=instance)
+        instance._counted_as = current
+
+
+@receiver(post_save, sender=Bug)
+def bug_changed(sender, instance, **kwargs):
+    """Make the cached fragments and the project page showing the bug stale"""
+    bump_versions(Bug, [instance.pk])
+    touch(Project, [instance.project_id])
+
+
+@receiver(m2m_changed, sender=Bug.assigned_members.through)
+def bug_assignments_changed(sender, instance, action, reverse, pk_set,
+                            **kwargs):
+    """Make the cached fragments of the bugs whose assignments changed stale"""
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+
+    if not reverse:
+        bug_ids = [instance.pk]
+    elif action == 'pre_clear':
+        bug_ids = list(
+            sender.objects
+            .filter(member_id=instance.pk)
+            .values_list('bug_id', flat=True)
+        )
+    else:
+        bug_ids = pk_set
+
+    bump_versions(Bug, bug_ids)
+    touch(Bug, bug_ids)
+    touch(Project, Bug.objects.filter(pk__in=bug_ids).values('project_id'))
+
+
+@receiver(post_delete, sender=Bug)
+def bug_deleted(sender, instance, **kwargs):
+    """Remove the deleted bug from its project counters"""
+    counted_as = getattr(instance, '_counted_as', None)
+    update_counters(
+        removed=counted_as or (instance.project_id, instance._status),
+        bug=instance,
+    )
+
+
+@receiver(post_save, sender=Message)
+def message_saved(sender, instance, created, **kwargs):
+    """Add new bug board messages to the search vector of their bug"""
+    if created:
+        append_message_to_search_vector(instance)
+        touch(Bug, [instance.bug_id])
+
+
+@receiver(post_save, sender=Member)
+def member_saved(sender, instance, created, update_fields, **kwargs):
+    """Make the pages of the bugs showing the member name stale"""
+    if created or (update_fields is not None and 'name' not in update_fields):
+        return
+
+    assigned = Bug.assigned_members.through.objects \
+        .filter(member_id=instance.pk).values('bug_id')
+    written = Message.objects.filter(writer_id=instance.pk).values('bug_id')
+    touch(Bug, Bug.objects.filter(
+        Q(creator_id=instance.pk) | Q(pk__in=assigned) | Q(pk__in=written)
+    ).values('pk'))
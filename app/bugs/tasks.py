@@ -0,0 +1,10 @@
+from core.jobs import job
+
+from .models import Bug
+from .search import update_search_vectors
+
+
+@job
+def refresh_search_vector(bug_id):
+    """Recompute the search vector of the bug from its current text"""
+    update_search_vectors(Bug.objects.filter(pk=bug_id))
@@ -0,0 +1,12 @@
+from django import template
+
+from bugs.search import render_headline
+
+
+register = template.Library()
+
+
+@register.filter
+def headline(value):
+    """Render a search headline as html with the matches marked"""
+    return render_headline(value or '')
@@ -0,0 +1,94 @@
+from django.test import TestCase
+from django.urls import reverse
+
+from core import utils
+from bugs.models import Message
+
+
+class BugApiTests(TestCase):
+    """Test the bugs and bug boards of the API"""
+
+    def setUp(self):
+        self.member = utils.sample_member()
+        self.outsider = utils.sample_member(email='outsider@mail.com')
+        self.superuser = utils.sample_superuser()
+
+        self.project = utils.sample_project(title='Project')
+        self.project.members.add(self.member)
+        self.other_project = utils.sample_project(title='Other')
+
+        self.bug = utils.sample_bug(creator=self.member, project=self.project)
+        self.bug.assigned_members.add(self.member)
+        self.other_bug = utils.sample_bug(
+            creator=self.superuser, project=self.other_project
+        )
+        self.message = Message.objects.create(
+            writer=self.member, bug=self.bug, content='Found it'
+        )
+
+    def list_ids(self, user, url, **params):
+        self.client.force_login(user)
+        res = self.client.get(url, params)
+        self.assertEqual(res.status_code, 200)
+        return [row['id'] for row in res.json()['results']]
+
+    def test_bug_visibility(self):
+        """Test members only see the bugs of their projects"""
+        url = reverse('api:bug-list')
+        self.assertEqual(self.list_ids(self.member, url), [self.bug.id])
+        self.assertEqual(self.list_ids(self.outsider, url), [])
+        self.assertCountEqual(
+            self.list_ids(self.superuser, url),
+            [self.bug.id, self.other_bug.id]
+        )
+
+        self.client.force_login(self.member)
+        res = self.client.get(reverse('api:bug-detail', args=[self.bug.id]))
+        self.assertEqual(res.status_code, 200)
+        res = self.client.get(
+            reverse('api:bug-detail', args=[self.other_bug.id])
+        )
+        self.assertEqual(res.status_code, 404)
+
+    def test_bug_fields(self):
+        """Test the bug fields hold its relations"""
+        self.client.force_login(self.member)
+        res = self.client.get(reverse('api:bug-detail', args=[self.bug.id]))
+
+        bug = res.json()
+        self.assertEqual(bug['status'], 'WAITING')
+        self.assertEqual(
+            bug['project'], {'id': self.project.id, 'title': 'Project'}
+        )
+        self.assertEqual(
+            bug['creator'], {'id': self.member.id, 'name': self.member.name}
+        )
+        self.assertEqual(bug['assigned_members'], [self.member.id])
+
+    def test_bug_filters(self):
+        """Test the bugs can be filtered by project and status"""
+        url = reverse('api:bug-list')
+        self.assertEqual(
+            self.list_ids(self.superuser, url, project=self.project.id),
+            [self.bug.id]
+        )
+        self.assertEqual(
+            self.list_ids(self.superuser, url, status='FIXED'), []
+        )
+
+        res = self.client.get(url, {'status': 'LOST'})
+        self.assertEqual(res.status_code, 400)
+        res = self.client.get(url, {'project': 'first'})
+        self.assertEqual(res.status_code, 400)
+
+    def test_messages(self):
+        """Test the board messages are only listed to the project members"""
+        url = reverse('api:bug-messages', args=[self.bug.id])
+        self.assertEqual(self.list_ids(self.member, url), [self.message.id])
+
+        message = self.client.get(url).json()['results'][0]
+        self.assertEqual(message['content'], 'Found it')
+        self.assertEqual(message['writer']['id'], self.member.id)
+
+        self.client.force_login(self.outsider)
+        self.assertEqual(self.client.get(url).status_code, 404)
@@ -1,8 +1,14 @@
+from datetime import timedelta
+from io import StringIO
+
 from django.test import TestCase
 from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db.models import Q
 from mixer.backend.django import mixer
 
-from bugs.models import Bug, Message
+from bugs.models import Bug, Message, StatusTransition
 from projects.models import Project
 
 
@@ -69,6 +75,245 @@ class BugModelTests(TestCase):
 
         self.assertQuerysetEqual(set(actives), [str(b1), str(b2)])
 
+    def test_bug_queryset_for_viewer(self):
+        """Test the bug rows are annotated with the viewer badges"""
+        other = get_user_model().objects.create_user(
+            name='Other Member',
+            email='other@gotmail.com',
+            password='testpass'
+        )
+        assigned_bug = Bug.objects.create(
+            title='Assigned', project=self.proj, creator=other
+        )
+        assigned_bug.assigned_members.add(self.member, other)
+
+        rows = {
+            bug.title: bug
+            for bug in Bug.objects.for_viewer(self.member)
+        }
+
+        self.assertEqual(len(rows), 2)
+        self.assertTrue(rows['Test'].is_created_by_viewer)
+        self.assertFalse(rows['Test'].is_assigned_to_viewer)
+        self.assertFalse(rows['Assigned'].is_created_by_viewer)
+        self.assertTrue(rows['Assigned'].is_assigned_to_viewer)
+
+    def test_active_partial_indexes_match_get_active(self):
+        """Test the partial indexes cover exactly the active status lists"""
+        indexes = [
+            (Bug, 'bug_active_creation_idx'),
+            (Project, 'project_active_creation_idx'),
+        ]
+
+        for model, name in indexes:
+            index = next(i for i in model._meta.indexes if i.name == name)
+            self.assertEqual(
+                index.condition, Q(_status__in=model.ACTIVE_STATUS)
+            )
+
+
+class BugCountersTests(TestCase):
+    """Test the project bug counters maintained by the bug model"""
+
+    def setUp(self):
+        self.member = get_user_model().objects.create_user(
+            name='Test Member',
+            email='test@gotmail.com',
+            password='testpass'
+        )
+        self.proj = Project.objects.create(title='Test')
+
+    def assertCounters(self, project, total, waiting, working, fixed, closed):
+        """Assert the stored counters of the project"""
+        project.refresh_from_db()
+        self.assertEqual(
+            (
+                project.bug_count,
+                project.waiting_bug_count,
+                project.working_bug_count,
+                project.fixed_bug_count,
+                project.closed_bug_count,
+            ),
+            (total, waiting, working, fixed, closed)
+        )
+
+    def test_counters_on_create_and_status_change(self):
+        """Test the counters follow bug creation and status changes"""
+        bug = Bug.objects.create(
+            title='Test', project=self.proj, creator=self.member
+        )
+        Bug.objects.create(
+            title='Test2',
+            project=self.proj,
+            creator=self.member,
+            _status='FIXED'
+        )
+        self.assertCounters(self.proj, 2, 1, 0, 1, 0)
+        self.assertEqual(self.proj.active_bug_count, 1)
+
+        bug = Bug.objects.get(pk=bug.pk)
+        bug.set_status('BEING WORKED')
+        bug.save()
+        self.assertCounters(self.proj, 2, 0, 1, 1, 0)
+
+        bug.set_status('CLOSED')
+        bug.save()
+        bug.save()
+        self.assertCounters(self.proj, 2, 0, 0, 1, 1)
+
+    def test_counters_on_concurrent_change(self):
+        """Test a bug changed since it was loaded is counted once"""
+        bug = Bug.objects.create(
+            title='Test', project=self.proj, creator=self.member
+        )
+        first, second = Bug.objects.get(pk=bug.pk), Bug.objects.get(pk=bug.pk)
+
+        first.set_status('BEING WORKED')
+        first.save()
+        second.set_status('BEING WORKED')
+        second.save()
+        self.assertCounters(self.proj, 1, 0, 1, 0, 0)
+
+        first.set_status('WAITING')
+        first.save()
+        self.assertCounters(self.proj, 1, 1, 0, 0, 0)
+
+    def test_counters_on_delete_and_project_change(self):
+        """Test the counters follow bug deletion and project changes"""
+        other = Project.objects.create(title='Other')
+        bug = Bug.objects.create(
+            title='Test', project=self.proj, creator=self.member
+        )
+        Bug.objects.create(
+            title='Test2', project=self.proj, creator=self.member
+        )
+
+        bug.project = other
+        bug.save()
+        self.assertCounters(self.proj, 1, 1, 0, 0, 0)
+        self.assertCounters(other, 1, 1, 0, 0, 0)
+
+        self.proj.bugs.all().delete()
+        self.assertCounters(self.proj, 0, 0, 0, 0, 0)
+        self.assertCounters(other, 1, 1, 0, 0, 0)
+
+    def test_rebuild_bug_counters_command(self):
+        """Test the rebuild command reports and fixes drifted counters"""
+        Bug.objects.create(
+            title='Test', project=self.proj, creator=self.member
+        )
+        call_command('rebuild_bug_counters', '--check', stdout=StringIO())
+
+        Bug.objects.filter(project=self.proj).update(_status='FIXED')
+        with self.assertRaises(CommandError):
+            call_command('rebuild_bug_counters', '--check', stdout=StringIO())
+
+        call_command('rebuild_bug_counters', stdout=StringIO())
+        self.assertCounters(self.proj, 1, 0, 0, 1, 0)
+        call_command('rebuild_bug_counters', '--check', stdout=StringIO())
+
+
+class StatusTransitionTests(TestCase):
+    """Test the status history and times kept by the bug model"""
+
+    def setUp(self):
+        self.member = get_user_model().objects.create_user(
+            name='Test Member',
+            email='test@gotmail.com',
+            password='testpass'
+        )
+        self.proj = Project.objects.create(title='Test')
+        self.bug = Bug.objects.create(
+            title='Test', project=self.proj, creator=self.member
+        )
+
+    def change_status(self, status, hours):
+        """Change the status of the bug after hours in the current one"""
+        Bug.objects.filter(pk=self.bug.pk).update(
+            status_changed_at=self.bug.status_changed_at -
+            timedelta(hours=hours)
+        )
+        self.bug = Bug.objects.get(pk=self.bug.pk)
+        self.bug.set_status(status, changed_by=self.member)
+        self.bug.save()
+
+    def assertAbout(self, duration, hours):
+        """Assert the duration is the hours, give or take a minute"""
+        self.assertLess(
+            abs(duration - timedelta(hours=hours)), timedelta(minutes=1)
+        )
+
+    def test_transitions_recorded(self):
+        """Test each status change appends a transition"""
+        self.change_status('BEING WORKED', 2)
+        self.bug.title = 'Renamed'
+        self.bug.save()
+        self.change_status('FIXED', 3)
+
+        transitions = list(self.bug.transitions.order_by('id'))
+        self.assertEqual(
+            [(t.from_status, t.to_status) for t in transitions],
+            [('', 'WAITING'), ('WAITING', 'BEING WORKED'),
+             ('BEING WORKED', 'FIXED')]
+        )
+        self.assertTrue(all(t.changed_by == self.member for t in transitions))
+        self.assertTrue(all(t.project == self.proj for t in transitions))
+        self.assertIsNone(transitions[0].elapsed)
+        self.assertAbout(transitions[1].elapsed, 2)
+        self.assertAbout(transitions[2].elapsed, 3)
+
+    def test_status_times(self):
+        """Test the time spent in each active status is summed"""
+        self.change_status('BEING WORKED', 2)
+        self.change_status('WAITING', 1)
+        self.change_status('BEING WORKED', 4)
+        self.change_status('CLOSED', 3)
+
+        self.bug.refresh_from_db()
+        self.assertAbout(self.bug.waiting_time, 6)
+        self.assertAbout(self.bug.working_time, 4)
+        self.assertEqual(StatusTransition.objects.count(), 5)
+
+    def test_project_fix_times(self):
+        """Test the projects sum the times of their fixed bugs"""
+        other = Project.objects.create(title='Other')
+        self.change_status('BEING WORKED', 2)
+        self.change_status('FIXED', 3)
+
+        self.proj.refresh_from_db()
+        self.assertAbout(self.proj.fixed_waiting_time, 2)
+        self.assertAbout(self.proj.fixed_working_time, 3)
+        self.assertAbout(self.proj.mean_time_to_fix, 5)
+        self.assertIsNone(other.mean_time_to_fix)
+
+        self.bug.project = other
+        self.bug.save()
+        self.proj.refresh_from_db()
+        other.refresh_from_db()
+        self.assertEqual(self.proj.fixed_working_time, timedelta())
+        self.assertAbout(other.fixed_working_time, 3)
+        call_command('rebuild_bug_counters', '--check', stdout=StringIO())
+
+        self.change_status('WAITING', 1)
+        other.refresh_from_db()
+        self.assertEqual(other.fixed_waiting_time, timedelta())
+        self.assertEqual(other.fixed_working_time, timedelta())
+        self.assertIsNone(other.mean_time_to_fix)
+        call_command('rebuild_bug_counters', '--check', stdout=StringIO())
+
+        self.change_status('FIXED', 1)
+        out = StringIO()
+        call_command('report_fix_times', stdout=out)
+        self.assertIn('%8d  %-30s %7d %10.1f %10.1f %10.1f' % (
+            other.id, 'Other', 1, 3, 3, 6
+        ), out.getvalue())
+        self.assertNotIn('Test ', out.getvalue())
+
+        self.bug.delete()
+        other.refresh_from_db()
+        self.assertEqual(other.fixed_waiting_time, timedelta())
+        call_command('rebuild_bug_counters', '--check', stdout=StringIO())
+
 
 class MessageModelTest(TestCase):
     """Test the message model"""
@@ -0,0 +1,156 @@
+from datetime import datetime, time, timedelta
+from io import StringIO
+
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.utils import timezone
+
+from bugs.models import Bug, DailyBugStats, RollupWatermark, StatusTransition
+from bugs.rollups import project_metrics, roll_up_bug_stats
+from projects.models import Project
+
+
+class RollupTests(TestCase):
+    """Test the daily rollups of the bug status transitions"""
+
+    def setUp(self):
+        self.member = get_user_model().objects.create_user(
+            name='Test Member',
+            email='test@gotmail.com',
+            password='testpass'
+        )
+        self.proj = Project.objects.create(title='Test')
+        self.other = Project.objects.create(title='Other')
+        today = timezone.localdate()
+        self.days = [today - timedelta(days=3 - i) for i in range(3)]
+
+    def at(self, day, hour):
+        """Return the local time of the hour on one of the days"""
+        return timezone.make_aware(
+            datetime.combine(self.days[day], time(hour))
+        )
+
+    def create_bug(self, day, hour, project=None):
+        """Create a bug as if reported at the hour of the day"""
+        bug = Bug.objects.create(
+            title='Test', project=project or self.proj, creator=self.member
+        )
+        Bug.objects.filter(pk=bug.pk).update(creationDate=self.at(day, hour))
+        bug.transitions.update(changed_at=self.at(day, hour))
+        return Bug.objects.get(pk=bug.pk)
+
+    def change(self, bug, day, hour, status=None, project=None):
+        """Change the status or project of the bug at the hour of the day"""
+        if status is not None:
+            bug.set_status(status, changed_by=self.member)
+        if project is not None:
+            bug.project = project
+        bug.save()
+        bug.transitions.filter(pk=bug.transitions.latest('id').pk).update(
+            changed_at=self.at(day, hour)
+        )
+
+    def stats(self):
+        """Return the rollup rows, without their ids"""
+        return {
+            (row.project_id, row.day, row.status): (
+                row.entered, row.left, row.created, row.closed,
+                row.time_to_close,
+            )
+            for row in DailyBugStats.objects.all()
+        }
+
+    def test_roll_up_days(self):
+        """Test the transitions are counted per project, day and status"""
+        first = self.create_bug(0, 10)
+        self.change(first, 1, 10, status='FIXED')
+        second = self.create_bug(1, 12)
+        self.change(second, 2, 9, project=self.other)
+
+        self.assertEqual(roll_up_bug_stats(settle=timedelta()), 3)
+        day0, day1, day2 = self.days
+        zero = timedelta()
+        self.assertEqual(self.stats(), {
+            (self.proj.id, day0, 'WAITING'): (1, 0, 1, 0, zero),
+            (self.proj.id, day1, 'WAITING'): (1, 1, 1, 0, zero),
+            (self.proj.id, day1, 'FIXED'): (1, 0, 0, 1, timedelta(days=1)),
+            (self.proj.id, day2, 'WAITING'): (0, 1, 0, 0, zero),
+            (self.other.id, day2, 'WAITING'): (1, 0, 0, 0, zero),
+        })
+
+        metrics = project_metrics(self.proj, day0, day2)
+        self.assertEqual(
+            [(day['created'], day['closed'], day['mean_time_to_close'],
+              day['open_bugs'], day['closed_bugs']) for day in metrics],
+            [(1, 0, None, 1, 0), (1, 1, timedelta(days=1), 1, 1),
+             (0, 0, None, 0, 1)]
+        )
+        self.assertEqual(
+            project_metrics(self.other, day2, day2)[0]['open_bugs'], 1
+        )
+        self.assertEqual(
+            project_metrics(self.proj, day1, day1)[0]['open_bugs'], 1
+        )
+
+    def test_bugs_created_closed_not_counted_as_closed(self):
+        """Test a bug first logged in a closed status was not closed then"""
+        bug = self.create_bug(0, 10)
+        Bug.objects.filter(pk=bug.pk).update(_status='FIXED')
+        bug.transitions.update(to_status='FIXED')
+
+        roll_up_bug_stats(settle=timedelta())
+        self.assertEqual(self.stats(), {
+            (self.proj.id, self.days[0], 'FIXED'): (
+                1, 0, 1, 0, timedelta()
+            ),
+        })
+
+        metrics = project_metrics(self.proj, self.days[0], self.days[0])
+        self.assertEqual(metrics[0]['closed'], 0)
+        self.assertIsNone(metrics[0]['mean_time_to_close'])
+        self.assertEqual(metrics[0]['closed_bugs'], 1)
+
+    def test_only_changed_days_rolled_up(self):
+        """Test a run computes again only the days of new transitions"""
+        bug = self.create_bug(0, 10)
+        self.create_bug(1, 10)
+        roll_up_bug_stats(settle=timedelta())
+        DailyBugStats.objects.filter(day=self.days[0]).update(entered=9)
+
+        self.assertEqual(roll_up_bug_stats(settle=timedelta()), 0)
+        self.change(bug, 1, 12, status='BEING WORKED')
+        self.assertEqual(roll_up_bug_stats(settle=timedelta()), 1)
+        stats = self.stats()
+        self.assertEqual(stats[self.proj.id, self.days[0], 'WAITING'][0], 9)
+        self.assertEqual(
+            stats[self.proj.id, self.days[1], 'WAITING'][:2], (1, 1)
+        )
+
+        roll_up_bug_stats(settle=timedelta(), full=True)
+        stats = self.stats()
+        self.assertEqual(stats[self.proj.id, self.days[0], 'WAITING'][0], 1)
+
+    def test_watermark_waits_for_settle(self):
+        """Test recent transitions are left to a later run"""
+        self.create_bug(0, 10)
+        bug = Bug.objects.create(
+            title='Now', project=self.proj, creator=self.member
+        )
+
+        roll_up_bug_stats(settle=timedelta(minutes=1))
+        watermark = RollupWatermark.objects.get()
+        self.assertLess(watermark.last_id, bug.transitions.get().id)
+
+        roll_up_bug_stats(settle=timedelta())
+        watermark.refresh_from_db()
+        self.assertEqual(
+            watermark.last_id, StatusTransition.objects.latest('id').id
+        )
+
+    def test_rollup_bug_stats_command(self):
+        """Test the command reports the days rolled up"""
+        self.create_bug(0, 10)
+        out = StringIO()
+        call_command('rollup_bug_stats', '--settle', '0', stdout=out)
+        self.assertIn('Rolled up 1 day(s)', out.getvalue())
@@ -13,6 +13,12 @@ class BugsUrlTests(SimpleTestCase):
         urlViewClass = resolve(url).func.view_class
         self.assertEqual(urlViewClass, views.BugListView)
 
+    def test_bug_search_url(self):
+        """Test the bug search view url"""
+        url = reverse('bugs:search')
+        urlViewClass = resolve(url).func.view_class
+        self.assertEqual(urlViewClass, views.BugSearchView)
+
     def test_bug_detail_url(self):
         """Test the bug detail view url"""
         url = reverse('bugs:detail', args=[1])
@@ -58,3 +64,9 @@ class MessagesUrlTests(SimpleTestCase):
         url = reverse('bugs:create_message', args=[1])
         urlViewClass = resolve(url).func.view_class
         self.assertEqual(urlViewClass, views.MessageCreateView)
+
+    def test_newer_messages_url(self):
+        """Test the newer messages url"""
+        url = reverse('bugs:newer_messages', args=[1])
+        urlViewClass = resolve(url).func.view_class
+        self.assertEqual(urlViewClass, views.MessageNewerView)
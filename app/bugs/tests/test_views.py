@@ -1,10 +1,18 @@
 import datetime
+from unittest import mock
 
+from django.db import connection
 from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
 
 from core import utils
+from core.jobs import run_next_job
+from core.models import Job
 from bugs.models import Bug, Message
+from bugs.search import search_bugs
+from bugs.views import BugListView, BugSearchView
 
 
 class TestBugViewsPermissions(TestCase):
@@ -231,7 +239,7 @@ class TestBugListView(TestCase):
 
         self.assertEqual(res.status_code, 200)
         self.assertTemplateUsed(res, 'bugs/list.html')
-        self.assertFalse(res.context['bugs'].exists())
+        self.assertFalse(res.context['bugs'])
         self.assertContains(res, 'No bugs found')
 
     def test_bug_list_basic(self):
@@ -296,6 +304,329 @@ class TestBugListView(TestCase):
             [repr(bug) for bug in queryset],
         )
 
+    def test_bug_list_keyset_pagination(self):
+        """Test the bug list is paginated by cursor on creation date and id"""
+        bugs = [
+            utils.sample_bug(
+                creator=self.member, project=self.project, title=str(i)
+            )
+            for i in range(5)
+        ]
+        Bug.objects.filter(id__in=[b.id for b in bugs[:2]]).update(
+            creationDate=bugs[0].creationDate
+        )
+        expected = list(Bug.objects.order_by('-creationDate', 'id'))
+
+        with mock.patch.object(BugListView, 'paginate_by', 2):
+            res = self.client.get(self.list_url)
+            first_page = res.context['page_obj']
+            self.assertEqual(list(res.context['bugs']), expected[:2])
+            self.assertFalse(first_page.has_previous())
+            self.assertTrue(first_page.has_next())
+
+            res = self.client.get(
+                self.list_url, {'cursor': first_page.next_cursor}
+            )
+            second_page = res.context['page_obj']
+            self.assertEqual(list(res.context['bugs']), expected[2:4])
+            self.assertTrue(second_page.has_previous())
+
+            res = self.client.get(
+                self.list_url, {'cursor': second_page.next_cursor}
+            )
+            self.assertEqual(list(res.context['bugs']), expected[4:])
+            self.assertFalse(res.context['page_obj'].has_next())
+
+            res = self.client.get(
+                self.list_url, {'cursor': second_page.previous_cursor}
+            )
+            self.assertEqual(list(res.context['bugs']), expected[:2])
+
+    def test_bug_list_seek_starts_index_scan_at_cursor(self):
+        """Test the next pages are a range of the keyset index"""
+        for i in range(3):
+            utils.sample_bug(
+                creator=self.member, project=self.project, _status='FIXED'
+            )
+
+        with mock.patch.object(BugListView, 'paginate_by', 1):
+            res = self.client.get(self.list_url, {'show_inactive': 1})
+            with CaptureQueriesContext(connection) as queries:
+                self.client.get(self.list_url, {
+                    'show_inactive': 1,
+                    'cursor': res.context['page_obj'].next_cursor,
+                })
+
+        seek = next(
+            query['sql'] for query in queries.captured_queries
+            if query['sql'].startswith('SELECT') and
+            '"bugs_bug"."creationDate" <' in query['sql']
+        )
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+            cursor.execute('SET LOCAL enable_bitmapscan = off')
+            cursor.execute('EXPLAIN ' + seek)
+            plan = '\n'.join(row[0] for row in cursor.fetchall())
+
+        self.assertIn('bug_creation_keyset_idx', plan)
+        self.assertRegex(plan, r'Index Cond: .*"creationDate" <=')
+
+    def test_bug_list_pagination_keeps_show_inactive(self):
+        """Test the page links keep the show_inactive filter"""
+        for status in ['FIXED', 'CLOSED', 'WAITING']:
+            utils.sample_bug(
+                creator=self.member, project=self.project, _status=status
+            )
+
+        with mock.patch.object(BugListView, 'paginate_by', 2):
+            res = self.client.get(self.list_url, {'show_inactive': 1})
+            next_cursor = res.context['page_obj'].next_cursor
+            self.assertContains(
+                res, '?show_inactive=1&cursor=' + next_cursor
+            )
+
+            res = self.client.get(
+                self.list_url, {'show_inactive': 1, 'cursor': next_cursor}
+            )
+            self.assertEqual(len(res.context['bugs']), 1)
+
+    def test_bug_list_constant_number_of_queries(self):
+        """Test rendering the bug list costs the same for any number of rows"""
+        def count_queries():
+            with CaptureQueriesContext(connection) as queries:
+                res = self.client.get(self.list_url)
+            self.assertEqual(res.status_code, 200)
+            return len(queries)
+
+        bug = utils.sample_bug(creator=self.member, project=self.project)
+        bug.assigned_members.add(self.member)
+        num_queries = count_queries()
+
+        other_project = utils.sample_project(title='Other')
+        for i in range(5):
+            bug = utils.sample_bug(creator=self.member, project=other_project)
+            bug.assigned_members.add(self.member)
+
+        self.assertEqual(count_queries(), num_queries)
+
+    def test_bug_list_invalid_cursor(self):
+        """Test an invalid cursor returns a bad request"""
+        res = self.client.get(self.list_url, {'cursor': 'not-a-cursor'})
+        self.assertEqual(res.status_code, 400)
+
+        for values in ([[1], 1], [{'a': 1}, 1], [None, 'one']):
+            cursor = utils.encode_cursor('n', values)
+            res = self.client.get(self.list_url, {'cursor': cursor})
+            self.assertEqual(res.status_code, 400)
+
+
+class TestBugSearchView(TestCase):
+    """Test the bug search view"""
+
+    def setUp(self):
+        self.search_url = reverse('bugs:search')
+
+        self.member = utils.sample_member()
+        self.superuser = utils.sample_superuser()
+        self.project = utils.sample_project()
+        self.project.members.add(self.member)
+        self.other_project = utils.sample_project(title='Other')
+
+        self.client = Client()
+        self.client.force_login(self.member)
+
+    def run_jobs(self):
+        """Run the queued refreshes of the search vectors"""
+        while run_next_job():
+            pass
+
+    def search(self, text):
+        """Search for the text and return the found bugs"""
+        self.run_jobs()
+        res = self.client.get(self.search_url, {'q': text})
+        self.assertEqual(res.status_code, 200)
+        return list(res.context['bugs'])
+
+    def test_bug_search_invalid_cursor(self):
+        """Test a cursor holding an invalid rank returns a bad request"""
+        utils.sample_bug(
+            creator=self.member, project=self.project, title='Crash'
+        )
+        for values in (['abc', 1], [[1], 1], [{'a': 1}, 1]):
+            res = self.client.get(self.search_url, {
+                'q': 'crash', 'cursor': utils.encode_cursor('n', values)
+            })
+            self.assertEqual(res.status_code, 400)
+
+    def test_bug_search_empty_query(self):
+        """Test no bugs are returned if nothing is searched for"""
+        utils.sample_bug(creator=self.member, project=self.project)
+
+        res = self.client.get(self.search_url)
+
+        self.assertEqual(res.status_code, 200)
+        self.assertTemplateUsed(res, 'bugs/search.html')
+        self.assertFalse(res.context['bugs'])
+
+    def test_bug_search_title_description_and_messages(self):
+        """Test bugs are found by title, description and board messages"""
+        in_title = utils.sample_bug(
+            creator=self.member, project=self.project, title='Crash on save'
+        )
+        in_description = utils.sample_bug(
+            creator=self.member,
+            project=self.project,
+            title='Editor problem',
+            description='The editor crashes when saving files'
+        )
+        in_message = utils.sample_bug(
+            creator=self.member, project=self.project, title='Slow startup'
+        )
+        Message.objects.create(
+            content='It also crashed while saving here',
+            writer=self.member,
+            bug=in_message
+        )
+        utils.sample_bug(
+            creator=self.member, project=self.project, title='Unrelated'
+        )
+
+        self.assertEqual(
+            self.search('crash'), [in_title, in_description, in_message]
+        )
+
+    def test_bug_search_updates_on_edit(self):
+        """Test the search reflects changes on the bug text"""
+        bug = utils.sample_bug(
+            creator=self.member, project=self.project, title='Old title'
+        )
+        bug.title = 'Memory leak'
+        bug.save()
+
+        # The search vector is refreshed by a job committed with the save
+        res = self.client.get(self.search_url, {'q': 'leak'})
+        self.assertEqual(list(res.context['bugs']), [])
+        self.assertEqual(self.search('leak'), [bug])
+        self.assertEqual(self.search('old'), [])
+
+    def test_bug_search_refreshed_only_on_text_changes(self):
+        """Test only saves changing the bug text queue a refresh"""
+        bug = utils.sample_bug(creator=self.member, project=self.project)
+        self.assertEqual(
+            list(Job.objects.values_list('task', 'args')),
+            [('bugs.tasks.refresh_search_vector', [bug.pk])]
+        )
+        self.run_jobs()
+
+        bug._status = 'BEING WORKED'
+        bug.save(update_fields=['_status'])
+        self.assertFalse(Job.objects.exists())
+
+        bug.description = 'Crashes on startup'
+        bug.save(update_fields=['description'])
+        self.assertEqual(Job.objects.count(), 1)
+        self.assertEqual(self.search('startup'), [bug])
+
+    def test_bug_search_only_visible_projects(self):
+        """Test only bugs of projects the user is part of are found"""
+        visible = utils.sample_bug(
+            creator=self.member, project=self.project, title='Broken login'
+        )
+        hidden = utils.sample_bug(
+            creator=self.member,
+            project=self.other_project,
+            title='Broken login page'
+        )
+
+        self.assertEqual(self.search('login'), [visible])
+
+        self.client.force_login(self.superuser)
+        self.assertEqual(set(self.search('login')), {visible, hidden})
+
+    def test_bug_search_pages_through_tied_ranks(self):
+        """Test paging through bugs of equal rank shows each one once"""
+        for title in ['Crash', 'Crash crash', 'Crash', 'Crash', 'Crash']:
+            utils.sample_bug(
+                creator=self.member, project=self.project, title=title
+            )
+        utils.sample_bug(
+            creator=self.member,
+            project=self.project,
+            title='Editor',
+            description='It crashes'
+        )
+        expected = self.search('crash')
+        self.assertEqual(len(expected), 6)
+
+        pages = []
+        with mock.patch.object(BugSearchView, 'paginate_by', 2):
+            params = {'q': 'crash'}
+            for _ in expected:
+                res = self.client.get(self.search_url, params)
+                page = res.context['page_obj']
+                pages.append(list(res.context['bugs']))
+                if not page.has_next():
+                    break
+                params['cursor'] = page.next_cursor
+
+            res = self.client.get(
+                self.search_url, {'q': 'crash', 'cursor': page.previous_cursor}
+            )
+            self.assertEqual(list(res.context['bugs']), expected[2:4])
+
+        self.assertEqual(sum(pages, []), expected)
+        self.assertEqual(expected[0].title, 'Crash crash')
+        self.assertEqual(expected[-1].title, 'Editor')
+
+    def test_bug_search_ranks_newest_candidates(self):
+        """Test only the newest matching bugs are ranked"""
+        bugs = [
+            utils.sample_bug(
+                creator=self.member, project=self.project, title=title
+            )
+            for title in ['Crash crash', 'Crash', 'Crash']
+        ]
+
+        self.run_jobs()
+        found, results_cut = search_bugs(
+            Bug.objects.all(), 'crash', candidates=2
+        )
+
+        self.assertEqual(set(found), set(bugs[1:]))
+        self.assertTrue(results_cut)
+
+    def test_bug_search_shows_results_cut(self):
+        """Test the search tells when older matches were left out"""
+        for title in ['Crash crash', 'Crash', 'Crash']:
+            utils.sample_bug(
+                creator=self.member, project=self.project, title=title
+            )
+        self.run_jobs()
+
+        with mock.patch.object(BugSearchView, 'candidates', 2):
+            res = self.client.get(self.search_url, {'q': 'crash'})
+            self.assertTrue(res.context['results_cut'])
+            self.assertContains(res, 'Only the 2 newest bugs matching')
+            self.assertEqual(len(res.context['bugs']), 2)
+
+        with mock.patch.object(BugSearchView, 'candidates', 3):
+            res = self.client.get(self.search_url, {'q': 'crash'})
+            self.assertFalse(res.context['results_cut'])
+            self.assertNotContains(res, 'newest bugs matching')
+
+    def test_bug_search_highlights_escaped(self):
+        """Test matches are highlighted and the bug text is escaped"""
+        utils.sample_bug(
+            creator=self.member,
+            project=self.project,
+            title='<b>Overflow</b> in parser'
+        )
+
+        self.run_jobs()
+        res = self.client.get(self.search_url, {'q': 'overflow'})
+
+        self.assertContains(res, '&lt;b&gt;<mark>Overflow</mark>&lt;/b&gt;')
+
 
 class TestBugDetailView(TestCase):
     """Test the bug detail view"""
@@ -378,6 +709,9 @@ class TestBugDetailView(TestCase):
         self.client.force_login(self.supervisor)
         res = self.client.get(self.detail_url)
         self.assertContains(res, 'Assign a member')
+        self.assertContains(
+            res, '?bug=%d&amp;scope=non_assigned' % self.bug.id
+        )
 
         self.client.force_login(self.assigned)
         res = self.client.get(self.detail_url)
@@ -736,6 +1070,13 @@ class TestBugChangeStatusView(TestCase):
         self.assertEqual(self.bug.status, 'FIXED')
         self.assertEqual(self.bug.closingDate.date(), datetime.date.today())
 
+        transition = self.bug.transitions.latest('id')
+        self.assertEqual(
+            (transition.from_status, transition.to_status),
+            ('WAITING', 'FIXED')
+        )
+        self.assertEqual(transition.changed_by, self.supervisor)
+
     def test_bug_change_status_view_error(self):
         """Test the bug 'change_status' view raises errors when needed"""
         res = self.client.post(self.change_status_url)
@@ -899,3 +1240,212 @@ class TestMessageViews(TestCase):
         res = self.client.post(self.message_create_url, {'content': ''})
         self.assertEqual(res.status_code, 400)
         self.assertFalse(Message.objects.exists())
+
+    def write_messages(self, count, bug=None):
+        """Write messages one minute apart, returning them oldest first"""
+        start = timezone.now() - datetime.timedelta(hours=1)
+        messages = []
+        for i in range(count):
+            message = Message.objects.create(
+                content='Message %d' % i,
+                bug=bug or self.bug,
+                writer=self.member
+            )
+            message.creationDate = start + datetime.timedelta(minutes=i)
+            Message.objects.filter(pk=message.pk) \
+                .update(creationDate=message.creationDate)
+            messages.append(message)
+
+        return messages
+
+    def test_bug_detail_messages_paginated(self):
+        """Test the bug board is paginated by cursor, newest first"""
+        messages = self.write_messages(5)
+        detail_url = reverse('bugs:detail', args=[self.bug.id])
+        self.client.force_login(self.member)
+
+        with mock.patch('bugs.views.MESSAGES_PER_PAGE', 2):
+            res = self.client.get(detail_url)
+            first_page = res.context['messages']
+            self.assertEqual(list(first_page), messages[:2:-1])
+            self.assertContains(res, 'data-newer-messages-url')
+
+            res = self.client.get(
+                detail_url, {'cursor': first_page.next_cursor}
+            )
+            self.assertEqual(list(res.context['messages']), messages[2:0:-1])
+            self.assertNotContains(res, 'data-newer-messages-url')
+
+            res = self.client.get(detail_url, {'cursor': 'invalid'})
+            self.assertEqual(res.status_code, 400)
+
+    def test_bug_detail_messages_constant_queries(self):
+        """Test the message writers are loaded with the messages"""
+        detail_url = reverse('bugs:detail', args=[self.bug.id])
+        self.client.force_login(self.member)
+        self.write_messages(1)
+        self.client.get(detail_url)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(detail_url)
+
+        self.write_messages(5)
+        with self.assertNumQueries(len(queries)):
+            self.client.get(detail_url)
+
+    def test_newer_messages_view_permissions(self):
+        """Test only project members can fetch the newer messages"""
+        newer_url = reverse('bugs:newer_messages', args=[self.bug.id])
+
+        res = self.client.get(newer_url)
+        self.assertEqual(res.status_code, 302)
+
+        self.client.force_login(self.non_member)
+        res = self.client.get(newer_url)
+        self.assertEqual(res.status_code, 403)
+
+        self.client.force_login(self.member)
+        res = self.client.get(newer_url)
+        self.assertEqual(res.status_code, 200)
+
+    def test_newer_messages_view_html_fragment(self):
+        """Test the view renders only the messages after the given one"""
+        messages = self.write_messages(4)
+        self.write_messages(2, bug=utils.sample_bug(
+            creator=self.member, project=self.project
+        ))
+        newer_url = reverse('bugs:newer_messages', args=[self.bug.id])
+        self.client.force_login(self.member)
+
+        res = self.client.get(newer_url, {'after': messages[1].id})
+
+        self.assertEqual(res.status_code, 200)
+        self.assertTemplateUsed(res, 'bugs/message_list.html')
+        self.assertTemplateNotUsed(res, 'core/base.html')
+        self.assertEqual(list(res.context['messages']), messages[:1:-1])
+        self.assertNotIn('X-More-Messages', res)
+
+        res = self.client.get(newer_url, {'after': messages[-1].id})
+        self.assertEqual(res.content.strip(), b'')
+
+    def test_newer_messages_view_json(self):
+        """Test the view returns json and flags when more messages exist"""
+        messages = self.write_messages(4)
+        newer_url = reverse('bugs:newer_messages', args=[self.bug.id])
+        self.client.force_login(self.member)
+
+        with mock.patch('bugs.views.MESSAGES_PER_PAGE', 2):
+            res = self.client.get(
+                newer_url, {'after': messages[0].id, 'format': 'json'}
+            )
+            data = res.json()
+            self.assertEqual(
+                [m['id'] for m in data['messages']],
+                [messages[2].id, messages[1].id]
+            )
+            self.assertEqual(data['messages'][0]['content'], 'Message 2')
+            self.assertEqual(
+                data['messages'][0]['writer']['id'], self.member.id
+            )
+            self.assertTrue(data['has_more'])
+
+            res = self.client.get(
+                newer_url,
+                {'after': messages[2].id},
+                HTTP_ACCEPT='application/json'
+            )
+            self.assertEqual(
+                [m['id'] for m in res.json()['messages']], [messages[3].id]
+            )
+            self.assertFalse(res.json()['has_more'])
+
+    def test_newer_messages_view_invalid_id(self):
+        """Test the view rejects ids of messages not in the bug board"""
+        other_message = self.write_messages(1, bug=utils.sample_bug(
+            creator=self.member, project=self.project
+        ))[0]
+        newer_url = reverse('bugs:newer_messages', args=[self.bug.id])
+        self.client.force_login(self.member)
+
+        for after in ['string', 98765, other_message.id]:
+            res = self.client.get(newer_url, {'after': after})
+            self.assertEqual(res.status_code, 400)
+
+
+class BugDetailConditionalGetTests(TestCase):
+    """Test the bug page is not sent again while it does not change"""
+
+    def setUp(self):
+        self.member = utils.sample_member()
+        self.outsider = utils.sample_member(email='outsider@mail.com')
+        self.project = utils.sample_project()
+        self.project.members.add(self.member)
+        self.bug = utils.sample_bug(creator=self.member, project=self.project)
+        self.url = reverse('bugs:detail', args=[self.bug.id])
+
+        self.client.force_login(self.member)
+        # The first page sets the CSRF cookie its ETag depends on
+        self.assertNotIn('ETag', self.client.get(self.url))
+        self.etag = self.client.get(self.url)['ETag']
+
+    def revalidate(self):
+        return self.client.get(self.url, HTTP_IF_NONE_MATCH=self.etag)
+
+    def test_not_modified(self):
+        """Test an unchanged page costs the session, user and bug queries"""
+        with self.assertNumQueries(3):
+            res = self.revalidate()
+
+        self.assertEqual(res.status_code, 304)
+        self.assertEqual(res['ETag'], self.etag)
+        self.assertIn('no-cache', res['Cache-Control'])
+
+    def test_modified(self):
+        """Test every change shown on the page makes it sent again"""
+        def rename_bug():
+            self.bug.title = 'Renamed'
+            self.bug.save(update_fields=['title'])
+
+        def rename_project():
+            self.project.title = 'Renamed'
+            self.project.save()
+
+        def rename_creator():
+            self.member.name = 'Renamed'
+            self.member.save()
+
+        changes = [
+            rename_bug,
+            lambda: self.bug.assigned_members.add(self.member),
+            lambda: Message.objects.create(
+                writer=self.member, bug=self.bug, content='Found it'
+            ),
+            rename_project,
+            rename_creator,
+        ]
+        for change in changes:
+            change()
+            res = self.revalidate()
+            self.assertEqual(res.status_code, 200)
+            self.assertNotEqual(res['ETag'], self.etag)
+            self.etag = res['ETag']
+
+    def test_viewer_in_validator(self):
+        """Test the page of another viewer or a former member is rendered"""
+        superuser = utils.sample_superuser()
+        self.client.force_login(superuser)
+        self.assertEqual(self.revalidate().status_code, 200)
+
+        self.client.force_login(self.outsider)
+        self.assertEqual(self.revalidate().status_code, 403)
+
+        self.client.force_login(self.member)
+        self.project.members.remove(self.member)
+        self.assertEqual(self.revalidate().status_code, 403)
+
+    def test_flash_messages_rendered(self):
+        """Test pages with flash messages to show are always rendered"""
+        storage = mock.MagicMock()
+        storage.__len__.return_value = 1
+        with mock.patch('core.mixins.get_messages', return_value=storage):
+            self.assertEqual(self.revalidate().status_code, 200)
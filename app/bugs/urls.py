@@ -7,6 +7,7 @@ app_name = 'bugs'
 
 urlpatterns = [
     path('', views.BugListView.as_view(), name='list'),
+    path('search', views.BugSearchView.as_view(), name='search'),
     path('<int:pk>', views.BugDetailView.as_view(), name='detail'),
     path('create', views.BugCreateView.as_view(), name='create'),
     path('<int:pk>/edit', views.BugUpdateView.as_view(), name='update'),
@@ -35,4 +36,9 @@ urlpatterns = [
         views.MessageCreateView.as_view(),
         name='create_message'
     ),
+    path(
+        '<int:pk>/messages/newer',
+        views.MessageNewerView.as_view(),
+        name='newer_messages'
+    ),
 ]
@@ -1,5 +1,6 @@
-from django.urls import reverse_lazy
-from django.shortcuts import redirect, get_object_or_404
+from django.urls import reverse, reverse_lazy
+from django.shortcuts import redirect, render
+from django.http import JsonResponse
 from django.core.exceptions import SuspiciousOperation
 from django.core.exceptions import PermissionDenied
 from django.utils import timezone
@@ -11,21 +12,41 @@ from django.views.generic.edit import CreateView, UpdateView
 from django.contrib.auth.mixins import LoginRequiredMixin
 
 from .models import Bug, Message
+from .events import publish_bug_event
+from .search import SEARCH_CANDIDATES, search_bugs
 from .forms import BugCreateForm, BugUpdateForm, BugCreatorUpdateForm
 from core.mixins import \
+    ConditionalGetMixin, \
     IsInProjectMixin, \
     IsSupervisorMixin, \
     IsSupervisorOrAssignedMixin, \
-    IsCreatorMixin
-from members.models import Member
+    IsCreatorMixin, \
+    KeysetPaginationMixin
+from core.pagination import InvalidCursor, KeysetPaginator
+from projects.membership import NotProjectMemberError, assign_bug_members
+from projects.roles import get_role_map
 
 
-class BugListView(LoginRequiredMixin, ListView):
+MESSAGES_PER_PAGE = 30
+
+
+def message_board_paginator(bug):
+    """Return a keyset paginator over the bug board, newest messages first"""
+    return KeysetPaginator(
+        bug.messages.select_related('writer'),
+        ('-creationDate', 'id'),
+        MESSAGES_PER_PAGE,
+    )
+
+
+class BugListView(LoginRequiredMixin, KeysetPaginationMixin, ListView):
     """View for listing bugs"""
     model = Bug
     template_name = 'bugs/list.html'
     context_object_name = 'bugs'
     login_url = reverse_lazy('members:login')
+    ordering = ('-creationDate', 'id')
+    paginate_by = 50
 
     def get_queryset(self):
         """Return the list of projects applting filters and ordering"""
@@ -33,32 +54,92 @@ class BugListView(LoginRequiredMixin, ListView):
             if self.request.GET.get('show_inactive') \
             else self.model.get_active().all()
 
-        return queryset.order_by('-creationDate')
+        return queryset.for_viewer(self.request.user) \
+            .order_by(*self.get_ordering())
+
+
+class BugSearchView(LoginRequiredMixin, KeysetPaginationMixin, ListView):
+    """View for searching bugs by their text and bug board messages"""
+    model = Bug
+    template_name = 'bugs/search.html'
+    context_object_name = 'bugs'
+    login_url = reverse_lazy('members:login')
+    ordering = ('-rank', 'id')
+    paginate_by = 20
+    # Number of the newest matching bugs ranked
+    candidates = SEARCH_CANDIDATES
 
+    def get_search_text(self):
+        """Return the text searched for"""
+        return self.request.GET.get('q', '').strip()
+
+    def get_queryset(self):
+        """Return the bugs visible to the user that match the search"""
+        self.results_cut = False
+        if not self.get_search_text():
+            return self.model.objects.none()
+
+        queryset = self.model.objects.select_related('project')
+        if not self.request.user.is_superuser:
+            member_of = get_role_map(self.request.user).member_of
+            queryset = queryset.filter(project_id__in=list(member_of))
+
+        bugs, self.results_cut = search_bugs(
+            queryset, self.get_search_text(), self.candidates
+        )
+        return bugs.order_by(*self.get_ordering())
+
+    def get_paginate_by(self, queryset):
+        """Only paginate when something was searched for"""
+        return self.paginate_by if self.get_search_text() else None
+
+    def get_context_data(self, **kwargs):
+        """Add the searched text and whether its results were cut"""
+        context = super().get_context_data(**kwargs)
+        context['search_text'] = self.get_search_text()
+        context['search_candidates'] = self.candidates
+        context['results_cut'] = self.results_cut
+        return context
 
-class BugDetailView(IsInProjectMixin, DetailView):
+
+class BugDetailView(ConditionalGetMixin, IsInProjectMixin, DetailView):
     """View for display bug detail"""
     model = Bug
     template_name = 'bugs/detail.html'
     context_object_name = 'bug'
 
+    def get_modified_state(self):
+        """Return the modification times of the bug and of its project"""
+        return self.model.objects.filter(pk=self.kwargs['pk']) \
+            .values('project_id', 'modified_at', 'project__modified_at') \
+            .first()
+
     def get_context_data(self, **kwargs):
         """Add additional data to the context"""
         context = super().get_context_data(**kwargs)
 
         context['isAdminOrSupervisor'] = (
             self.request.user.is_superuser or
-            self.request.user in self.object.project.supervisors.all()
+            self.object.is_project_supervisor
         )
 
         context['status_class'] = 'text-' + self.object.STATUS_CLASSES[
             self.object.status
         ]
 
-        context['messages'] = self.object.messages.order_by('-creationDate')
+        context['messages'] = self.get_message_page()
 
         return context
 
+    def get_message_page(self):
+        """Return the page of the bug board pointed by the request cursor"""
+        paginator = message_board_paginator(self.object)
+
+        try:
+            return paginator.get_page(self.request.GET.get('cursor'))
+        except InvalidCursor:
+            raise SuspiciousOperation('Invalid page cursor!')
+
 
 class BugCreateView(LoginRequiredMixin, CreateView):
     """View for creating bugs"""
@@ -79,8 +160,9 @@ class BugCreateView(LoginRequiredMixin, CreateView):
 
         self.object = form.save(commit=False)
 
+        member_of = get_role_map(self.request.user).member_of
         if not self.request.user.is_superuser and \
-                self.request.user not in self.object.project.members.all():
+                self.object.project_id not in member_of:
             raise PermissionDenied(
                 "A member cannot create a bug on a project it is not part of!"
             )
@@ -138,22 +220,17 @@ class BugAssignMemberView(IsSupervisorMixin, View):
     model = Bug
 
     def post(self, request, pk):
-        bug = get_object_or_404(Bug, pk=pk)
+        bug = self.get_object()
 
         member_ids = request.POST.getlist('member_ids')
         if not member_ids:
             raise SuspiciousOperation('Member id not sent!')
-        member_ids = [int(m_id) for m_id in member_ids]
 
         try:
-            for member_id in member_ids:
-                member = Member.objects.get(id=member_id)
-                if member not in bug.project.members.all():
-                    raise SuspiciousOperation(
-                        'Member must be part of bug project!'
-                    )
-                bug.assigned_members.add(member)
-        except Member.DoesNotExist:
+            assign_bug_members(bug, member_ids)
+        except NotProjectMemberError:
+            raise SuspiciousOperation('Member must be part of bug project!')
+        except ValueError:
             raise SuspiciousOperation('Invalid member id!')
 
         return redirect('bugs:detail', pk=pk)
@@ -164,20 +241,21 @@ class BugChangeStatusView(IsSupervisorMixin, View):
     model = Bug
 
     def post(self, request, pk):
-        bug = get_object_or_404(Bug, pk=pk)
+        bug = self.get_object()
         status = request.POST.get('status')
 
         if not status:
             raise SuspiciousOperation('New status must be sent in POST')
 
         try:
-            bug.set_status(status)
+            bug.set_status(status, changed_by=request.user)
         except ValueError:
             raise SuspiciousOperation('Invalid status')
         else:
             if status not in bug.ACTIVE_STATUS:
                 bug.closingDate = timezone.now()
             bug.save()
+            publish_bug_event(bug, 'status', status=bug.status)
 
         return redirect('bugs:detail', pk=pk)
 
@@ -187,7 +265,7 @@ class BugChangeWorkingStatusView(IsSupervisorOrAssignedMixin, View):
     model = Bug
 
     def post(self, request, pk):
-        bug = get_object_or_404(Bug, pk=pk)
+        bug = self.get_object()
         starting = request.POST.get('starting')
 
         if starting is None:
@@ -197,9 +275,11 @@ class BugChangeWorkingStatusView(IsSupervisorOrAssignedMixin, View):
 
         try:
             bug.set_status(
-                bug.WORKING_STATUS if int(starting) else bug.WAITING_STATUS
+                bug.WORKING_STATUS if int(starting) else bug.WAITING_STATUS,
+                changed_by=request.user,
             )
             bug.save()
+            publish_bug_event(bug, 'status', status=bug.status)
         except ValueError:
             raise SuspiciousOperation('Invalid status')
 
@@ -211,17 +291,82 @@ class MessageCreateView(IsInProjectMixin, View):
     model = Bug
 
     def post(self, request, pk):
-        bug = get_object_or_404(Bug, pk=pk)
+        bug = self.get_object()
 
         content = request.POST.get('content', None)
         if not content:
             raise SuspiciousOperation('Invalid message text!')
 
         content = str(content)
-        Message.objects.create(
+        message = Message.objects.create(
             content=content,
             writer=request.user,
             bug=bug
         )
+        publish_bug_event(bug, 'message', id=message.id)
 
         return redirect('bugs:detail', pk=pk)
+
+
+class MessageNewerView(IsInProjectMixin, View):
+    """Return the bug board messages newer than the 'after' message id
+
+    The messages are rendered as an html fragment of the board, or as json
+    when asked by the 'format' parameter or the Accept header. At most a
+    page of messages is returned, the closest to the given one, and the
+    client is told when there are more to fetch.
+    """
+    model = Bug
+
+    def get(self, request, pk):
+        bug = self.get_object()
+        paginator = message_board_paginator(bug)
+
+        try:
+            after = int(request.GET.get('after', 0))
+        except ValueError:
+            raise SuspiciousOperation('Invalid message id!')
+
+        if after:
+            message = bug.messages.filter(id=after) \
+                .only('id', 'creationDate').first()
+            if message is None:
+                raise SuspiciousOperation('Invalid message id!')
+            page = paginator.get_page_before(message)
+            has_more = page.has_previous()
+        else:
+            page = paginator.get_page()
+            has_more = False
+
+        if self.wants_json():
+            return JsonResponse({
+                'messages': [
+                    {
+                        'id': message.id,
+                        'writer': {
+                            'id': message.writer.id,
+                            'name': str(message.writer),
+                            'url': reverse(
+                                'members:detail', args=[message.writer.id]
+                            ),
+                        },
+                        'content': message.content,
+                        'creationDate': message.creationDate.isoformat(),
+                    }
+                    for message in page
+                ],
+                'has_more': has_more,
+            })
+
+        response = render(
+            request, 'bugs/message_list.html', {'messages': page}
+        )
+        if has_more:
+            response['X-More-Messages'] = '1'
+        return response
+
+    def wants_json(self):
+        """Return whether the client asked for a json response"""
+        if 'format' in self.request.GET:
+            return self.request.GET['format'] == 'json'
+        return 'application/json' in self.request.headers.get('Accept', '')
@@ -4,6 +4,7 @@ from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from members.models import Member
 from projects.models import Project
 from bugs.models import Bug
+from .models import Job
 
 
 class UserAdmin(BaseUserAdmin):
@@ -27,3 +28,4 @@ class UserAdmin(BaseUserAdmin):
 admin.site.register(Member, UserAdmin)
 admin.site.register(Project)
 admin.site.register(Bug)
+admin.site.register(Job)
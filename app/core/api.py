@@ -0,0 +1,232 @@
+"""
+Read-only JSON API over the bugs, projects, members and bug boards.
+
+Each resource declares the fields it can return and the fields asked for
+with the 'fields' parameter decide the query: only their columns are read
+with values(), foreign keys are joined in only for the nested fields asked
+for and each many to many field costs one query per page. Responses carry a
+strong ETag of their content, so a client revalidating an unchanged result
+gets an empty 304 response.
+"""
+from django.http import JsonResponse
+from django.utils.cache import \
+    get_conditional_response, patch_cache_control, set_response_etag
+from django.views.generic import View
+
+from .pagination import InvalidCursor, KeysetPaginator
+
+
+class ApiError(Exception):
+    """Raised to answer an API request with an error"""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+class Column:
+    """A field holding a column, possibly of an object joined in"""
+
+    def __init__(self, column):
+        self.columns = (column,)
+
+    def get(self, row, fetched):
+        return row[self.columns[0]]
+
+
+class Nested:
+    """A field holding some columns of a related object joined in"""
+
+    def __init__(self, **columns):
+        self.names = tuple(columns)
+        self.columns = tuple(columns.values())
+
+    def get(self, row, fetched):
+        if row[self.columns[0]] is None:
+            return None
+
+        return {
+            name: row[column] for name, column in zip(self.names, self.columns)
+        }
+
+
+class RelatedIds:
+    """A field listing the ids of the objects of a many to many relation
+
+    The ids of a whole page of rows are read from the through table in one
+    query, without joining the related table.
+    """
+    columns = ()
+
+    def __init__(self, relation):
+        self.relation = relation
+
+    def fetch(self, model, pks):
+        """Return the related ids of each of the given objects"""
+        field = model._meta.get_field(self.relation)
+        if field.auto_created:
+            # Reverse side of a relation declared on the other model
+            through = field.through
+            source = field.field.m2m_reverse_field_name()
+            target = field.field.m2m_field_name()
+        else:
+            through = field.remote_field.through
+            source = field.m2m_field_name()
+            target = field.m2m_reverse_field_name()
+
+        ids = {pk: [] for pk in pks}
+        pairs = through.objects \
+            .filter(**{source + '_id__in': pks}) \
+            .order_by(target + '_id') \
+            .values_list(source + '_id', target + '_id')
+        for pk, related_id in pairs:
+            ids[pk].append(related_id)
+
+        return ids
+
+    def get(self, row, fetched):
+        return fetched[row['id']]
+
+
+class ApiView(View):
+    """Base view of the API resources, answering to logged in members
+
+    Subclasses set the model, its fields and get_queryset, which returns the
+    objects visible to the request user.
+    """
+    model = None
+    fields = {}
+    http_method_names = ['get', 'head', 'options']
+
+    def dispatch(self, request, *args, **kwargs):
+        if not request.user.is_authenticated:
+            return self.error('Authentication required', 403)
+
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        except ApiError as error:
+            return self.error(str(error), error.status)
+
+    def error(self, message, status):
+        return JsonResponse({'error': message}, status=status)
+
+    def get_queryset(self):
+        """Return the objects visible to the request user"""
+        return self.model.objects.all()
+
+    def get_field_names(self):
+        """Return the names of the fields asked for, all of them if none"""
+        requested = self.request.GET.get('fields')
+        if not requested:
+            return list(self.fields)
+
+        names = list(dict.fromkeys(
+            name.strip() for name in requested.split(',') if name.strip()
+        ))
+        unknown = [name for name in names if name not in self.fields]
+        if unknown or not names:
+            raise ApiError('Unknown fields: %s, choose from %s' % (
+                ', '.join(unknown), ', '.join(self.fields)
+            ))
+
+        return names
+
+    def plan(self, queryset, names, extra=()):
+        """Return the queryset reading only the columns the fields need"""
+        columns = ['id', *extra]
+        for name in names:
+            columns.extend(self.fields[name].columns)
+
+        return queryset.values(*dict.fromkeys(columns))
+
+    def serialize(self, rows, names):
+        """Return the fields of the rows, fetching the related ids needed"""
+        pks = [row['id'] for row in rows]
+        fetched = {
+            name: self.fields[name].fetch(self.model, pks)
+            for name in names
+            if pks and isinstance(self.fields[name], RelatedIds)
+        }
+
+        return [
+            {
+                name: self.fields[name].get(row, fetched.get(name))
+                for name in names
+            }
+            for row in rows
+        ]
+
+    def render(self, data):
+        """Return the data as json, or 304 if the client has it already"""
+        response = JsonResponse(data)
+        set_response_etag(response)
+        patch_cache_control(response, private=True, no_cache=True)
+
+        return get_conditional_response(
+            self.request, etag=response['ETag'], response=response
+        )
+
+
+class ApiListView(ApiView):
+    """API view listing the visible objects a page at a time
+
+    Pages are addressed by the keyset cursors of the 'next' and 'previous'
+    urls. The ordering must end in a unique field.
+    """
+    ordering = ('id',)
+    paginate_by = 50
+    max_paginate_by = 200
+
+    def get(self, request, *args, **kwargs):
+        names = self.get_field_names()
+        queryset = self.plan(
+            self.get_queryset(), names,
+            extra=[field.lstrip('-') for field in self.ordering]
+        )
+        paginator = KeysetPaginator(
+            queryset, self.ordering, self.get_paginate_by()
+        )
+
+        try:
+            page = paginator.get_page(request.GET.get('cursor'))
+        except InvalidCursor:
+            raise ApiError('Invalid page cursor')
+
+        return self.render({
+            'results': self.serialize(page.object_list, names),
+            'next': self.page_url(page.next_cursor),
+            'previous': self.page_url(page.previous_cursor),
+        })
+
+    def get_paginate_by(self):
+        """Return the page size asked for with 'limit', within bounds"""
+        try:
+            limit = int(self.request.GET.get('limit', self.paginate_by))
+        except ValueError:
+            raise ApiError('Invalid limit')
+
+        return min(max(limit, 1), self.max_paginate_by)
+
+    def page_url(self, cursor):
+        """Return the url of the request pointing to the cursor page"""
+        if cursor is None:
+            return None
+
+        query = self.request.GET.copy()
+        query['cursor'] = cursor
+        return self.request.build_absolute_uri(
+            self.request.path + '?' + query.urlencode()
+        )
+
+
+class ApiDetailView(ApiView):
+    """API view returning the object of the pk in the url, if visible"""
+
+    def get(self, request, *args, **kwargs):
+        names = self.get_field_names()
+        queryset = self.get_queryset().filter(pk=kwargs['pk'])
+        rows = list(self.plan(queryset, names))
+        if not rows:
+            raise ApiError('Not found', 404)
+
+        return self.render(self.serialize(rows, names)[0])
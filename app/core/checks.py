@@ -0,0 +1,47 @@
+from django.conf import settings
+from django.core.checks import Error, Tags, Warning, register
+
+
+CACHE_SESSION_ENGINES = (
+    'django.contrib.sessions.backends.cache',
+    'django.contrib.sessions.backends.cached_db',
+)
+
+
+@register(Tags.caches)
+def check_session_cache(app_configs, **kwargs):
+    """Warn when sessions are cached in memory local to each worker"""
+    if settings.SESSION_ENGINE not in CACHE_SESSION_ENGINES:
+        return []
+
+    backend = settings.CACHES[settings.SESSION_CACHE_ALIAS]['BACKEND']
+    if not backend.endswith('LocMemCache'):
+        return []
+
+    return [Warning(
+        'Sessions are cached in the memory of each worker.',
+        hint=(
+            'Workers will not see the logins and logouts made by the '
+            'others. Set SESSION_CACHE_BACKEND to a shared cache.'
+        ),
+        id='core.W001',
+    )]
+
+
+@register(Tags.caches)
+def check_shared_cache(app_configs, **kwargs):
+    """Fail when several workers keep the role maps in their own memory"""
+    backend = settings.CACHES['default']['BACKEND']
+    if not backend.endswith('LocMemCache') or settings.GUNICORN_WORKERS <= 1:
+        return []
+
+    return [Error(
+        'Role maps are cached in the memory of each of the %d workers.'
+        % settings.GUNICORN_WORKERS,
+        hint=(
+            'Workers would not see the role maps and fragment versions '
+            'changed by the others. Set CACHE_BACKEND to a shared cache or '
+            'GUNICORN_WORKERS to 1.'
+        ),
+        id='core.E001',
+    )]
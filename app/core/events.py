@@ -0,0 +1,281 @@
+import asyncio
+import json
+import logging
+import re
+from http.cookies import SimpleCookie
+
+import psycopg2
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user
+from django.db import close_old_connections, connection, connections
+from django.utils.module_loading import import_string
+
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = 'bugtracker_events'
+HEARTBEAT_INTERVAL = 15
+QUEUE_SIZE = 100
+RECONNECT_DELAY = 1
+MAX_RECONNECT_DELAY = 30
+CONNECTED = b': connected\n\n'
+HEARTBEAT = b': heartbeat\n\n'
+
+
+def format_event(event):
+    """Return the event as a Server-Sent Events frame"""
+    return 'event: {}\ndata: {}\n\n'.format(
+        event.get('type', 'message'), json.dumps(event)
+    ).encode()
+
+
+def publish(streams, event):
+    """Notify the event to the subscribers of the streams
+
+    The notification goes through PostgreSQL NOTIFY on the default
+    connection, so it is only delivered if the current transaction commits.
+    """
+    payload = json.dumps({'streams': list(streams), 'event': event})
+
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT pg_notify(%s, %s)', [CHANNEL, payload])
+
+
+class EventBroker:
+    """Fan out the database notifications to the in-process subscribers
+
+    A single LISTEN connection serves every subscriber of the process. It is
+    opened with the first subscription and reopened with backoff if lost.
+    Events are encoded as Server-Sent Events frames once, whatever the
+    number of subscribers. Each subscriber gets a bounded queue of frames;
+    subscribers too slow to drain it lose their oldest frames instead of
+    growing the process memory.
+    """
+
+    def __init__(self, channel=CHANNEL, queue_size=QUEUE_SIZE):
+        self.channel = channel
+        self.queue_size = queue_size
+        self.subscribers = {}
+        self.listener = None
+        self.tasks = []
+        self.stats = {'received': 0, 'delivered': 0, 'dropped': 0}
+
+    def subscribe(self, stream):
+        """Return a new queue receiving the event frames of the stream"""
+        queue = asyncio.Queue(self.queue_size)
+        self.subscribers.setdefault(stream, set()).add(queue)
+        self.ensure_listening()
+        return queue
+
+    def unsubscribe(self, stream, queue):
+        """Stop sending the events of the stream to the queue"""
+        queues = self.subscribers.get(stream, set())
+        queues.discard(queue)
+        if not queues:
+            self.subscribers.pop(stream, None)
+
+    @property
+    def num_subscribers(self):
+        return sum(len(queues) for queues in self.subscribers.values())
+
+    def dispatch(self, payload):
+        """Put a notification payload in the queues of its streams"""
+        try:
+            message = json.loads(payload)
+            streams, event = message['streams'], message['event']
+            frame = format_event(event)
+        except (ValueError, KeyError, TypeError, AttributeError):
+            logger.warning('Ignoring malformed event %r', payload)
+            return
+
+        self.stats['received'] += 1
+        for stream in streams:
+            for queue in self.subscribers.get(stream, ()):
+                self.put(queue, frame)
+
+    def put(self, queue, frame):
+        """Put the frame in the queue, dropping the oldest one if full"""
+        if queue.full():
+            queue.get_nowait()
+            self.stats['dropped'] += 1
+        queue.put_nowait(frame)
+        self.stats['delivered'] += 1
+
+    def ensure_listening(self):
+        """Start the listener and heartbeat tasks if they are not running"""
+        if not self.tasks or any(task.done() for task in self.tasks):
+            for task in self.tasks:
+                task.cancel()
+            self.tasks = [
+                asyncio.ensure_future(self.listen()),
+                asyncio.ensure_future(self.heartbeat()),
+            ]
+
+    async def heartbeat(self):
+        """Periodically send a comment to the idle subscribers
+
+        It keeps the idle connections from being closed by proxies, and
+        makes the server notice the clients that went away.
+        """
+        while True:
+            await asyncio.sleep(HEARTBEAT_INTERVAL)
+            for queues in list(self.subscribers.values()):
+                for queue in queues:
+                    if queue.empty():
+                        queue.put_nowait(HEARTBEAT)
+
+    async def listen(self):
+        """Keep a LISTEN connection open, dispatching its notifications"""
+        delay = RECONNECT_DELAY
+        loop = asyncio.get_event_loop()
+
+        while True:
+            lost = loop.create_future()
+            try:
+                self.listener = await loop.run_in_executor(None, self.connect)
+            except psycopg2.Error:
+                logger.exception('Could not open the event listener')
+            else:
+                delay = RECONNECT_DELAY
+                loop.add_reader(
+                    self.listener.fileno(), self.on_readable, lost
+                )
+                try:
+                    await lost
+                finally:
+                    loop.remove_reader(self.listener.fileno())
+                    self.listener.close()
+                    self.listener = None
+
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, MAX_RECONNECT_DELAY)
+
+    def connect(self):
+        """Open a connection listening to the channel"""
+        params = connections['default'].get_connection_params()
+        listener = psycopg2.connect(**params)
+        listener.set_isolation_level(
+            psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT
+        )
+        with listener.cursor() as cursor:
+            cursor.execute('LISTEN %s' % self.channel)
+        return listener
+
+    def on_readable(self, lost):
+        """Read the pending notifications of the listener connection"""
+        try:
+            self.listener.poll()
+        except psycopg2.Error:
+            logger.exception('Lost the event listener connection')
+            if not lost.done():
+                lost.set_result(None)
+            return
+
+        while self.listener.notifies:
+            self.dispatch(self.listener.notifies.pop(0).payload)
+
+
+broker = EventBroker()
+
+
+class EventStreamRouter:
+    """ASGI application serving Server-Sent Events streams
+
+    Requests matching one of the routes are answered with a stream of the
+    events of the stream name returned by the route authorizer; any other
+    request is passed to the wrapped application. Authorizers are called
+    with the user and the url groups, and return the stream name or None
+    to deny access.
+    """
+
+    def __init__(self, application, routes):
+        self.application = application
+        self.routes = [
+            (re.compile(pattern), authorizer)
+            for pattern, authorizer in routes
+        ]
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'http' and scope['method'] == 'GET':
+            for pattern, authorizer in self.routes:
+                match = pattern.match(scope['path'])
+                if match:
+                    return await self.stream(
+                        scope, receive, send, authorizer, match.groups()
+                    )
+
+        return await self.application(scope, receive, send)
+
+    async def stream(self, scope, receive, send, authorizer, args):
+        """Send the events of the authorized stream until disconnected"""
+        stream = await sync_to_async(self.authorize)(scope, authorizer, args)
+        if stream is None:
+            return await self.respond(send, 403)
+
+        queue = broker.subscribe(stream)
+        watcher = asyncio.ensure_future(self.watch_disconnect(receive, queue))
+        try:
+            await send({
+                'type': 'http.response.start',
+                'status': 200,
+                'headers': [
+                    (b'content-type', b'text/event-stream'),
+                    (b'cache-control', b'no-cache'),
+                    (b'x-accel-buffering', b'no'),
+                ],
+            })
+            await self.send_body(send, CONNECTED)
+
+            frame = await queue.get()
+            while frame is not None:
+                await self.send_body(send, frame)
+                frame = await queue.get()
+        finally:
+            broker.unsubscribe(stream, queue)
+            watcher.cancel()
+
+    def authorize(self, scope, authorizer, args):
+        """Return the stream the request user may read, or None"""
+        close_old_connections()
+        try:
+            user = get_user(SessionRequest(scope))
+            return authorizer(user, *args)
+        finally:
+            close_old_connections()
+
+    @staticmethod
+    async def send_body(send, body):
+        await send({
+            'type': 'http.response.body', 'body': body, 'more_body': True
+        })
+
+    @staticmethod
+    async def watch_disconnect(receive, queue):
+        """Put None in the stream queue once the client disconnects"""
+        while (await receive())['type'] != 'http.disconnect':
+            pass
+
+        if queue.full():
+            queue.get_nowait()
+        queue.put_nowait(None)
+
+    @staticmethod
+    async def respond(send, status):
+        await send({'type': 'http.response.start', 'status': status,
+                    'headers': []})
+        await send({'type': 'http.response.body', 'body': b''})
+
+
+class SessionRequest:
+    """The minimal request needed to load the session user of a scope"""
+
+    def __init__(self, scope):
+        cookies = SimpleCookie()
+        for name, value in scope.get('headers', []):
+            if name == b'cookie':
+                cookies.load(value.decode('latin-1'))
+
+        session_key = cookies.get(settings.SESSION_COOKIE_NAME)
+        engine = import_string(settings.SESSION_ENGINE + '.SessionStore')
+        self.session = engine(session_key.value if session_key else None)
@@ -0,0 +1,129 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.db import models, transaction
+
+
+# Fragments cached by the templates, listed for the hit ratio reports
+FRAGMENTS = ('bug_row', 'project_supervisors', 'project_members')
+
+FRAGMENT_CACHE = 'fragments'
+VERSION_KEY = 'fragments:version:%s:%s'
+FRAGMENT_KEY = 'fragments:%s:%s'
+HITS_KEY = 'fragments:hits:%s'
+MISSES_KEY = 'fragments:misses:%s'
+
+
+def enabled():
+    """Return whether fragments are cached
+
+    A version bumped in a cache local to one process would go unseen by the
+    others, which would keep serving the stale fragments.
+    """
+    return settings.FRAGMENT_CACHE_ENABLED
+
+
+def get_versions(instances):
+    """Return the current version of each instance, keyed by its identity
+
+    Versions live in the default cache, which must be shared by the
+    workers and commands for fragments to be cached at all (see enabled),
+    and start from a fresh value so fragments cached under a version that
+    was evicted are never read again.
+    """
+    keys = {
+        identity(instance): VERSION_KEY % identity(instance)
+        for instance in instances
+    }
+    found = cache.get_many(keys.values())
+
+    for key in set(keys.values()) - set(found):
+        cache.add(key, time.time_ns(), None)
+        found[key] = cache.get(key)
+
+    return {ident: found[key] for ident, key in keys.items()}
+
+
+def bump_versions(model, ids):
+    """Make the cached fragments of the given objects stale
+
+    The versions are bumped now and again once the transaction commits, so
+    fragments rendered by concurrent requests from the data read before the
+    commit are dropped too.
+    """
+    label = model._meta.label_lower
+    keys = [VERSION_KEY % (label, pk) for pk in ids]
+
+    _incr_versions(keys)
+    transaction.on_commit(lambda: _incr_versions(keys))
+
+
+def fragment_key(name, values, versions):
+    """Return the cache key of a fragment for the values it depends on"""
+    parts = [name]
+    for value in values:
+        if isinstance(value, models.Model):
+            ident = identity(value)
+            parts.append('%s.%s.%s' % (ident + (versions[ident],)))
+        else:
+            parts.append(str(value))
+
+    digest = hashlib.md5(':'.join(parts).encode()).hexdigest()
+    return FRAGMENT_KEY % (name, digest)
+
+
+def identity(instance):
+    return (instance._meta.label_lower, instance.pk)
+
+
+def get_fragments(keys):
+    return caches[FRAGMENT_CACHE].get_many(keys)
+
+
+def set_fragments(fragments):
+    caches[FRAGMENT_CACHE].set_many(fragments, None)
+
+
+def count_lookups(name, hits, misses):
+    """Add to the hit and miss counters of a fragment"""
+    if hits:
+        _count(HITS_KEY % name, hits)
+    if misses:
+        _count(MISSES_KEY % name, misses)
+
+
+def fragment_stats():
+    """Return the hits, misses and hit ratio of each fragment"""
+    stats = {}
+    for name in FRAGMENTS:
+        hits = cache.get(HITS_KEY % name, 0)
+        misses = cache.get(MISSES_KEY % name, 0)
+        total = hits + misses
+
+        stats[name] = {
+            'hits': hits,
+            'misses': misses,
+            'hit_ratio': hits / total if total else None,
+        }
+
+    return stats
+
+
+def _incr_versions(keys):
+    for key in keys:
+        try:
+            cache.incr(key)
+        except ValueError:
+            # No version stored means no fragment can be cached for it
+            pass
+
+
+def _count(key, delta):
+    """Increment a cache counter, creating it if needed"""
+    try:
+        cache.incr(key, delta)
+    except ValueError:
+        if not cache.add(key, delta, None):
+            cache.incr(key, delta)
@@ -0,0 +1,127 @@
+import logging
+import random
+import traceback
+from datetime import timedelta
+
+from django.db import DatabaseError, close_old_connections, connection, \
+    transaction
+from django.utils import timezone
+
+from .models import Job
+
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = 5
+BACKOFF = 10
+MAX_BACKOFF = 3600
+
+# Tasks workers can run, by name
+tasks = {}
+
+
+def job(func=None, *, max_attempts=MAX_ATTEMPTS):
+    """Register the function as a task that can be enqueued
+
+    Tasks are looked up by module and name, so they must be defined at the
+    top level of a module the workers import, like the tasks module of an
+    app. A task may run more than once, so it must be safe to repeat.
+    """
+    def register(func):
+        func.task_name = '%s.%s' % (func.__module__, func.__qualname__)
+        func.max_attempts = max_attempts
+        tasks[func.task_name] = func
+        return func
+
+    return register if func is None else register(func)
+
+
+def enqueue(task, *args, **kwargs):
+    """Add a job calling the task with the arguments, returning it
+
+    The job is inserted in the current transaction, so it is dropped if the
+    transaction rolls back and the workers only see it once it commits. The
+    arguments are stored as JSON, so pass ids instead of model instances.
+    """
+    return Job.objects.create(
+        task=task.task_name,
+        args=list(args),
+        kwargs=kwargs,
+        max_attempts=task.max_attempts,
+    )
+
+
+def backoff(attempts):
+    """Return the delay before retrying a job failed that many times
+
+    The delay doubles with each attempt, up to MAX_BACKOFF, and is jittered
+    so jobs failing together are not all retried at the same time.
+    """
+    delay = min(BACKOFF * 2 ** (attempts - 1), MAX_BACKOFF)
+    return timedelta(seconds=delay * random.uniform(0.5, 1))
+
+
+def run_next_job():
+    """Claim and run the next due job, returning it or None if none is due
+
+    The job row stays locked while its task runs, in the transaction of the
+    task, and the other workers skip it. A successful job is deleted when
+    the task commits. A failure rolls the task back and records the error
+    with the time of the next attempt. A worker dying in the middle of a
+    task releases the lock, so another worker runs the job again.
+    """
+    with transaction.atomic():
+        job = Job.objects \
+            .select_for_update(skip_locked=True) \
+            .filter(failed_at__isnull=True, run_at__lte=timezone.now()) \
+            .order_by('run_at', 'id') \
+            .first()
+        if job is None:
+            return None
+
+        try:
+            with transaction.atomic():
+                tasks[job.task](*job.args, **job.kwargs)
+        except Exception:
+            logger.exception('Job %s failed', job)
+            job.attempts += 1
+            job.last_error = traceback.format_exc()
+            if job.task not in tasks or job.attempts >= job.max_attempts:
+                job.failed_at = timezone.now()
+            else:
+                job.run_at = timezone.now() + backoff(job.attempts)
+            job.save(update_fields=[
+                'attempts', 'last_error', 'failed_at', 'run_at'
+            ])
+        else:
+            Job.objects.filter(pk=job.pk).delete()
+
+    return job
+
+
+def work(stop, interval=1, burst=False, counter=None):
+    """Run the due jobs until stopped, polling every interval when idle
+
+    Burst workers stop once no job is due. The counter, a shared value,
+    counts the jobs run.
+    """
+    try:
+        while not stop.is_set():
+            close_old_connections()
+            try:
+                job = run_next_job()
+            except DatabaseError:
+                logger.exception('Could not claim a job')
+                connection.close()
+                job = None
+
+            if job is not None:
+                if counter is not None:
+                    with counter.get_lock():
+                        counter.value += 1
+            elif burst:
+                return
+            else:
+                stop.wait(interval)
+    finally:
+        connection.close()
@@ -0,0 +1,41 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import CommandError
+from django.http import HttpRequest
+from django.middleware.csrf import get_token
+from django.test import Client
+
+
+def session_cookie(user):
+    """Return the session cookie header of the user, logged in"""
+    client = Client()
+    client.force_login(user)
+    return '%s=%s' % (
+        settings.SESSION_COOKIE_NAME,
+        client.cookies[settings.SESSION_COOKIE_NAME].value
+    )
+
+
+def superuser_session_cookie():
+    """Return the session cookie header of a logged in superuser"""
+    user = get_user_model().objects \
+        .filter(is_superuser=True).order_by('id').first()
+    if user is None:
+        raise CommandError('A superuser is needed to make the requests')
+
+    return session_cookie(user)
+
+
+def csrf_headers():
+    """Return the cookie and header passing the CSRF check of POSTs"""
+    request = HttpRequest()
+    token = get_token(request)
+    return (
+        '%s=%s' % (settings.CSRF_COOKIE_NAME, request.META['CSRF_COOKIE']),
+        {settings.CSRF_HEADER_NAME[len('HTTP_'):].replace('_', '-'): token},
+    )
+
+
+def percentile(values, quantile):
+    """Return the quantile of the sorted values"""
+    return values[max(int(len(values) * quantile) - 1, 0)]
@@ -0,0 +1,157 @@
+import io
+import threading
+import time
+from wsgiref.util import setup_testing_defaults
+
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+from core.management.benchmarks import percentile, superuser_session_cookie
+from core.postgresql.pool import close_pools
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure the requests per second served by the WSGI handler with '
+        'new connections per request, persistent connections and pooled '
+        'connections. ALLOWED_HOSTS must allow 127.0.0.1.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path', default='/bugs/', help='Path requested'
+        )
+        parser.add_argument(
+            '--requests', type=int, default=1000,
+            help='Number of requests made with each kind of connection'
+        )
+        parser.add_argument(
+            '--threads', type=int, default=4,
+            help='Number of threads making requests at once'
+        )
+        parser.add_argument(
+            '--pool-size', type=int,
+            help='Size of the pool, the number of threads by default'
+        )
+        parser.add_argument(
+            '--modes', nargs='+', default=['none', 'persistent', 'pool'],
+            choices=['none', 'persistent', 'pool'],
+            help='Kinds of connections compared'
+        )
+
+    def handle(self, *args, **options):
+        database = connections.databases['default']
+        if database['ENGINE'] != 'core.postgresql':
+            raise CommandError('The default database must use core.postgresql')
+
+        modes = {
+            'none': {
+                'CONN_MAX_AGE': 0, 'CONN_HEALTH_CHECKS': False, 'POOL': None,
+            },
+            'persistent': {
+                'CONN_MAX_AGE': 60, 'CONN_HEALTH_CHECKS': True, 'POOL': None,
+            },
+            'pool': {
+                'CONN_MAX_AGE': 0, 'CONN_HEALTH_CHECKS': True, 'POOL': {
+                    'MAX_SIZE': options['pool_size'] or options['threads'],
+                    'TIMEOUT': 10,
+                },
+            },
+        }
+        original = {key: database.get(key) for key in modes['none']}
+
+        handler = WSGIHandler()
+        cookie = superuser_session_cookie()
+        # Compile the templates and fill the caches before measuring
+        self.request(handler, options['path'], cookie)
+        connections.close_all()
+
+        try:
+            for mode in options['modes']:
+                database.update(modes[mode])
+                self.run(mode, handler, cookie, options)
+        finally:
+            database.update(original)
+            close_pools()
+
+    def run(self, mode, handler, cookie, options):
+        """Make the requests in threads and report their throughput"""
+        remaining = [options['requests']]
+        latencies, failures, opened = [], [], []
+        lock = threading.Lock()
+
+        def count_connection(**kwargs):
+            with lock:
+                opened.append(1)
+
+        def worker():
+            try:
+                while True:
+                    with lock:
+                        if not remaining[0]:
+                            return
+                        remaining[0] -= 1
+
+                    start = time.perf_counter()
+                    status = self.request(handler, options['path'], cookie)
+                    elapsed = (time.perf_counter() - start) * 1000
+                    with lock:
+                        latencies.append(elapsed)
+                        if not status.startswith('200'):
+                            failures.append(status)
+            finally:
+                connections.close_all()
+
+        connection_created.connect(count_connection, weak=False)
+        threads = [
+            threading.Thread(target=worker)
+            for _ in range(options['threads'])
+        ]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        total = time.perf_counter() - start
+        connection_created.disconnect(count_connection)
+
+        pool = connections['default'].pool
+        if pool is not None:
+            opened = range(pool.stats()['opened'])
+
+        latencies.sort()
+        self.stdout.write(
+            '%s: %.1f req/s, p50 %.1fms, p95 %.1fms, %d connections opened, '
+            '%d failed' % (
+                mode, len(latencies) / total,
+                latencies[len(latencies) // 2],
+                percentile(latencies, 0.95),
+                len(opened), len(failures),
+            )
+        )
+        if pool is not None:
+            self.stdout.write('  pool: %s' % pool.stats())
+        close_pools()
+
+    @staticmethod
+    def request(handler, path, cookie):
+        """Serve a GET request of the path, returning the response status"""
+        environ = {
+            'REQUEST_METHOD': 'GET',
+            'PATH_INFO': path,
+            'HTTP_COOKIE': cookie,
+            'wsgi.input': io.BytesIO(),
+        }
+        setup_testing_defaults(environ)
+        result = {}
+
+        def start_response(status, headers, exc_info=None):
+            result['status'] = status
+
+        response = handler(environ, start_response)
+        for _ in response:
+            pass
+        response.close()
+        return result['status']
@@ -0,0 +1,196 @@
+import asyncio
+import json
+import multiprocessing
+import resource
+import statistics
+import time
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+
+from bugs.events import publish_bug_event
+from bugs.models import Bug
+from core.management.benchmarks import percentile, superuser_session_cookie
+
+
+class Command(BaseCommand):
+    help = (
+        'Load test the bug event streams of a running ASGI server: open '
+        'many streams of one bug, publish events and measure how many '
+        'streams received them and how long delivery took.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--url', default='http://127.0.0.1:8000',
+            help='Base url of the ASGI server'
+        )
+        parser.add_argument(
+            '--bug', type=int,
+            help='Id of the bug whose stream is opened, the first by default'
+        )
+        parser.add_argument(
+            '--connections', type=int, default=1000,
+            help='Number of streams opened at once'
+        )
+        parser.add_argument(
+            '--events', type=int, default=20,
+            help='Number of events published'
+        )
+        parser.add_argument(
+            '--interval', type=float, default=0.5,
+            help='Seconds between published events'
+        )
+        parser.add_argument(
+            '--processes', type=int, default=4,
+            help='Number of client processes the streams are spread over'
+        )
+
+    def handle(self, *args, **options):
+        soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+        per_process = -(-options['connections'] // options['processes'])
+        if per_process > hard - 100:
+            raise CommandError('The open files limit is %d' % hard)
+
+        bug = Bug.objects.get(pk=options['bug']) if options['bug'] \
+            else Bug.objects.order_by('id').first()
+        url = urlsplit(options['url'])
+        client = StreamClient(
+            url.hostname, url.port or 80, '/events/bugs/%d' % bug.id,
+            superuser_session_cookie()
+        )
+
+        ready, results = multiprocessing.Queue(), multiprocessing.Queue()
+        stop = multiprocessing.Event()
+        processes = [
+            multiprocessing.Process(
+                target=client.run, args=(count, ready, stop, results)
+            )
+            for count in self.split(options['connections'],
+                                    options['processes'])
+        ]
+        for process in processes:
+            process.start()
+
+        start = time.perf_counter()
+        opened = failed = 0
+        for _ in processes:
+            process_opened, process_errors = ready.get()
+            opened += process_opened
+            failed += len(process_errors)
+            if process_errors:
+                self.stdout.write('Stream error: %s' % process_errors[0])
+        self.stdout.write('Streams opened: %d in %.2fs, %d failed' % (
+            opened, time.perf_counter() - start, failed
+        ))
+
+        for seq in range(options['events']):
+            publish_bug_event(bug, 'bench', seq=seq)
+            time.sleep(options['interval'])
+        time.sleep(2)
+        stop.set()
+
+        latencies = []
+        for _ in processes:
+            latencies.extend(results.get())
+        for process in processes:
+            process.join()
+
+        self.report(latencies, opened * options['events'])
+
+    @staticmethod
+    def split(total, parts):
+        """Return the total split in parts as even as possible"""
+        return [
+            total // parts + (1 if i < total % parts else 0)
+            for i in range(parts)
+        ]
+
+    def report(self, latencies, expected):
+        """Write the delivery ratio and latency percentiles"""
+        self.stdout.write('Events delivered: %d of %d (%.1f%%)' % (
+            len(latencies), expected,
+            100 * len(latencies) / expected if expected else 0
+        ))
+        if not latencies:
+            return
+
+        latencies.sort()
+        for name, quantile in [('p50', 0.5), ('p95', 0.95), ('p99', 0.99)]:
+            self.stdout.write('Latency %s: %.1fms' % (
+                name, percentile(latencies, quantile)
+            ))
+        self.stdout.write('Latency max: %.1fms' % latencies[-1])
+        self.stdout.write('Latency mean: %.1fms' % statistics.mean(latencies))
+
+
+class StreamClient:
+    """Open event streams and record the delivery latency of their events"""
+
+    def __init__(self, host, port, path, cookie):
+        self.host = host
+        self.port = port
+        self.path = path
+        self.cookie = cookie
+
+    def run(self, count, ready, stop, results):
+        """Run count streams in a process until the stop event is set"""
+        asyncio.run(self.follow(count, ready, stop, results))
+
+    async def follow(self, count, ready, stop, results):
+        latencies = []
+        opened = await asyncio.gather(
+            *(self.open_stream() for _ in range(count)),
+            return_exceptions=True
+        )
+        streams = [s for s in opened if not isinstance(s, Exception)]
+        ready.put((
+            len(streams),
+            [repr(s) for s in opened if isinstance(s, Exception)],
+        ))
+
+        readers = [
+            asyncio.ensure_future(self.read_events(reader, latencies))
+            for reader, _ in streams
+        ]
+        while not stop.is_set():
+            await asyncio.sleep(0.1)
+
+        for task in readers:
+            task.cancel()
+        for _, writer in streams:
+            writer.close()
+        results.put(latencies)
+
+    async def open_stream(self):
+        """Open a stream, returning its reader and writer once accepted"""
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        writer.write((
+            'GET {} HTTP/1.1\r\n'
+            'Host: {}\r\n'
+            'Accept: text/event-stream\r\n'
+            'Cookie: {}\r\n\r\n'
+        ).format(self.path, self.host, self.cookie).encode())
+        await writer.drain()
+
+        status = await reader.readline()
+        if b' 200 ' not in status:
+            writer.close()
+            raise ConnectionError(status.decode().strip())
+
+        while (await reader.readline()).strip():
+            pass
+
+        return reader, writer
+
+    @staticmethod
+    async def read_events(reader, latencies):
+        """Record the delivery latency of each event read from the stream"""
+        while True:
+            line = await reader.readline()
+            if not line:
+                return
+            if line.startswith(b'data: '):
+                event = json.loads(line[6:])
+                latencies.append((time.time() - event['sent']) * 1000)
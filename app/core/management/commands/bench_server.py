@@ -0,0 +1,203 @@
+import http.client
+import os
+import signal
+import socket
+import statistics
+import subprocess
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.management.benchmarks import percentile, superuser_session_cookie
+
+
+CONFIGURATIONS = {
+    # The previous default of the production image
+    'single': {
+        'GUNICORN_WORKER_CLASS': 'sync', 'GUNICORN_PRELOAD': '0',
+        'GUNICORN_WORKERS': '1',
+    },
+    'sync': {'GUNICORN_WORKER_CLASS': 'sync', 'GUNICORN_PRELOAD': '0'},
+    'sync-preload': {'GUNICORN_WORKER_CLASS': 'sync', 'GUNICORN_PRELOAD': '1'},
+    'gthread': {'GUNICORN_WORKER_CLASS': 'gthread', 'GUNICORN_PRELOAD': '0'},
+    'gthread-preload': {
+        'GUNICORN_WORKER_CLASS': 'gthread', 'GUNICORN_PRELOAD': '1'
+    },
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Start gunicorn with each configuration of gunicorn.conf.py, load '
+        'it with concurrent requests and compare the throughput and the '
+        'memory of its workers. The load is generated on the same machine, '
+        'so compare configurations with each other rather than with '
+        'production numbers.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--configurations', nargs='+', choices=list(CONFIGURATIONS),
+            default=list(CONFIGURATIONS), help='Configurations compared'
+        )
+        parser.add_argument(
+            '--paths', nargs='+', default=['/bugs/', '/profile/'],
+            help='Paths requested in turn'
+        )
+        parser.add_argument(
+            '--workers', type=int,
+            help='Number of workers, sized from the CPUs by default'
+                 ' (except for the single worker configuration)'
+        )
+        parser.add_argument(
+            '--concurrency', type=int, default=8,
+            help='Number of requests made at once'
+        )
+        parser.add_argument(
+            '--duration', type=float, default=20,
+            help='Seconds of load for each configuration'
+        )
+        parser.add_argument(
+            '--port', type=int, default=8123, help='Port gunicorn listens on'
+        )
+
+    def handle(self, *args, **options):
+        cookie = superuser_session_cookie()
+        for name in options['configurations']:
+            server = self.start(CONFIGURATIONS[name], options)
+            try:
+                self.wait_ready(server, options)
+                # Let every worker import its views and warm its caches
+                self.load(options, cookie, duration=2)
+                result = self.load(options, cookie, options['duration'])
+                memory = [process_memory(pid) for pid in workers(server.pid)]
+            finally:
+                server.send_signal(signal.SIGTERM)
+                server.wait()
+
+            self.report(name, result, memory)
+
+    def start(self, configuration, options):
+        """Start gunicorn with the configuration"""
+        env = dict(os.environ)
+        env['GUNICORN_BIND'] = '127.0.0.1:%d' % options['port']
+        env['GUNICORN_MAX_REQUESTS'] = '0'
+        env.setdefault('ALLOWED_HOSTS', '*')
+        if options['workers']:
+            env['GUNICORN_WORKERS'] = str(options['workers'])
+        env.update(configuration)
+
+        return subprocess.Popen(
+            ['gunicorn', 'app.wsgi'],
+            cwd=str(settings.BASE_DIR), env=env,
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+
+    def wait_ready(self, server, options, timeout=60):
+        """Wait until gunicorn accepts connections"""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if server.poll() is not None:
+                raise CommandError('gunicorn exited with %d' % server.poll())
+            try:
+                socket.create_connection(
+                    ('127.0.0.1', options['port']), 1
+                ).close()
+                return
+            except OSError:
+                time.sleep(0.2)
+
+        raise CommandError('gunicorn did not start in %ds' % timeout)
+
+    def load(self, options, cookie, duration):
+        """Request the paths at the given concurrency for some seconds"""
+        latencies, failures = [], []
+        lock = threading.Lock()
+        deadline = time.monotonic() + duration
+
+        def client(offset):
+            connection = http.client.HTTPConnection(
+                '127.0.0.1', options['port'], timeout=30
+            )
+            paths = options['paths']
+            n = offset
+            while time.monotonic() < deadline:
+                path = paths[n % len(paths)]
+                n += 1
+                start = time.perf_counter()
+                try:
+                    connection.request('GET', path, headers={'Cookie': cookie})
+                    response = connection.getresponse()
+                    response.read()
+                    status = response.status
+                except (OSError, http.client.HTTPException) as e:
+                    connection.close()
+                    status = repr(e)
+                elapsed = (time.perf_counter() - start) * 1000
+
+                with lock:
+                    latencies.append(elapsed)
+                    if status != 200:
+                        failures.append(status)
+            connection.close()
+
+        threads = [
+            threading.Thread(target=client, args=(i,))
+            for i in range(options['concurrency'])
+        ]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        return {
+            'elapsed': time.perf_counter() - start,
+            'latencies': sorted(latencies),
+            'failures': failures,
+        }
+
+    def report(self, name, result, memory):
+        """Write the throughput, latencies and worker memory of a run"""
+        latencies = result['latencies']
+        self.stdout.write(
+            '%s: %d workers, %.1f req/s, p50 %.1fms, p95 %.1fms, %d failed'
+            % (
+                name, len(memory), len(latencies) / result['elapsed'],
+                percentile(latencies, 0.5), percentile(latencies, 0.95),
+                len(result['failures']),
+            )
+        )
+        if result['failures']:
+            self.stdout.write('  first failure: %s' % result['failures'][0])
+        if memory:
+            self.stdout.write(
+                '  per worker: RSS %.1fMB, PSS %.1fMB (unshared memory)'
+                % (
+                    statistics.mean(m['rss'] for m in memory) / 1024,
+                    statistics.mean(m['pss'] for m in memory) / 1024,
+                )
+            )
+
+
+def workers(pid):
+    """Return the pids of the child processes of the gunicorn master"""
+    with open('/proc/%d/task/%d/children' % (pid, pid)) as children:
+        return [int(child) for child in children.read().split()]
+
+
+def process_memory(pid):
+    """Return the resident and proportional set sizes of a process in kB
+
+    The proportional size splits the pages shared with other processes
+    between them, so it shows what forking from a preloaded master saves.
+    """
+    memory = {}
+    with open('/proc/%d/smaps_rollup' % pid) as rollup:
+        for line in rollup:
+            key, _, value = line.partition(':')
+            if key in ('Rss', 'Pss'):
+                memory[key.lower()] = int(value.split()[0])
+    return memory
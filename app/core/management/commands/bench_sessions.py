@@ -0,0 +1,78 @@
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+
+
+class Command(BaseCommand):
+    help = (
+        'Count the queries made per request, and those on the session '
+        'table, with each session store. ALLOWED_HOSTS must allow '
+        'testserver.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--paths', nargs='+', default=['/bugs/', '/profile/'],
+            help='Paths requested'
+        )
+        parser.add_argument(
+            '--requests', type=int, default=50,
+            help='Number of requests made to each path with each store'
+        )
+        parser.add_argument(
+            '--stores', nargs='+', default=list(settings.SESSION_ENGINES),
+            choices=list(settings.SESSION_ENGINES),
+            help='Session stores compared'
+        )
+
+    def handle(self, *args, **options):
+        user = get_user_model().objects \
+            .filter(is_superuser=True).order_by('id').first()
+        if user is None:
+            raise CommandError('A superuser is needed to make the requests')
+
+        for store in options['stores']:
+            engine = settings.SESSION_ENGINES[store]
+            with override_settings(SESSION_ENGINE=engine):
+                self.run(store, user, options)
+
+    def run(self, store, user, options):
+        """Request the paths as the user and report the queries made"""
+        client = Client()
+        client.force_login(user)
+        session_table = Session._meta.db_table
+
+        for path in options['paths']:
+            # Compile the templates and fill the caches before measuring
+            client.get(path)
+            queries = session_queries = 0
+            start = time.perf_counter()
+            for _ in range(options['requests']):
+                with CaptureQueriesContext(connection) as captured:
+                    response = client.get(path)
+                if response.status_code != 200:
+                    raise CommandError(
+                        '%s answered %d' % (path, response.status_code)
+                    )
+                queries += len(captured)
+                session_queries += sum(
+                    session_table in query['sql']
+                    for query in captured.captured_queries
+                )
+            elapsed = time.perf_counter() - start
+
+            self.stdout.write(
+                '%-15s %-12s %5.1f queries/request, %.1f on sessions, '
+                '%.1fms/request' % (
+                    store, path, queries / options['requests'],
+                    session_queries / options['requests'],
+                    elapsed / options['requests'] * 1000,
+                )
+            )
+        client.logout()
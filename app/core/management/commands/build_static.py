@@ -0,0 +1,67 @@
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.files.storage import get_storage_class
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+
+from core.storage import CompressedManifestStaticFilesStorage
+from core.vendor import IntegrityError, vendor_files
+
+
+class Command(BaseCommand):
+    help = (
+        'Fetch the vendored static files that are missing, then collect '
+        'the static files, fingerprinted and precompressed when '
+        'STATICFILES_STORAGE is core.storage.'
+        'CompressedManifestStaticFilesStorage.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--vendor-only', action='store_true',
+            help='Only fetch the vendored files'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            vendor_files(log=self.stdout.write)
+        except (OSError, IntegrityError) as e:
+            raise CommandError('Could not vendor the static files: %s' % e)
+        if options['vendor_only']:
+            return
+
+        call_command(
+            'collectstatic', interactive=False,
+            verbosity=options['verbosity'] - 1
+        )
+
+        storage_class = get_storage_class(settings.STATICFILES_STORAGE)
+        if issubclass(storage_class, CompressedManifestStaticFilesStorage):
+            self.report()
+        else:
+            self.stdout.write(
+                'The static files were not fingerprinted nor compressed, '
+                'STATICFILES_STORAGE is not the compressed manifest storage'
+            )
+
+    def report(self):
+        """Write the total size of the collected files and their copies"""
+        names = set(staticfiles_storage.load_manifest().values())
+        sizes = {'': 0, 'compressed': 0, '.gz': 0, '.br': 0}
+
+        for name in names:
+            size = staticfiles_storage.size(name)
+            sizes[''] += size
+            if staticfiles_storage.exists(name + '.gz'):
+                sizes['compressed'] += size
+            for suffix in ('.gz', '.br'):
+                if staticfiles_storage.exists(name + suffix):
+                    sizes[suffix] += staticfiles_storage.size(name + suffix)
+
+        self.stdout.write(
+            '%d fingerprinted files, %.1fkB, of which %.1fkB compressed to '
+            '%.1fkB with gzip and %.1fkB with brotli' % (
+                len(names), sizes[''] / 1024, sizes['compressed'] / 1024,
+                sizes['.gz'] / 1024, sizes['.br'] / 1024,
+            )
+        )
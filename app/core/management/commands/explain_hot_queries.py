@@ -0,0 +1,94 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Count
+
+from bugs.models import Bug
+from bugs.views import BugListView
+from projects.models import Project
+
+
+HOT_QUERY_INDEXES = [
+    'bug_active_creation_idx',
+    'bug_project_status_idx',
+    'project_active_creation_idx',
+]
+
+
+class Command(BaseCommand):
+    help = (
+        'Show the EXPLAIN plans of the hot bug and project queries. With '
+        '--compare the plans without the hot query indexes are shown too; '
+        'the indexes are dropped inside a rolled back transaction, which '
+        'locks the tables, so only compare on a benchmark database.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--compare', action='store_true',
+            help='Also show the plans without the hot query indexes'
+        )
+        parser.add_argument(
+            '--no-analyze', action='store_true',
+            help='Show the estimated plans without running the queries'
+        )
+
+    def handle(self, *args, **options):
+        self.analyze = not options['no_analyze']
+        queries = self.get_hot_queries()
+
+        if options['compare']:
+            self.stdout.write('======== Without hot query indexes ========')
+            with transaction.atomic():
+                with connection.cursor() as cursor:
+                    for index in HOT_QUERY_INDEXES:
+                        cursor.execute(
+                            'DROP INDEX IF EXISTS ' +
+                            connection.ops.quote_name(index)
+                        )
+                self.explain(queries)
+                transaction.set_rollback(True)
+
+            self.stdout.write('\n======== With hot query indexes ========')
+
+        self.explain(queries)
+
+    def get_hot_queries(self):
+        """Return the querysets run by the most requested pages"""
+        member = get_user_model().objects.order_by('id').first()
+        project = Project.objects \
+            .annotate(num_bugs=Count('bugs')).order_by('-num_bugs').first()
+        page_size = BugListView.paginate_by + 1
+
+        return [
+            (
+                'Bug list, active bugs (bugs:list)',
+                Bug.get_active().for_viewer(member)
+                .order_by(*BugListView.ordering)[:page_size]
+            ),
+            (
+                'Bug list, all bugs (bugs:list?show_inactive=1)',
+                Bug.objects.for_viewer(member)
+                .order_by(*BugListView.ordering)[:page_size]
+            ),
+            (
+                'Project active bugs (projects:detail)',
+                project.active_bugs.for_viewer(member)
+            ),
+            (
+                'Active project list (projects:list)',
+                Project.get_active().order_by('-creationDate')
+            ),
+            (
+                'Bugs created by a member',
+                member.created_bugs.order_by('-creationDate')
+            ),
+        ]
+
+    def explain(self, queries):
+        """Write the plan of each query"""
+        options = {'analyze': True, 'buffers': True} if self.analyze else {}
+
+        for name, queryset in queries:
+            self.stdout.write('\n-- ' + name)
+            self.stdout.write(queryset.explain(**options))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from core.fragments import fragment_stats
+
+
+class Command(BaseCommand):
+    help = 'Show the hit and miss counters of the template fragment cache'
+
+    def handle(self, *args, **options):
+        for name, stats in fragment_stats().items():
+            line = '%s: %d hits, %d misses' % (
+                name, stats['hits'], stats['misses']
+            )
+            if stats['hit_ratio'] is not None:
+                line += ', hit ratio %.1f%%' % (stats['hit_ratio'] * 100)
+
+            self.stdout.write(line)
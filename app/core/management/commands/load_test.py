@@ -0,0 +1,369 @@
+import http.client
+import json
+import random
+import statistics
+import threading
+import time
+from urllib.parse import urlencode, urlsplit
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+
+from bugs.models import Bug
+from core.management.benchmarks import \
+    csrf_headers, percentile, session_cookie
+from projects.models import Project
+
+
+DEFAULT_MIX = (
+    'bugs:list=25,bugs:detail=25,projects:detail=10,members:detail=10,'
+    'bugs:create_message=15,bugs:change_status=10,bugs:assign_member=5'
+)
+DEFAULT_ROLES = 'member=6,supervisor=3,superuser=1'
+
+# Number of objects of each kind the simulated users pick from
+TARGETS = 50
+
+
+def bug_list(user, rng):
+    return 'GET', reverse('bugs:list'), None
+
+
+def bug_detail(user, rng):
+    bug_id, _ = rng.choice(user.bugs)
+    return 'GET', reverse('bugs:detail', args=[bug_id]), None
+
+
+def project_detail(user, rng):
+    project_id = rng.choice(user.projects)
+    return 'GET', reverse('projects:detail', args=[project_id]), None
+
+
+def member_detail(user, rng):
+    member_id = rng.choice(user.members)
+    return 'GET', reverse('members:detail', args=[member_id]), None
+
+
+def create_message(user, rng):
+    bug_id, _ = rng.choice(user.bugs)
+    return 'POST', reverse('bugs:create_message', args=[bug_id]), {
+        'content': 'Load test message %d' % rng.randrange(10 ** 6)
+    }
+
+
+def change_status(user, rng):
+    bug_id, _ = rng.choice(user.supervised_bugs)
+    # Bugs are kept active so they stay on the lists
+    return 'POST', reverse('bugs:change_status', args=[bug_id]), {
+        'status': rng.choice(Bug.ACTIVE_STATUS)
+    }
+
+
+def assign_member(user, rng):
+    bug_id, project_id = rng.choice(user.assignable_bugs)
+    return 'POST', reverse('bugs:assign_member', args=[bug_id]), {
+        'member_ids': rng.choice(user.project_members[project_id])
+    }
+
+
+# Request builders of each route, and the targets they need
+ROUTES = {
+    'bugs:list': (bug_list, None),
+    'bugs:detail': (bug_detail, 'bugs'),
+    'projects:detail': (project_detail, 'projects'),
+    'members:detail': (member_detail, 'members'),
+    'bugs:create_message': (create_message, 'bugs'),
+    'bugs:change_status': (change_status, 'supervised_bugs'),
+    'bugs:assign_member': (assign_member, 'assignable_bugs'),
+}
+
+
+class SimulatedUser:
+    """A logged in member and the objects its requests point to"""
+
+    def __init__(self, role, member):
+        self.role = role
+        self.cookie = session_cookie(member)
+        is_superuser = member.is_superuser
+
+        bugs = Bug.objects.order_by('-id')
+        projects = Project.objects.order_by('-id')
+        if not is_superuser:
+            bugs = bugs.filter(project__members=member)
+            projects = projects.filter(members=member)
+        self.bugs = list(bugs.values_list('id', 'project_id')[:TARGETS])
+        self.projects = list(projects.values_list('id', flat=True)[:TARGETS])
+        self.members = list(
+            get_user_model().objects.order_by('-id')
+            .values_list('id', flat=True)[:TARGETS]
+        )
+
+        supervised = Bug.objects.order_by('-id')
+        if not is_superuser:
+            supervised = supervised.filter(project__supervisors=member)
+        self.supervised_bugs = list(
+            supervised.values_list('id', 'project_id')[:TARGETS]
+        )
+        self.project_members = {
+            project_id: list(
+                Project.members.through.objects
+                .filter(project_id=project_id)
+                .values_list('member_id', flat=True)[:TARGETS]
+            )
+            for project_id in {pid for _, pid in self.supervised_bugs}
+        }
+        self.assignable_bugs = [
+            (bug_id, project_id)
+            for bug_id, project_id in self.supervised_bugs
+            if self.project_members[project_id]
+        ]
+
+    def routes(self, mix):
+        """Return the routes of the mix the user has targets for"""
+        return {
+            name: weight for name, weight in mix.items()
+            if ROUTES[name][1] is None or getattr(self, ROUTES[name][1])
+        }
+
+
+def parse_weights(value, choices):
+    """Parse 'name=weight,...' into a dict of the weights"""
+    weights = {}
+    for item in value.split(','):
+        name, _, weight = item.partition('=')
+        if name not in choices:
+            raise CommandError(
+                'Unknown %r, choose from %s' % (name, ', '.join(choices))
+            )
+        try:
+            weights[name] = float(weight or 1)
+        except ValueError:
+            raise CommandError('Invalid weight for %s: %r' % (name, weight))
+    return weights
+
+
+def summarize(latencies, errors, elapsed):
+    """Return the throughput and latency percentiles of some requests"""
+    latencies = sorted(latencies)
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'rps': round(len(latencies) / elapsed, 2),
+        'mean': round(statistics.mean(latencies), 2),
+        'p50': round(percentile(latencies, 0.5), 2),
+        'p95': round(percentile(latencies, 0.95), 2),
+        'p99': round(percentile(latencies, 0.99), 2),
+    }
+
+
+def find_regressions(results, baseline, tolerance):
+    """Return the routes slower than the baseline by more than tolerance"""
+    regressions = []
+    for name, base in baseline['routes'].items():
+        result = results['routes'].get(name)
+        if result is None:
+            continue
+        if result['rps'] < base['rps'] * (1 - tolerance):
+            regressions.append(
+                '%s: %.1f req/s, baseline %.1f' % (
+                    name, result['rps'], base['rps']
+                )
+            )
+        if result['p95'] > base['p95'] * (1 + tolerance):
+            regressions.append(
+                '%s: p95 %.1fms, baseline %.1fms' % (
+                    name, result['p95'], base['p95']
+                )
+            )
+    return regressions
+
+
+class Command(BaseCommand):
+    help = (
+        'Load a running server with simulated members, supervisors and '
+        'superusers making a mix of reads and writes, and report the '
+        'requests per second and latency percentiles of each route as '
+        'JSON. The users are logged in through the database of these '
+        'settings, which the server must share. The writes change its '
+        'data, so run it against a bench database.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--url', default='http://127.0.0.1:8000',
+            help='Address of the server loaded'
+        )
+        parser.add_argument(
+            '--mix', default=DEFAULT_MIX,
+            help='Weights of the routes requested, as name=weight,...'
+                 ' (routes: %s)' % ', '.join(ROUTES)
+        )
+        parser.add_argument(
+            '--roles', default=DEFAULT_ROLES,
+            help='Weights of the roles of the simulated users'
+        )
+        parser.add_argument(
+            '--concurrency', type=int, default=8,
+            help='Number of simulated users making requests at once'
+        )
+        parser.add_argument(
+            '--duration', type=float, default=30,
+            help='Seconds of load'
+        )
+        parser.add_argument(
+            '--seed', type=int, default=0,
+            help='Seed of the choices of the simulated users'
+        )
+        parser.add_argument(
+            '--output', help='File the JSON results are written to'
+        )
+        parser.add_argument(
+            '--baseline',
+            help='JSON results to compare with, failing on regressions'
+        )
+        parser.add_argument(
+            '--tolerance', type=float, default=0.2,
+            help='Fraction the req/s may drop and the p95 rise by before '
+                 'failing'
+        )
+        parser.add_argument(
+            '--save-baseline', action='store_true',
+            help='Write the results to the baseline file instead'
+        )
+
+    def handle(self, *args, **options):
+        if options['save_baseline'] and not options['baseline']:
+            raise CommandError('--save-baseline needs --baseline')
+
+        mix = parse_weights(options['mix'], ROUTES)
+        roles = parse_weights(
+            options['roles'], ('member', 'supervisor', 'superuser')
+        )
+        rng = random.Random(options['seed'])
+        users = [
+            self.user(role, index)
+            for index, role in enumerate(rng.choices(
+                list(roles), list(roles.values()), k=options['concurrency']
+            ))
+        ]
+
+        results = self.load(users, mix, options)
+        results['config'] = {
+            key: options[key]
+            for key in ('url', 'mix', 'roles', 'concurrency', 'duration')
+        }
+        output = json.dumps(results, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                f.write(output + '\n')
+        else:
+            self.stdout.write(output)
+
+        if options['save_baseline']:
+            with open(options['baseline'], 'w') as f:
+                f.write(output + '\n')
+        elif options['baseline']:
+            with open(options['baseline']) as f:
+                baseline = json.load(f)
+            regressions = find_regressions(
+                results, baseline, options['tolerance']
+            )
+            if regressions:
+                raise CommandError(
+                    'Regressions past the baseline:\n' +
+                    '\n'.join(regressions)
+                )
+
+    def user(self, role, index):
+        """Return a simulated user of the role, taking turns among them"""
+        members = get_user_model().objects.order_by('id')
+        if role == 'superuser':
+            members = members.filter(is_superuser=True)
+        elif role == 'supervisor':
+            members = members.filter(
+                is_superuser=False, supervised_projects__isnull=False
+            )
+        else:
+            members = members.filter(
+                is_superuser=False, projects__isnull=False,
+                supervised_projects__isnull=True
+            )
+
+        members = list(members.distinct()[:TARGETS])
+        if not members:
+            raise CommandError('No %s to simulate' % role)
+        return SimulatedUser(role, members[index % len(members)])
+
+    def load(self, users, mix, options):
+        """Make the users request the routes of the mix until the deadline"""
+        url = urlsplit(options['url'])
+        csrf_cookie, csrf_header = csrf_headers()
+        latencies = {name: [] for name in mix}
+        errors = {name: 0 for name in mix}
+        lock = threading.Lock()
+        deadline = time.monotonic() + options['duration']
+
+        def run(user, seed):
+            rng = random.Random(seed)
+            routes = user.routes(mix)
+            names, weights = list(routes), list(routes.values())
+            connection = http.client.HTTPConnection(
+                url.hostname, url.port or 80, timeout=30
+            )
+            headers = {'Cookie': '%s; %s' % (user.cookie, csrf_cookie)}
+
+            while names and time.monotonic() < deadline:
+                name, = rng.choices(names, weights)
+                method, path, data = ROUTES[name][0](user, rng)
+                request_headers = dict(headers)
+                body = None
+                if data is not None:
+                    body = urlencode(data)
+                    request_headers.update(csrf_header)
+                    request_headers['Content-Type'] = \
+                        'application/x-www-form-urlencoded'
+
+                start = time.perf_counter()
+                try:
+                    connection.request(
+                        method, path, body, headers=request_headers
+                    )
+                    response = connection.getresponse()
+                    response.read()
+                    failed = response.status >= 400
+                except (OSError, http.client.HTTPException):
+                    connection.close()
+                    failed = True
+                elapsed = (time.perf_counter() - start) * 1000
+
+                with lock:
+                    latencies[name].append(elapsed)
+                    errors[name] += failed
+            connection.close()
+
+        threads = [
+            threading.Thread(
+                target=run, args=(user, options['seed'] * 1000 + i)
+            )
+            for i, user in enumerate(users)
+        ]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        everything = [
+            latency for values in latencies.values() for latency in values
+        ]
+        if not everything:
+            raise CommandError('No request was made')
+        return {
+            'total': summarize(everything, sum(errors.values()), elapsed),
+            'routes': {
+                name: summarize(latencies[name], errors[name], elapsed)
+                for name in mix if latencies[name]
+            },
+        }
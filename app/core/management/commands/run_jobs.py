@@ -0,0 +1,79 @@
+import multiprocessing
+import signal
+import threading
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.utils.module_loading import autodiscover_modules
+
+from core.jobs import tasks, work
+
+
+class Command(BaseCommand):
+    help = (
+        'Run the jobs enqueued in the database, with workers claiming them '
+        'with SELECT ... FOR UPDATE SKIP LOCKED. The tasks modules of the '
+        'installed apps are imported to register their tasks.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=1,
+            help='Number of workers, each with its own connection'
+        )
+        parser.add_argument(
+            '--processes', action='store_true',
+            help='Run the workers in processes instead of threads'
+        )
+        parser.add_argument(
+            '--interval', type=float, default=1,
+            help='Seconds idle workers wait before looking for jobs again'
+        )
+        parser.add_argument(
+            '--burst', action='store_true',
+            help='Stop once no job is due instead of waiting for new ones'
+        )
+
+    def handle(self, *args, **options):
+        autodiscover_modules('tasks')
+        self.stdout.write('Registered tasks: %s' % (
+            ', '.join(sorted(tasks)) or 'none'
+        ))
+
+        if options['processes']:
+            # Forked workers must not share the connections of the parent
+            connections.close_all()
+            context = multiprocessing.get_context('fork')
+            stop = context.Event()
+            start = context.Process
+        else:
+            context = multiprocessing
+            stop = threading.Event()
+            start = threading.Thread
+        counter = context.Value('i', 0)
+
+        def stop_workers(signum, frame):
+            stop.set()
+
+        # Workers finish the job they run before stopping
+        handlers = {
+            signum: signal.signal(signum, stop_workers)
+            for signum in (signal.SIGINT, signal.SIGTERM)
+        }
+
+        workers = [
+            start(target=work, args=(
+                stop, options['interval'], options['burst'], counter
+            ))
+            for _ in range(options['workers'])
+        ]
+        try:
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+        finally:
+            for signum, handler in handlers.items():
+                signal.signal(signum, handler)
+
+        self.stdout.write('Ran %d job(s)' % counter.value)
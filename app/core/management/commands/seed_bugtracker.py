@@ -0,0 +1,507 @@
+import csv
+import io
+import itertools
+import math
+import random
+import time
+from datetime import datetime, time as day_start, timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from bugs.counters import \
+    FIX_TIME_SUMS, STATUS_COUNTERS, TOTAL_COUNTER, empty_counters
+from bugs.models import Bug, Message, StatusTransition
+from bugs.search import update_search_vectors
+from projects.models import Project
+
+
+SYLLABLES = (
+    'ba be bi bo bu da de di do du fa fe fi fo ka ke ki ko la le li lo lu '
+    'ma me mi mo na ne ni no pa pe pi po ra re ri ro sa se si so ta te ti '
+    'to va ve vi vo za ze zi zo'
+).split()
+
+FIRST_NAMES = (
+    'Ana Bruno Carla Daniel Elisa Felipe Gabriela Heitor Isabela Joao '
+    'Karina Lucas Marina Nicolas Olivia Pedro Rafaela Sofia Tiago Vitoria'
+).split()
+LAST_NAMES = (
+    'Almeida Barbosa Cardoso Costa Dias Ferreira Gomes Lima Martins '
+    'Moura Oliveira Pereira Ribeiro Rocha Santos Silva Souza Teixeira'
+).split()
+
+# Share of the projects in each status, and of their bugs in each status
+PROJECT_STATUS_WEIGHTS = {
+    'ON-GOING': 60, 'PAUSED': 15, 'FINISHED': 15, 'CLOSED': 10,
+}
+ACTIVE_BUG_STATUS_WEIGHTS = {
+    'WAITING': 30, 'BEING WORKED': 15, 'FIXED': 35, 'CLOSED': 20,
+}
+INACTIVE_BUG_STATUS_WEIGHTS = {'FIXED': 60, 'CLOSED': 40}
+
+# Chance of a bug in each status having assigned members
+ASSIGNED_CHANCE = {
+    'WAITING': 0.4, 'BEING WORKED': 1, 'FIXED': 0.8, 'CLOSED': 0.6,
+}
+
+# Chance of a fixed or closed bug having been worked on before
+WORKED_CHANCE = {'FIXED': 0.9, 'CLOSED': 0.3}
+
+HISTORY = timedelta(days=730)
+
+NULL = '\\N'
+
+
+class CopyWriter:
+    """Write rows with COPY FROM STDIN, on PostgreSQL
+
+    Rows go through the csv module, with None written as an unquoted \\N
+    that COPY reads as NULL and durations as a number of microseconds.
+    """
+
+    def __init__(self, chunk_size):
+        self.chunk_size = chunk_size
+
+    def write(self, model, fields, rows):
+        columns = ', '.join(
+            connection.ops.quote_name(model._meta.get_field(field).column)
+            for field in fields
+        )
+        sql = "COPY %s (%s) FROM STDIN WITH (FORMAT csv, NULL '\\N')" % (
+            connection.ops.quote_name(model._meta.db_table), columns
+        )
+
+        rows = iter(rows)
+        with connection.cursor() as cursor:
+            while True:
+                chunk = list(itertools.islice(rows, self.chunk_size))
+                if not chunk:
+                    return
+                buffer = io.StringIO()
+                csv.writer(buffer).writerows(
+                    [self.dump(value) for value in row] for row in chunk
+                )
+                buffer.seek(0)
+                cursor.copy_expert(sql, buffer)
+
+    @staticmethod
+    def dump(value):
+        if value is None:
+            return NULL
+        if isinstance(value, timedelta):
+            return '%d microseconds' % (value // timedelta(microseconds=1))
+        return value
+
+
+class BulkCreateWriter:
+    """Write rows with bulk_create, on any database"""
+
+    def __init__(self, chunk_size):
+        self.chunk_size = chunk_size
+
+    def write(self, model, fields, rows):
+        # Keep the given creation dates instead of the current time
+        dated = [
+            field for field in model._meta.fields
+            if getattr(field, 'auto_now_add', False)
+        ]
+        for field in dated:
+            field.auto_now_add = False
+
+        try:
+            rows = iter(rows)
+            while True:
+                chunk = list(itertools.islice(rows, self.chunk_size))
+                if not chunk:
+                    return
+                model.objects.bulk_create(
+                    [model(**dict(zip(fields, row))) for row in chunk]
+                )
+        finally:
+            for field in dated:
+                field.auto_now_add = True
+
+
+def allocate_ids(model, count):
+    """Reserve count consecutive ids for the model and return the first"""
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            # The sequence is moved past the reserved ids in one statement
+            cursor.execute(
+                'SELECT setval(pg_get_serial_sequence(%s, %s), '
+                'nextval(pg_get_serial_sequence(%s, %s)) + %s - 1)',
+                [model._meta.db_table, 'id'] * 2 + [max(count, 1)]
+            )
+            return cursor.fetchone()[0] - max(count, 1) + 1
+
+    last = model.objects.aggregate(last=Max('id'))['last'] or 0
+    return last + 1
+
+
+class Command(BaseCommand):
+    help = (
+        'Fill the database with synthetic members, projects, bugs and bug '
+        'board messages for benchmarks. Memberships and bugs follow heavy '
+        'tailed distributions, and the same seed creates the same data. '
+        'Rows are written in chunks with COPY on PostgreSQL.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--members', type=int, default=10000)
+        parser.add_argument('--projects', type=int, default=1000)
+        parser.add_argument('--bugs', type=int, default=100000)
+        parser.add_argument('--messages', type=int, default=200000)
+        parser.add_argument(
+            '--seed', type=int, default=0,
+            help='Seed of the generated data, also part of the emails'
+        )
+        parser.add_argument(
+            '--password', default='bugtracker',
+            help='Password of every member, hashed once'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=20000,
+            help='Number of rows written at once'
+        )
+        parser.add_argument(
+            '--no-copy', action='store_true',
+            help='Write with bulk_create even on PostgreSQL'
+        )
+        parser.add_argument(
+            '--no-search-vectors', action='store_true',
+            help='Leave the search vectors of the bugs empty'
+        )
+
+    def handle(self, *args, **options):
+        if options['members'] < 1 and (options['projects'] or options['bugs']):
+            raise CommandError('Projects and bugs need members')
+        if options['projects'] < 1 and options['bugs']:
+            raise CommandError('Bugs need projects')
+        if options['bugs'] < 1 and options['messages']:
+            raise CommandError('Messages need bugs')
+
+        self.rng = random.Random(options['seed'])
+        self.email = 'seed%d.member%%d@bugtracker.local' % options['seed']
+        if get_user_model().objects.filter(email=self.email % 0).exists():
+            raise CommandError(
+                'The database was already seeded with seed %d'
+                % options['seed']
+            )
+
+        if connection.vendor == 'postgresql' and not options['no_copy']:
+            self.writer = CopyWriter(options['chunk_size'])
+        else:
+            self.writer = BulkCreateWriter(options['chunk_size'])
+        self.end = timezone.make_aware(
+            datetime.combine(timezone.localdate(), day_start())
+        )
+        self.word_pool = self.draw_words(5000, 200000)
+
+        start = time.perf_counter()
+        # Projects are written last, with the counters of their bugs, which
+        # the deferred foreign key checks allow within the transaction
+        with transaction.atomic():
+            self.seed_members(options)
+            self.plan_projects(options)
+            self.seed_bugs(options)
+            self.seed_projects()
+        self.log(start, 'Seeded')
+
+        if not options['no_search_vectors']:
+            self.compute_search_vectors(options['chunk_size'])
+            self.log(start, 'Computed the search vectors')
+
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE')
+
+    def log(self, start, message):
+        self.stdout.write(
+            '%s in %.1fs' % (message, time.perf_counter() - start)
+        )
+
+    def draw_words(self, size, count):
+        """Return count words drawn from a zipfian vocabulary of size"""
+        words = set()
+        while len(words) < size:
+            words.add(''.join(
+                self.rng.sample(SYLLABLES, self.rng.randint(2, 4))
+            ))
+
+        words = sorted(words)
+        self.rng.shuffle(words)
+        weights = list(itertools.accumulate(
+            1 / (rank + 1) for rank in range(size)
+        ))
+        return self.rng.choices(words, cum_weights=weights, k=count)
+
+    def text(self, low, high):
+        """Return between low and high words following their frequencies
+
+        The words are a slice of a pool drawn once, which is much faster
+        than drawing each word and keeps their frequencies.
+        """
+        count = low + int(self.rng.random() * (high - low + 1))
+        start = int(self.rng.random() * (len(self.word_pool) - count))
+        return ' '.join(self.word_pool[start:start + count])
+
+    def date_between(self, start, end):
+        return start + (end - start) * self.rng.random()
+
+    def seed_members(self, options):
+        """Write the members, all sharing one password hash"""
+        count = options['members']
+        password = make_password(options['password'])
+        self.first_member = allocate_ids(get_user_model(), count)
+
+        def rows():
+            for i in range(count):
+                name = '%s %s' % (
+                    self.rng.choice(FIRST_NAMES), self.rng.choice(LAST_NAMES)
+                )
+                yield (
+                    self.first_member + i, password, False, '', '', False,
+                    True, self.date_between(self.end - HISTORY, self.end),
+                    name, self.email % i,
+                )
+
+        self.writer.write(get_user_model(), [
+            'id', 'password', 'is_superuser', 'first_name', 'last_name',
+            'is_staff', 'is_active', 'date_joined', 'name', 'email',
+        ], rows())
+        self.stdout.write('%d members' % count)
+
+    def plan_projects(self, options):
+        """Draw the projects and write their members and supervisors
+
+        Member counts per project follow a Pareto distribution, most
+        projects have a few members and some have hundreds.
+        """
+        count, members = options['projects'], options['members']
+        self.first_project = allocate_ids(Project, count)
+        self.projects = []
+        memberships, supervisions = [], []
+
+        for i in range(count):
+            project_id = self.first_project + i
+            status, = self.rng.choices(
+                list(PROJECT_STATUS_WEIGHTS),
+                list(PROJECT_STATUS_WEIGHTS.values())
+            )
+            created = self.date_between(self.end - HISTORY, self.end)
+            size = min(int(self.rng.paretovariate(1.2) * 2), members, 300)
+            project_members = [
+                self.first_member + index
+                for index in self.rng.sample(range(members), size)
+            ]
+            supervisors = project_members[:1 + (self.rng.random() < 0.3)]
+
+            memberships += [(project_id, m) for m in project_members]
+            supervisions += [(project_id, m) for m in supervisors]
+            self.projects.append({
+                'id': project_id, 'status': status, 'created': created,
+                'members': project_members,
+                'counters': empty_counters(),
+            })
+
+        fields = ['project_id', 'member_id']
+        self.writer.write(Project.members.through, fields, memberships)
+        self.writer.write(Project.supervisors.through, fields, supervisions)
+        self.stdout.write('%d projects, %d memberships, %d supervisors' % (
+            count, len(memberships), len(supervisions)
+        ))
+
+    def seed_bugs(self, options):
+        """Write the bugs, their assignments and their messages
+
+        Bugs are spread over the projects with zipfian weights, so a few
+        projects hold most of them. Their status follows their project's.
+        """
+        count, chunk_size = options['bugs'], options['chunk_size']
+        self.messages_per_bug = options['messages'] / max(count, 1)
+        self.message_limit = options['messages']
+        self.first_bug = allocate_ids(Bug, count)
+        self.bug_count = count
+        self.first_message = allocate_ids(Message, options['messages'])
+        self.message_count = 0
+        assignment_count = 0
+
+        popularity = list(range(len(self.projects)))
+        self.rng.shuffle(popularity)
+        self.project_weights = list(itertools.accumulate(
+            1 / (rank + 1) ** 0.7 for rank in popularity
+        ))
+
+        for start in range(0, count, chunk_size):
+            bugs, assignments, messages, transitions = [], [], [], []
+            for i in range(start, min(start + chunk_size, count)):
+                bugs.append(self.bug(
+                    self.first_bug + i, assignments, messages, transitions
+                ))
+
+            self.writer.write(Bug, [
+                'id', 'title', 'description', '_status', 'creationDate',
+                'closingDate', 'modified_at', 'status_changed_at',
+                'waiting_time', 'working_time', 'project_id', 'creator_id',
+            ], bugs)
+            self.writer.write(StatusTransition, [
+                'bug_id', 'project_id', 'from_status', 'to_status',
+                'changed_at', 'changed_by_id', 'elapsed',
+            ], transitions)
+            self.writer.write(
+                Bug.assigned_members.through, ['bug_id', 'member_id'],
+                assignments
+            )
+            self.writer.write(Message, [
+                'id', 'writer_id', 'bug_id', 'creationDate', 'content',
+            ], messages)
+            assignment_count += len(assignments)
+
+        self.stdout.write('%d bugs, %d assignments, %d messages' % (
+            count, assignment_count, self.message_count
+        ))
+
+    def bug(self, bug_id, assignments, messages, transitions):
+        """Draw a bug, adding its assignments, messages and transitions"""
+        project, = self.rng.choices(
+            self.projects, cum_weights=self.project_weights
+        )
+        status_weights = (
+            ACTIVE_BUG_STATUS_WEIGHTS
+            if project['status'] in Project.ACTIVE_STATUS
+            else INACTIVE_BUG_STATUS_WEIGHTS
+        )
+        status, = self.rng.choices(
+            list(status_weights), list(status_weights.values())
+        )
+        created = self.date_between(project['created'], self.end)
+        closed = None
+        if status not in Bug.ACTIVE_STATUS:
+            closed = min(
+                created + timedelta(days=self.rng.expovariate(1 / 10)),
+                self.end
+            )
+        creator = self.rng.choice(project['members'])
+        times = self.add_transitions(
+            transitions, bug_id, project, creator, status, created, closed
+        )
+
+        counters = project['counters']
+        counters[TOTAL_COUNTER] += 1
+        counters[STATUS_COUNTERS[status]] += 1
+        if status == 'FIXED':
+            for counter, field in FIX_TIME_SUMS.items():
+                counters[counter] += times[field]
+        if self.rng.random() < ASSIGNED_CHANCE[status]:
+            assignees = sorted(set(self.rng.choices(
+                project['members'], k=self.rng.randint(1, 2)
+            )))
+            assignments.extend((bug_id, member) for member in assignees)
+        self.add_messages(
+            messages, bug_id, project, created, closed or self.end
+        )
+
+        return (
+            bug_id, self.text(3, 8), self.text(10, 60), status, created,
+            closed, self.end, times['status_changed_at'],
+            times['waiting_time'], times['working_time'], project['id'],
+            creator,
+        )
+
+    def add_transitions(self, transitions, bug_id, project, creator, status,
+                        created, closed):
+        """Add the status transitions of a bug, returning its status times
+
+        Bugs wait from their creation, some are worked on, and the fixed
+        and closed ones end in their status when closed. The changes are
+        made by the first supervisor of the project.
+        """
+        worked = None
+        if status == Bug.WORKING_STATUS:
+            worked = self.date_between(created, self.end)
+        elif closed is not None and \
+                self.rng.random() < WORKED_CHANCE[status]:
+            worked = self.date_between(created, closed)
+
+        history = [('', Bug.WAITING_STATUS, created)]
+        if worked is not None:
+            history.append((Bug.WAITING_STATUS, Bug.WORKING_STATUS, worked))
+        if closed is not None:
+            history.append((history[-1][1], status, closed))
+
+        previous = None
+        for from_status, to_status, changed_at in history:
+            transitions.append((
+                bug_id, project['id'], from_status, to_status, changed_at,
+                creator if previous is None else project['members'][0],
+                None if previous is None else changed_at - previous,
+            ))
+            previous = changed_at
+
+        times = {
+            'status_changed_at': previous,
+            'waiting_time': timedelta(),
+            'working_time': timedelta(),
+        }
+        for (_, status_from, start), (_, _, end) in zip(history, history[1:]):
+            field = 'working_time' if status_from == Bug.WORKING_STATUS \
+                else 'waiting_time'
+            times[field] += end - start
+        return times
+
+    def add_messages(self, messages, bug_id, project, start, end):
+        """Add a geometrically distributed number of board messages"""
+        count = 0
+        if self.messages_per_bug:
+            stop = 1 / (1 + self.messages_per_bug)
+            count = int(
+                math.log(1 - self.rng.random()) / math.log(1 - stop)
+            )
+        count = min(count, self.message_limit - self.message_count)
+        for _ in range(count):
+            messages.append((
+                self.first_message + self.message_count,
+                self.rng.choice(project['members']), bug_id,
+                self.date_between(start, end), self.text(3, 30),
+            ))
+            self.message_count += 1
+
+    def seed_projects(self):
+        """Write the projects with the counters of their bugs"""
+        def rows():
+            for project in self.projects:
+                closed = None
+                if project['status'] in ('FINISHED', 'CLOSED'):
+                    closed = self.date_between(project['created'], self.end)
+                counters = project['counters']
+                yield (
+                    project['id'], 'Project %s' % self.text(1, 3).title(),
+                    self.text(10, 40), project['status'], project['created'],
+                    closed, self.end, counters[TOTAL_COUNTER],
+                    counters['waiting_bug_count'],
+                    counters['working_bug_count'],
+                    counters['fixed_bug_count'],
+                    counters['closed_bug_count'],
+                    counters['fixed_waiting_time'],
+                    counters['fixed_working_time'],
+                )
+
+        self.writer.write(Project, [
+            'id', 'title', 'description', '_status', 'creationDate',
+            'closingDate', 'modified_at', 'bug_count', 'waiting_bug_count',
+            'working_bug_count', 'fixed_bug_count', 'closed_bug_count',
+            'fixed_waiting_time', 'fixed_working_time',
+        ], rows())
+
+    def compute_search_vectors(self, chunk_size):
+        """Compute the search vectors of the seeded bugs chunk by chunk"""
+        last_bug = self.first_bug + self.bug_count - 1
+        for start in range(self.first_bug, last_bug + 1, chunk_size):
+            update_search_vectors(
+                Bug.objects.filter(id__range=(start, start + chunk_size - 1))
+            )
@@ -0,0 +1,74 @@
+import time
+from importlib import import_module
+
+from django.conf import settings
+from django.contrib.sessions.backends.db import SessionStore as DBStore
+from django.core.management.base import BaseCommand
+from django.db import connections, router
+from django.utils import timezone
+
+
+class Command(BaseCommand):
+    help = (
+        'Delete the expired database sessions in small chunks, each in its '
+        'own transaction, instead of the single DELETE of clearsessions '
+        'that locks the rows of every expired session at once.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size', type=int, default=1000,
+            help='Number of sessions deleted by each statement'
+        )
+        parser.add_argument(
+            '--pause', type=float, default=0.1,
+            help='Seconds to wait between chunks'
+        )
+        parser.add_argument(
+            '--interval', type=float,
+            help='Keep running, sweeping again after that many seconds'
+        )
+
+    def handle(self, *args, **options):
+        engine = import_module(settings.SESSION_ENGINE)
+        if not issubclass(engine.SessionStore, DBStore):
+            self.stdout.write(
+                'Nothing to sweep, the sessions are not kept in the database'
+            )
+            return
+
+        model = engine.SessionStore.get_model_class()
+        while True:
+            deleted = self.sweep(
+                model, options['chunk_size'], options['pause']
+            )
+            self.stdout.write('Deleted %d expired sessions' % deleted)
+            if options['interval'] is None:
+                return
+            time.sleep(options['interval'])
+
+    def sweep(self, model, chunk_size, pause):
+        """Delete the expired sessions chunk by chunk"""
+        connection = connections[router.db_for_write(model)]
+        table = connection.ops.quote_name(model._meta.db_table)
+        # Rows locked by requests refreshing their session are skipped,
+        # the next sweep removes them if they are still expired. The chunk
+        # is materialized first, a subquery could be scanned again by the
+        # plan and pick more rows than the limit.
+        sql = (
+            'WITH chunk AS MATERIALIZED ('
+            'SELECT session_key FROM {table} WHERE expire_date < %s '
+            'LIMIT %s FOR UPDATE SKIP LOCKED) '
+            'DELETE FROM {table} USING chunk '
+            'WHERE {table}.session_key = chunk.session_key'
+        ).format(table=table)
+
+        deleted = 0
+        while True:
+            with connection.cursor() as cursor:
+                cursor.execute(sql, [timezone.now(), chunk_size])
+                count = cursor.rowcount
+            deleted += count
+            if count < chunk_size:
+                return deleted
+            time.sleep(pause)
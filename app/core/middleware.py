@@ -0,0 +1,74 @@
+import time
+from contextlib import ExitStack
+
+from django.db import connections
+
+from .performance import get_performance_stats
+
+
+class RequestTimer:
+    """Execute wrapper adding up the queries of a request and their time"""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.sql_count = 0
+        self.sql_time = 0.0
+        self.template_time = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_count += 1
+            self.sql_time += time.perf_counter() - start
+
+    def render_started(self, response):
+        """Time the rendering of the template response, without its queries"""
+        start = time.perf_counter()
+        sql_time = self.sql_time
+
+        def rendered(response):
+            self.template_time += (
+                time.perf_counter() - start - (self.sql_time - sql_time)
+            )
+
+        response.add_post_render_callback(rendered)
+
+
+class PerformanceMiddleware:
+    """Middleware timing the queries, templates and total of each request
+
+    The times are sent in a Server-Timing header and added to the latency
+    histograms of the url name, shown to superusers on the admin
+    performance report. It must come first to time the other middleware.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timer = request.performance_timer = RequestTimer()
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(timer))
+            response = self.get_response(request)
+        total_time = time.perf_counter() - timer.start
+
+        match = request.resolver_match
+        get_performance_stats().record(
+            match.view_name if match else 'unresolved', total_time,
+            timer.sql_count, timer.sql_time, timer.template_time
+        )
+        response['Server-Timing'] = (
+            'db;desc="%d queries";dur=%.1f, template;dur=%.1f, '
+            'total;dur=%.1f' % (
+                timer.sql_count, timer.sql_time * 1000,
+                timer.template_time * 1000, total_time * 1000,
+            )
+        )
+        return response
+
+    def process_template_response(self, request, response):
+        request.performance_timer.render_started(response)
+        return response
@@ -1,9 +1,16 @@
 from django.shortcuts import get_object_or_404
+from django.conf import settings
+from django.core.exceptions import SuspiciousOperation
 from django.contrib.auth.mixins import UserPassesTestMixin
+from django.contrib.messages import get_messages
 from django.urls import reverse_lazy
+from django.utils.cache import get_conditional_response, patch_cache_control
 
 from projects.models import Project
+from projects.roles import get_role_map
 from bugs.models import Bug
+from .modified import make_etag
+from .pagination import KeysetPaginator, InvalidCursor
 
 
 class IsSuperuserMixin(UserPassesTestMixin):
@@ -32,10 +39,44 @@ class IsCurrentUserMixin(UserPassesTestMixin):
         )
 
 
-class IsInProjectMixin(UserPassesTestMixin):
-    """Mixin that only allows to view if user is part of the project"""
+class ObjectRoleMixin(UserPassesTestMixin):
+    """Base mixin for permissions that depend on the user role on an object
+
+    The bug or project addressed by the url is fetched once per request and
+    handed to get_object so the view does not load it again. The user roles
+    on its project come from the cached role map.
+    """
     login_url = reverse_lazy('members:login')
 
+    def get_permission_object(self):
+        """Return the requested object flagged with the user roles"""
+        if not hasattr(self, '_permission_object'):
+            if self.model == Bug:
+                queryset = Bug.objects.for_viewer(self.request.user)
+            else:
+                queryset = self.model.objects.all()
+
+            obj = get_object_or_404(queryset, pk=self.kwargs['pk'])
+            project_id = obj.project_id if self.model == Bug else obj.pk
+            role_map = get_role_map(self.request.user)
+
+            obj.is_project_member = project_id in role_map.member_of
+            obj.is_project_supervisor = project_id in role_map.supervisor_of
+            self._permission_object = obj
+
+        return self._permission_object
+
+    def get_object(self, queryset=None):
+        """Return the object already fetched for the permission check"""
+        if queryset is None:
+            return self.get_permission_object()
+
+        return super().get_object(queryset)
+
+
+class IsInProjectMixin(ObjectRoleMixin):
+    """Mixin that only allows to view if user is part of the project"""
+
     def test_func(self):
         if not self.request.user.is_authenticated:
             return False
@@ -43,26 +84,16 @@ class IsInProjectMixin(UserPassesTestMixin):
         if self.request.user.is_superuser:
             return True
 
-        if self.model:
-            current_object = get_object_or_404(
-                self.model, pk=self.kwargs['pk']
-            )
-
-            if self.model == Project:
-                return current_object in self.request.user.projects.all()
-
-            if self.model == Bug:
-                return current_object.project in \
-                    self.request.user.projects.all()
+        if self.model in (Project, Bug):
+            return self.get_permission_object().is_project_member
 
         print('IsInProjectMixin should be used only on models view of projects\
             and bugs!')
         return False
 
 
-class IsSupervisorMixin(UserPassesTestMixin):
+class IsSupervisorMixin(ObjectRoleMixin):
     """Mixin that only allows to view if user is a supervisor of the project"""
-    login_url = reverse_lazy('members:login')
 
     def test_func(self):
         if not self.request.user.is_authenticated:
@@ -71,26 +102,16 @@ class IsSupervisorMixin(UserPassesTestMixin):
         if self.request.user.is_superuser:
             return True
 
-        if self.model:
-            current_object = get_object_or_404(
-                self.model, pk=self.kwargs['pk']
-            )
-            supervised_projs = self.request.user.supervised_projects.all()
-
-            if self.model == Project:
-                return current_object in supervised_projs
-
-            if self.model == Bug:
-                return current_object.project in supervised_projs
+        if self.model in (Project, Bug):
+            return self.get_permission_object().is_project_supervisor
 
         print('IsSupervisorMixin should be used only on models views of \
             projects and bugs!')
         return False
 
 
-class IsSupervisorOrAssignedMixin(UserPassesTestMixin):
+class IsSupervisorOrAssignedMixin(ObjectRoleMixin):
     """Mixin that only allows to view if user is a supervisor of the project"""
-    login_url = reverse_lazy('members:login')
 
     def test_func(self):
         if not self.request.user.is_authenticated:
@@ -104,16 +125,12 @@ class IsSupervisorOrAssignedMixin(UserPassesTestMixin):
         if self.request.user.is_superuser:
             return True
 
-        bug = get_object_or_404(Bug, pk=self.kwargs['pk'])
-        supervised_projs = self.request.user.supervised_projects.all()
-
-        return bug.project in supervised_projs or \
-            self.request.user in bug.assigned_members.all()
+        bug = self.get_permission_object()
+        return bug.is_project_supervisor or bug.is_assigned_to_viewer
 
 
-class IsCreatorMixin(UserPassesTestMixin):
+class IsCreatorMixin(ObjectRoleMixin):
     """Mixin that only allows to view if user is the creator of the bug"""
-    login_url = reverse_lazy('members:login')
 
     def test_func(self):
         if not self.request.user.is_authenticated:
@@ -126,5 +143,94 @@ class IsCreatorMixin(UserPassesTestMixin):
         if self.request.user.is_superuser:
             return True
 
-        bug = get_object_or_404(Bug, pk=self.kwargs['pk'])
-        return bug.creator == self.request.user
+        return self.get_permission_object().creator_id == \
+            self.request.user.id
+
+
+class KeysetPaginationMixin:
+    """List view mixin that paginates the queryset by cursor (keyset)
+
+    The view ordering must be set and end in a unique field. The page cursor
+    is read from the 'cursor' GET parameter.
+    """
+    paginator_class = KeysetPaginator
+    cursor_kwarg = 'cursor'
+
+    def get_paginator(self, queryset, per_page, **kwargs):
+        """Return a keyset paginator ordered by the view ordering"""
+        return self.paginator_class(queryset, self.get_ordering(), per_page)
+
+    def paginate_queryset(self, queryset, page_size):
+        """Return the page pointed by the request cursor"""
+        paginator = self.get_paginator(queryset, page_size)
+        cursor = self.request.GET.get(self.cursor_kwarg)
+
+        try:
+            page = paginator.get_page(cursor)
+        except InvalidCursor:
+            raise SuspiciousOperation('Invalid page cursor!')
+
+        return (paginator, page, page.object_list, page.has_other_pages())
+
+
+class ConditionalGetMixin:
+    """Detail view mixin answering 304 Not Modified to unchanged pages
+
+    The page ETag comes from get_modified_state, which reads in one query the
+    project of the page and the modification times it depends on, and from
+    the viewer and its cached roles on the project. It is checked before the
+    permission mixins and the view run, so refreshing an unchanged page costs
+    that query only. Pages with flash messages to show, or rendered before
+    the CSRF cookie is set, are always rendered.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        etag = None
+        if request.method in ('GET', 'HEAD'):
+            etag = self.get_etag()
+
+        if etag is not None:
+            response = get_conditional_response(request, etag=etag)
+            if response is not None:
+                return self.add_validator(response, etag)
+
+        response = super().dispatch(request, *args, **kwargs)
+        if etag is not None and response.status_code == 200:
+            self.add_validator(response, etag)
+
+        return response
+
+    def get_modified_state(self):
+        """Return a dict of the page project_id and modification times"""
+        raise NotImplementedError
+
+    def get_etag(self):
+        """Return the ETag of the page, or None if it must be rendered"""
+        user = self.request.user
+        # The forms of the page hold a token of the CSRF cookie, the page
+        # rendered before the cookie is set cannot be reused
+        csrf_cookie = self.request.COOKIES.get(settings.CSRF_COOKIE_NAME)
+        if not user.is_authenticated or not csrf_cookie or \
+                len(get_messages(self.request)):
+            return None
+
+        state = self.get_modified_state()
+        if state is None:
+            return None
+
+        project_id = state.pop('project_id')
+        role_map = get_role_map(user)
+        if not user.is_superuser and project_id not in role_map.member_of:
+            return None
+
+        return make_etag(
+            self.request.get_full_path(), user.pk, user.name,
+            user.is_superuser, project_id in role_map.supervisor_of,
+            csrf_cookie, *state.values()
+        )
+
+    def add_validator(self, response, etag):
+        """Make the browsers revalidate the page on each use"""
+        response['ETag'] = etag
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
@@ -0,0 +1,35 @@
+from django.db import models
+from django.db.models import Q
+from django.utils import timezone
+
+
+class Job(models.Model):
+    """A call of a task left to the workers, deleted once it succeeds
+
+    Jobs are created in the transaction of the writes they follow, so they
+    only run if it commits. Failed runs are retried at run_at, with a
+    growing delay, until the attempts run out and failed_at is set.
+    """
+    task = models.CharField(max_length=200)
+    args = models.JSONField(default=list)
+    kwargs = models.JSONField(default=dict)
+    created_at = models.DateTimeField(default=timezone.now)
+    run_at = models.DateTimeField(default=timezone.now)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    last_error = models.TextField(blank=True)
+    failed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['run_at', 'id'], name='job_due_idx',
+                condition=Q(failed_at__isnull=True)
+            ),
+        ]
+
+    def __str__(self):
+        """Return the string representation of the job"""
+        return '%s: %s' % (self.id, self.task)
+
+    __repr__ = __str__
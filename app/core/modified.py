@@ -0,0 +1,28 @@
+"""
+Modification times of the bugs and projects, the validators of their pages.
+
+Bugs and projects bump their modified_at when saved. The changes shown on
+their pages that do not save them (assignments, memberships, board messages,
+the bugs of a project, renamed members) touch them from the signal handlers
+of the bugs and projects apps. The timestamps are written in the transaction
+of the change, so a page never gets a new validator before its data is
+visible.
+"""
+import hashlib
+
+from django.utils import timezone
+from django.utils.http import quote_etag
+
+
+def touch(model, ids):
+    """Bump the modification time of the objects with the given ids
+
+    The ids may also be a queryset of them, used as a subquery.
+    """
+    model.objects.filter(pk__in=ids).update(modified_at=timezone.now())
+
+
+def make_etag(*values):
+    """Return a strong ETag of the given values"""
+    digest = hashlib.md5(repr(values).encode()).hexdigest()
+    return quote_etag(digest)
@@ -0,0 +1,196 @@
+import base64
+import binascii
+import json
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+
+
+class InvalidCursor(Exception):
+    """Raised when a pagination cursor cannot be decoded"""
+
+
+class KeysetPage:
+    """A page of objects returned by a KeysetPaginator"""
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __repr__(self):
+        return '<KeysetPage of %s objects>' % len(self.object_list)
+
+
+class KeysetPaginator:
+    """Paginate a queryset by seeking on the values of its ordering fields
+
+    Pages are addressed by opaque cursors holding the ordering values of the
+    first or last object of the page, so fetching any page costs the same as
+    fetching the first one. The last ordering field must be unique so the
+    ordering is total.
+    """
+    NEXT = 'n'
+    PREVIOUS = 'p'
+
+    def __init__(self, queryset, ordering, per_page):
+        self.queryset = queryset
+        self.ordering = tuple(ordering)
+        self.per_page = int(per_page)
+        self.fields = [field.lstrip('-') for field in self.ordering]
+
+    def get_page(self, cursor=None):
+        """Return the page pointed by the cursor, or the first one if None"""
+        direction, values = self.NEXT, None
+        if cursor:
+            direction, values = self.decode_cursor(cursor)
+
+        return self._get_page(direction, values)
+
+    def get_page_before(self, obj):
+        """Return the page of the objects placed right before the object"""
+        return self._get_page(
+            self.PREVIOUS, [self._value(obj, field) for field in self.fields]
+        )
+
+    def _get_page(self, direction, values):
+        """Return the page seeking from the values in the given direction"""
+        backwards = direction == self.PREVIOUS
+
+        queryset = self.queryset.order_by(*self._ordering(backwards))
+        if values is not None:
+            queryset = queryset.filter(self._seek(values, backwards))
+
+        object_list = list(queryset[:self.per_page + 1])
+        has_more = len(object_list) > self.per_page
+        object_list = object_list[:self.per_page]
+
+        if backwards:
+            object_list.reverse()
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, values is not None
+
+        next_cursor = previous_cursor = None
+        if object_list and has_next:
+            next_cursor = self.encode_cursor(object_list[-1], self.NEXT)
+        if object_list and has_previous:
+            previous_cursor = self.encode_cursor(
+                object_list[0], self.PREVIOUS
+            )
+
+        return KeysetPage(object_list, next_cursor, previous_cursor)
+
+    def encode_cursor(self, obj, direction):
+        """Return an opaque cursor pointing after/before the given object"""
+        values = [
+            self._dump(self._value(obj, field)) for field in self.fields
+        ]
+        payload = json.dumps([direction, values], separators=(',', ':'))
+
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        """Return the direction and ordering values held by the cursor"""
+        try:
+            padding = '=' * (-len(cursor) % 4)
+            payload = base64.urlsafe_b64decode(cursor + padding)
+            direction, values = json.loads(payload.decode())
+        except (binascii.Error, UnicodeDecodeError, ValueError, TypeError):
+            raise InvalidCursor('Malformed cursor')
+
+        if direction not in (self.NEXT, self.PREVIOUS) or \
+                not isinstance(values, list) or \
+                len(values) != len(self.fields):
+            raise InvalidCursor('Cursor does not match the ordering')
+
+        try:
+            values = [
+                self._load(field, value)
+                for field, value in zip(self.fields, values)
+            ]
+        except (ValidationError, TypeError, ValueError):
+            raise InvalidCursor('Invalid cursor values')
+
+        return direction, values
+
+    def _ordering(self, backwards):
+        """Return the ordering, flipping every field if going backwards"""
+        if not backwards:
+            return self.ordering
+
+        return tuple(
+            field[1:] if field.startswith('-') else '-' + field
+            for field in self.ordering
+        )
+
+    def _seek(self, values, backwards):
+        """Return a filter for the rows placed after the cursor values
+
+        The rows after the cursor are those past it on the first field, or
+        equal on it and past it on the next one, and so on. That OR alone
+        gives the index no range to start from, so the inclusive bound on
+        the first field it implies is added for the scan to start at the
+        cursor instead of filtering every row before it.
+        """
+        ordering = self._ordering(backwards)
+        condition = Q()
+        for i, field_ordering in enumerate(ordering):
+            lookup = 'lt' if field_ordering.startswith('-') else 'gt'
+            clause = Q(**{
+                '%s__%s' % (self.fields[i], lookup): values[i]
+            })
+            for field, value in zip(self.fields[:i], values[:i]):
+                clause &= Q(**{field: value})
+            condition |= clause
+
+        if len(ordering) > 1:
+            lookup = 'lte' if ordering[0].startswith('-') else 'gte'
+            condition &= Q(**{'%s__%s' % (self.fields[0], lookup): values[0]})
+
+        return condition
+
+    def _load(self, field_name, value):
+        """Convert a cursor value back to the python type of the field
+
+        Values of annotations, like a search rank, are converted by their
+        output field.
+        """
+        try:
+            field = self.queryset.model._meta.get_field(field_name)
+        except FieldDoesNotExist:
+            annotation = self.queryset.query.annotations.get(field_name)
+            if annotation is None:
+                raise InvalidCursor('Cursor does not match the ordering')
+            field = annotation.output_field
+
+        return field.to_python(value)
+
+    @staticmethod
+    def _value(obj, field):
+        """Return the field value of an object or of a row from values()"""
+        if isinstance(obj, dict):
+            return obj[field]
+        return getattr(obj, field)
+
+    @staticmethod
+    def _dump(value):
+        """Convert a field value to a json serializable value"""
+        if hasattr(value, 'isoformat'):
+            return value.isoformat()
+        return value
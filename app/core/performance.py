@@ -0,0 +1,192 @@
+"""
+Latency histograms of the requests, shared by the workers of a server.
+
+The counters of each endpoint live in a file mapped in memory (under
+/dev/shm by default) so every gunicorn worker adds to the same histograms
+and any of them can report on all the requests. Updates are serialized with
+an exclusive lock on the file, taken for a few microseconds per request.
+"""
+import fcntl
+import mmap
+import os
+import struct
+import threading
+import zlib
+from contextlib import contextmanager
+
+from django.conf import settings
+
+
+# Upper bounds, in microseconds, of the buckets of the latency histograms.
+# Each is a quarter above the previous one, so percentiles read from them
+# are at most a quarter above the actual latency.
+BUCKETS = [int(250 * 1.25 ** i) for i in range(57)]
+
+MAX_ENDPOINTS = 512
+NAME_SIZE = 96
+
+# Counters kept for each endpoint, before its histogram
+FIELDS = (
+    'requests', 'total_time', 'sql_count', 'sql_time', 'template_time',
+    'max_queries',
+)
+SLOT_VALUES = len(FIELDS) + len(BUCKETS) + 1
+SLOT_SIZE = NAME_SIZE + 8 * SLOT_VALUES
+
+# The header holds the generation of the table, bumped when it is reset
+HEADER = struct.Struct('q')
+
+
+class PerformanceStats:
+    """Per endpoint request counters and latency histograms kept in a file
+
+    Instances opened on the same path, in one process or several, share the
+    counters. The file is opened again in forked processes, which would
+    otherwise share the lock of their parent.
+    """
+
+    def __init__(self, path, max_endpoints=MAX_ENDPOINTS):
+        self.path = path
+        self.max_endpoints = max_endpoints
+        self.size = HEADER.size + SLOT_SIZE * max_endpoints
+        self._pid = None
+        self._local = threading.Lock()
+
+    def _open(self):
+        if self._pid == os.getpid():
+            return
+
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        if os.fstat(fd).st_size < self.size:
+            os.ftruncate(fd, self.size)
+        self._fd = fd
+        self._map = mmap.mmap(fd, self.size)
+        self._values = memoryview(self._map).cast('q')
+        self._slots = {}
+        self._generation = None
+        self._pid = os.getpid()
+
+    @contextmanager
+    def _lock(self):
+        """Hold the lock of the threads of this process, then the file one"""
+        with self._local:
+            self._open()
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def _slot(self, name):
+        """Return the index of the endpoint slot, claiming a free one"""
+        generation = HEADER.unpack_from(self._map)[0]
+        if generation != self._generation:
+            self._slots = {}
+            self._generation = generation
+        if name in self._slots:
+            return self._slots[name]
+
+        encoded = name.encode()[:NAME_SIZE]
+        start = zlib.crc32(encoded) % self.max_endpoints
+        for probe in range(self.max_endpoints):
+            index = (start + probe) % self.max_endpoints
+            offset = HEADER.size + index * SLOT_SIZE
+            stored = self._map[offset:offset + NAME_SIZE].rstrip(b'\0')
+            if not stored:
+                self._map[offset:offset + len(encoded)] = encoded
+            if not stored or stored == encoded:
+                self._slots[name] = index
+                return index
+
+        return None
+
+    def _first_value(self, index):
+        return (HEADER.size + index * SLOT_SIZE + NAME_SIZE) // 8
+
+    def record(self, name, total_time, sql_count, sql_time, template_time):
+        """Add a request to the counters of its endpoint, times in seconds"""
+        total, sql, template = (
+            int(seconds * 1e6) for seconds in
+            (total_time, sql_time, template_time)
+        )
+        bucket = next(
+            (i for i, bound in enumerate(BUCKETS) if total <= bound),
+            len(BUCKETS)
+        )
+
+        with self._lock():
+            index = self._slot(name)
+            if index is None:
+                return
+
+            first = self._first_value(index)
+            values = self._values
+            values[first] += 1
+            values[first + 1] += total
+            values[first + 2] += sql_count
+            values[first + 3] += sql
+            values[first + 4] += template
+            values[first + 5] = max(values[first + 5], sql_count)
+            values[first + len(FIELDS) + bucket] += 1
+
+    def snapshot(self):
+        """Return the counters of each endpoint, times in milliseconds"""
+        endpoints = []
+        with self._lock():
+            for index in range(self.max_endpoints):
+                offset = HEADER.size + index * SLOT_SIZE
+                name = self._map[offset:offset + NAME_SIZE].rstrip(b'\0')
+                first = self._first_value(index)
+                values = self._values[first:first + SLOT_VALUES].tolist()
+                if name and values[0]:
+                    endpoints.append(
+                        _summary(name.decode(errors='replace'), values)
+                    )
+
+        return endpoints
+
+    def reset(self):
+        """Clear the counters of every endpoint"""
+        with self._lock():
+            generation = HEADER.unpack_from(self._map)[0]
+            self._map[:] = bytes(self.size)
+            HEADER.pack_into(self._map, 0, generation + 1)
+
+
+def _summary(name, values):
+    counters = dict(zip(FIELDS, values))
+    histogram = values[len(FIELDS):]
+    requests = counters['requests']
+
+    def percentile(quantile):
+        rank = quantile * requests
+        seen = 0
+        for bound, count in zip(BUCKETS, histogram):
+            seen += count
+            if seen >= rank:
+                return bound / 1000
+        return None
+
+    return {
+        'name': name,
+        'requests': requests,
+        'mean': counters['total_time'] / requests / 1000,
+        'p50': percentile(0.5),
+        'p95': percentile(0.95),
+        'p99': percentile(0.99),
+        'mean_queries': counters['sql_count'] / requests,
+        'max_queries': counters['max_queries'],
+        'mean_sql_time': counters['sql_time'] / requests / 1000,
+        'mean_template_time': counters['template_time'] / requests / 1000,
+    }
+
+
+_stats = {}
+
+
+def get_performance_stats():
+    """Return the shared counters at PERFORMANCE_STATS_PATH"""
+    path = settings.PERFORMANCE_STATS_PATH
+    if path not in _stats:
+        _stats[path] = PerformanceStats(path)
+    return _stats[path]
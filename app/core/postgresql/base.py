@@ -0,0 +1,98 @@
+from django.db.backends.base.base import NO_DB_ALIAS
+from django.db.backends.postgresql import base
+
+from .creation import DatabaseCreation
+from .pool import get_pool
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """PostgreSQL backend with connection health checks and pooling
+
+    With CONN_HEALTH_CHECKS, a persistent connection is checked with a cheap
+    query before its first use in each request, so connections dropped by
+    the server are replaced instead of failing the request.
+
+    POOL, a dict with the MAX_SIZE, TIMEOUT and MAX_LIFETIME of the pool,
+    makes the threads of the process share a bounded pool of connections.
+    Connections closed by Django are handed back to it instead.
+    """
+    creation_class = DatabaseCreation
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.health_check_done = False
+
+    @property
+    def health_check_enabled(self):
+        return self.settings_dict.get('CONN_HEALTH_CHECKS', False)
+
+    @property
+    def pool(self):
+        options = self.settings_dict.get('POOL')
+        if not options or self.alias == NO_DB_ALIAS:
+            return None
+        return get_pool((self.alias, self.settings_dict['NAME']), options)
+
+    def connect(self):
+        super().connect()
+        self.health_check_done = True
+
+    def get_new_connection(self, conn_params):
+        pool = self.pool
+        if pool is None:
+            return super().get_new_connection(conn_params)
+
+        connection = pool.get(
+            lambda: super(DatabaseWrapper, self).get_new_connection(
+                conn_params
+            ),
+            self.ping if self.health_check_enabled else None
+        )
+        self.isolation_level = self.settings_dict['OPTIONS'].get(
+            'isolation_level', connection.isolation_level
+        )
+        return connection
+
+    def _close(self):
+        pool = self.pool
+        if pool is None or self.connection is None:
+            return super()._close()
+
+        with self.wrap_database_errors:
+            if self.in_atomic_block:
+                # Django keeps using the connection until the block exits
+                pool.discard(self.connection)
+            else:
+                pool.put(self.connection)
+
+    def _cursor(self, name=None):
+        self.close_if_health_check_failed()
+        return super()._cursor(name)
+
+    def close_if_unusable_or_obsolete(self):
+        if self.connection is not None:
+            self.health_check_done = False
+        super().close_if_unusable_or_obsolete()
+
+    def close_if_health_check_failed(self):
+        """Close the connection if it fails its check of this request"""
+        if (
+            self.connection is None or
+            not self.health_check_enabled or
+            self.health_check_done
+        ):
+            return
+
+        if not self.is_usable():
+            self.close()
+        self.health_check_done = True
+
+    @staticmethod
+    def ping(connection):
+        """Return whether the connection still works"""
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+        except base.Database.Error:
+            return False
+        return True
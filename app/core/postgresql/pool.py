@@ -0,0 +1,220 @@
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+import psycopg2
+from psycopg2 import extensions
+
+
+logger = logging.getLogger(__name__)
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class PoolTimeout(psycopg2.OperationalError):
+    """No connection of the pool was released within the wait timeout"""
+
+
+class ConnectionPool:
+    """A bounded pool of database connections shared by the process threads
+
+    At most max_size connections are open at once; threads asking for one
+    while all are in use wait up to timeout seconds for one to be released.
+    Released connections are handed to the waiting threads in arrival
+    order, so a busy thread can't keep taking them back before the others.
+    Idle connections are reused last in, first out so the extra ones opened
+    on bursts are the first to outlive max_lifetime and get closed.
+    """
+
+    def __init__(self, max_size, timeout, max_lifetime=None):
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_lifetime = max_lifetime
+        self.idle = deque()
+        self.waiters = deque()
+        self.opened_at = {}
+        self.size = 0
+        self.lock = threading.Lock()
+        self.counters = {
+            'opened': 0, 'closed': 0, 'checkouts': 0, 'waits': 0,
+            'timeouts': 0, 'max_in_use': 0,
+        }
+        self.wait_time = 0.0
+
+    def get(self, connect, check=None):
+        """Return an idle connection, or a new one made by connect
+
+        Idle connections failing the check are closed and replaced.
+        """
+        while True:
+            connection = self._checkout()
+            if connection is None:
+                return self._open(connect)
+            if check is None or check(connection):
+                return connection
+            self.discard(connection)
+
+    def put(self, connection):
+        """Give back a connection, closing it if it can't be reused"""
+        if connection.closed or self._expired(connection):
+            return self.discard(connection)
+
+        status = connection.info.transaction_status
+        if status != extensions.TRANSACTION_STATUS_IDLE:
+            try:
+                connection.rollback()
+            except psycopg2.Error:
+                return self.discard(connection)
+
+        with self.lock:
+            if self.waiters:
+                self.waiters.popleft().hand(connection)
+            else:
+                self.idle.append(connection)
+
+    def discard(self, connection):
+        """Close a connection, making room for a new one"""
+        try:
+            connection.close()
+        except psycopg2.Error:
+            pass
+
+        with self.lock:
+            self.opened_at.pop(id(connection), None)
+            self.counters['closed'] += 1
+            self._release_slot()
+
+    def close(self):
+        """Close the idle connections"""
+        with self.lock:
+            idle, self.idle = list(self.idle), deque()
+        for connection in idle:
+            self.discard(connection)
+
+    def stats(self):
+        """Return the pool usage and saturation counters"""
+        with self.lock:
+            in_use = self.size - len(self.idle)
+            return dict(
+                self.counters,
+                max_size=self.max_size,
+                size=self.size,
+                idle=len(self.idle),
+                in_use=in_use,
+                waiting=len(self.waiters),
+                saturation=in_use / self.max_size,
+                wait_time=round(self.wait_time, 6),
+            )
+
+    def _checkout(self):
+        """Take an idle connection, or None if a new one may be opened"""
+        with self.lock:
+            if self.idle:
+                return self._checked_out(self.idle.pop())
+            if self.size < self.max_size:
+                self.size += 1
+                return self._checked_out(None)
+
+            waiter = Waiter()
+            self.waiters.append(waiter)
+            self.counters['waits'] += 1
+
+        started = time.monotonic()
+        waiter.event.wait(self.timeout)
+
+        with self.lock:
+            self.wait_time += time.monotonic() - started
+            if waiter.event.is_set():
+                return self._checked_out(waiter.connection)
+
+            self.waiters.remove(waiter)
+            self.counters['timeouts'] += 1
+
+        logger.warning(
+            'No database connection released in %ss, all %d are in use',
+            self.timeout, self.max_size
+        )
+        raise PoolTimeout('Timed out waiting for a database connection')
+
+    def _checked_out(self, connection):
+        self.counters['checkouts'] += 1
+        self.counters['max_in_use'] = max(
+            self.counters['max_in_use'], self.size - len(self.idle)
+        )
+        return connection
+
+    def _release_slot(self):
+        """Let the first waiting thread open a connection, if any"""
+        if self.waiters:
+            self.waiters.popleft().hand(None)
+        else:
+            self.size -= 1
+
+    def _open(self, connect):
+        try:
+            connection = connect()
+        except BaseException:
+            with self.lock:
+                self._release_slot()
+            raise
+
+        with self.lock:
+            self.opened_at[id(connection)] = time.monotonic()
+            self.counters['opened'] += 1
+        return connection
+
+    def _expired(self, connection):
+        if self.max_lifetime is None:
+            return False
+        opened_at = self.opened_at.get(id(connection), 0)
+        return time.monotonic() - opened_at >= self.max_lifetime
+
+
+class Waiter:
+    """A thread waiting for a connection, or None to open a new one"""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.connection = None
+
+    def hand(self, connection):
+        self.connection = connection
+        self.event.set()
+
+
+def get_pool(key, options):
+    """Return the pool of the key, creating it with the options if needed"""
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = ConnectionPool(
+                options.get('MAX_SIZE', 10),
+                options.get('TIMEOUT', 10),
+                options.get('MAX_LIFETIME'),
+            )
+        return _pools[key]
+
+
+def get_pools():
+    with _pools_lock:
+        return dict(_pools)
+
+
+def close_pools():
+    """Close the idle connections of every pool"""
+    for pool in get_pools().values():
+        pool.close()
+
+
+def _forget_pools():
+    # The connections belong to the parent process, closing them here would
+    # end its sessions too
+    global _pools_lock
+    _pools_lock = threading.Lock()
+    _pools.clear()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_forget_pools)
@@ -11,4 +11,178 @@ window.onmousedown = function (e) {
         var select = el.parentNode.cloneNode(true);
         el.parentNode.parentNode.replaceChild(select, el.parentNode);
     }
-}
\ No newline at end of file
+}
+
+// Follow the bug or project events, prepending the new bug board messages.
+// Without an events stream the board is polled instead.
+window.addEventListener('load', function () {
+    var notice = document.querySelector('[data-events-url]');
+    var board = document.querySelector('[data-newer-messages-url]');
+    var interval = 15000;
+    var fetching = false, pending = false, polling = false;
+
+    function latestId() {
+        var message = board.querySelector('[data-message-id]');
+        return message ? message.getAttribute('data-message-id') : 0;
+    }
+
+    function fetchNewer(onDone) {
+        if (fetching) {
+            pending = true;
+            return;
+        }
+        fetching = true;
+
+        var url = board.getAttribute('data-newer-messages-url');
+        fetch(url + '?after=' + latestId(), {credentials: 'same-origin'})
+            .then(function (res) {
+                if (!res.ok) throw new Error(res.statusText);
+
+                return res.text().then(function (html) {
+                    if (html.trim()) {
+                        board.insertAdjacentHTML('afterbegin', html);
+
+                        var empty = document.getElementById('message-board-empty');
+                        if (empty) empty.remove();
+                    }
+                    return res.headers.get('X-More-Messages');
+                });
+            })
+            .then(function (more) {
+                fetching = false;
+                if (more || pending) {
+                    pending = false;
+                    return fetchNewer(onDone);
+                }
+                if (onDone) onDone(true);
+            })
+            .catch(function () {
+                fetching = pending = false;
+                if (onDone) onDone(false);
+            });
+    }
+
+    function poll() {
+        fetchNewer(function (ok) {
+            setTimeout(poll, ok ? interval : interval * 4);
+        });
+    }
+
+    function startPolling() {
+        if (board && !polling) {
+            polling = true;
+            setTimeout(poll, interval);
+        }
+    }
+
+    function showNotice() {
+        notice.classList.remove('d-none');
+    }
+
+    if (!notice || !window.EventSource) return startPolling();
+
+    var source = new EventSource(notice.getAttribute('data-events-url'));
+    var connected = false;
+
+    source.onopen = function () {
+        // Catch up with the messages written while reconnecting
+        if (connected && board) fetchNewer();
+        connected = true;
+    };
+    source.onerror = function () {
+        if (source.readyState === EventSource.CLOSED) startPolling();
+    };
+    source.addEventListener('message', function () {
+        if (board) fetchNewer();
+    });
+    source.addEventListener('status', showNotice);
+});
+
+// Search the members to add to the selects that hold only the chosen ones.
+// Each match found as the user types is added to the select when clicked.
+window.addEventListener('load', function () {
+    var selects = document.querySelectorAll('select[data-member-search]');
+
+    Array.prototype.forEach.call(selects, function (select) {
+        var wrapper = document.createElement('div');
+        var input = document.createElement('input');
+        var results = document.createElement('div');
+        var timer = null, latest = 0;
+
+        input.type = 'search';
+        input.className = 'form-control mb-1';
+        input.placeholder = 'Search members by name or email';
+        input.setAttribute('autocomplete', 'off');
+        results.className = 'list-group mb-1';
+        select.parentNode.insertBefore(wrapper, select);
+        wrapper.appendChild(input);
+        wrapper.appendChild(results);
+        wrapper.appendChild(select);
+
+        function currentSelect() {
+            // The select may have been replaced by a clone when clicked
+            return wrapper.querySelector('select[data-member-search]');
+        }
+
+        function choose(member) {
+            var target = currentSelect();
+            var option = target.querySelector('option[value="' + member.id + '"]');
+            if (!option) {
+                option = new Option(member.name, member.id, true, true);
+                target.appendChild(option);
+            }
+            option.setAttribute('selected', '');
+            option.selected = true;
+            input.value = '';
+            results.innerHTML = '';
+        }
+
+        function search() {
+            var query = input.value.trim();
+            var request = ++latest;
+            if (!query) {
+                results.innerHTML = '';
+                return;
+            }
+
+            var url = select.getAttribute('data-member-search');
+            url += (url.indexOf('?') < 0 ? '?' : '&') + 'q=' + encodeURIComponent(query);
+            fetch(url, {credentials: 'same-origin'})
+                .then(function (res) {
+                    if (!res.ok) throw new Error(res.statusText);
+                    return res.json();
+                })
+                .then(function (data) {
+                    // Answers to older queries may arrive late
+                    if (request !== latest) return;
+
+                    results.innerHTML = '';
+                    data.results.forEach(function (member) {
+                        var item = document.createElement('button');
+                        item.type = 'button';
+                        item.className = 'list-group-item list-group-item-action';
+                        item.textContent = member.name;
+                        item.addEventListener('click', function () {
+                            choose(member);
+                        });
+                        results.appendChild(item);
+                    });
+                })
+                .catch(function () {
+                    results.innerHTML = '';
+                });
+        }
+
+        input.addEventListener('input', function () {
+            clearTimeout(timer);
+            timer = setTimeout(search, 200);
+        });
+        input.addEventListener('keydown', function (e) {
+            // Enter picks the first match instead of submitting the form
+            if (e.key !== 'Enter') return;
+            e.preventDefault();
+            var first = results.querySelector('button');
+            if (first) first.click();
+        });
+    });
+});
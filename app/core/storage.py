@@ -0,0 +1,53 @@
+import gzip
+import os
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Manifest storage also writing compressed copies of the text files
+
+    Next to each fingerprinted text file, collectstatic writes a .gz copy
+    and, when the brotli package is installed, a .br one, so nginx serves
+    them with gzip_static and brotli_static instead of compressing every
+    response. Copies not saving at least a twentieth are not kept.
+    """
+    compressible_extensions = (
+        '.css', '.js', '.map', '.svg', '.json', '.txt', '.html', '.xml',
+        '.ico', '.eot', '.ttf', '.otf',
+    )
+    min_saving = 0.05
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+
+        for name in sorted(set(self.hashed_files.values())):
+            extension = os.path.splitext(name)[1].lower()
+            if extension in self.compressible_extensions:
+                self.compress(name)
+
+    def compress(self, name):
+        """Write the compressed copies of a stored file"""
+        with self.open(name) as original:
+            content = original.read()
+
+        for suffix, compressed in self.compressed_variants(content):
+            variant = name + suffix
+            if self.exists(variant):
+                self.delete(variant)
+            if len(compressed) <= len(content) * (1 - self.min_saving):
+                self._save(variant, ContentFile(compressed))
+
+    @staticmethod
+    def compressed_variants(content):
+        yield '.gz', gzip.compress(content, compresslevel=9, mtime=0)
+        if brotli is not None:
+            yield '.br', brotli.compress(content, quality=11)
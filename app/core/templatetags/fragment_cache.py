@@ -0,0 +1,156 @@
+from django import template
+from django.db import models
+
+from core import fragments
+
+
+register = template.Library()
+
+GROUP_VARIABLE = '_fragment_group'
+
+
+class FragmentGroup:
+    """Fetch the cached fragments rendered in a block with batched lookups
+
+    The block is rendered twice: first only to collect the fragments it
+    holds, whose versions and cached content are then fetched with a
+    single lookup each, and then for real.
+    """
+
+    def __init__(self):
+        self.collecting = True
+        self.requested = []
+        self.versions = {}
+        self.found = {}
+        self.rendered = {}
+
+    def collect(self, name, values):
+        self.requested.append((name, values))
+
+    def fetch(self):
+        """Fetch the versions and contents of the collected fragments"""
+        self.collecting = False
+        self.versions = fragments.get_versions({
+            value for _, values in self.requested for value in values
+            if isinstance(value, models.Model)
+        })
+
+        keys = {}
+        for name, values in self.requested:
+            key = fragments.fragment_key(name, values, self.versions)
+            keys[key] = name
+        self.found = fragments.get_fragments(list(keys))
+
+        for name in set(keys.values()):
+            requested = [k for k, n in keys.items() if n == name]
+            hits = sum(1 for k in requested if k in self.found)
+            fragments.count_lookups(name, hits, len(requested) - hits)
+
+    def render(self, node, values, context):
+        """Return the cached fragment, rendering it if missing"""
+        key = fragments.fragment_key(node.name, values, self.versions)
+        content = self.found.get(key)
+        if content is None:
+            content = self.rendered[key] = node.nodelist.render(context)
+        return content
+
+    def store(self):
+        """Cache the fragments that had to be rendered"""
+        if self.rendered:
+            fragments.set_fragments(self.rendered)
+
+
+class FragmentGroupNode(template.Node):
+
+    def __init__(self, nodelist):
+        self.nodelist = nodelist
+
+    def render(self, context):
+        if not fragments.enabled():
+            return self.nodelist.render(context)
+
+        group = FragmentGroup()
+        with context.push(**{GROUP_VARIABLE: group}):
+            self.nodelist.render(context)
+            group.fetch()
+            output = self.nodelist.render(context)
+        group.store()
+
+        return output
+
+
+class CachedFragmentNode(template.Node):
+
+    def __init__(self, name, vary_on, nodelist):
+        self.name = name
+        self.vary_on = vary_on
+        self.nodelist = nodelist
+
+    def render(self, context):
+        if not fragments.enabled():
+            return self.nodelist.render(context)
+
+        values = [value.resolve(context) for value in self.vary_on]
+        group = context.get(GROUP_VARIABLE)
+
+        if group is None:
+            group = FragmentGroup()
+            group.collect(self.name, values)
+            group.fetch()
+            content = group.render(self, values, context)
+            group.store()
+            return content
+
+        if group.collecting:
+            group.collect(self.name, values)
+            return ''
+
+        return group.render(self, values, context)
+
+
+@register.tag
+def fragmentgroup(parser, token):
+    """Batch the cache lookups of the cached fragments inside the block
+
+    Usage::
+
+        {% fragmentgroup %}
+            {% for bug in bugs %}
+                {% cachedfragment 'bug_row' bug %}...{% endcachedfragment %}
+            {% endfor %}
+        {% endfragmentgroup %}
+    """
+    nodelist = parser.parse(('endfragmentgroup',))
+    parser.delete_first_token()
+    return FragmentGroupNode(nodelist)
+
+
+@register.tag
+def cachedfragment(parser, token):
+    """Cache the content of the block until the objects it shows change
+
+    Usage: {% cachedfragment 'name' object [value ...] %}
+
+    Model instances in the arguments add their version to the cache key,
+    bumped whenever they change, so the fragment never goes stale. Other
+    values are added to the key as they are. Anything specific to the
+    viewer must be kept out of the block. The block is rendered every time
+    when the default cache is local to each process.
+    """
+    bits = token.split_contents()
+    if len(bits) < 3:
+        raise template.TemplateSyntaxError(
+            '%r tag requires a name and at least one object' % bits[0]
+        )
+
+    name = bits[1].strip('\'"')
+    if name not in fragments.FRAGMENTS:
+        raise template.TemplateSyntaxError(
+            'Unknown fragment %r, add it to core.fragments.FRAGMENTS' % name
+        )
+
+    nodelist = parser.parse(('endcachedfragment',))
+    parser.delete_first_token()
+    return CachedFragmentNode(
+        name, [parser.compile_filter(bit) for bit in bits[2:]], nodelist
+    )
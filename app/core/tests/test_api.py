@@ -0,0 +1,137 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core import utils
+from core.pagination import KeysetPaginator
+from bugs.models import Bug
+
+
+class ApiViewTests(TestCase):
+    """Test the field selection, pagination and ETags of the API views"""
+
+    def setUp(self):
+        self.member = utils.sample_member(email='member@mail.com')
+        self.project = utils.sample_project()
+        self.project.members.add(self.member)
+        self.bugs = [
+            utils.sample_bug(
+                creator=self.member, project=self.project, title='Bug %d' % i
+            )
+            for i in range(5)
+        ]
+        self.client.force_login(self.member)
+        self.url = reverse('api:bug-list')
+
+    def test_unauthenticated(self):
+        """Test anonymous requests are refused"""
+        self.client.logout()
+        res = self.client.get(self.url)
+        self.assertEqual(res.status_code, 403)
+        self.assertEqual(res.json(), {'error': 'Authentication required'})
+
+    def test_read_only(self):
+        """Test the API does not accept writes"""
+        res = self.client.post(self.url)
+        self.assertEqual(res.status_code, 405)
+
+    def test_fields(self):
+        """Test only the fields asked for are returned, in that order"""
+        res = self.client.get(self.url, {'fields': 'title,id,title'})
+        self.assertEqual(
+            list(res.json()['results'][0]), ['title', 'id']
+        )
+
+    def test_unknown_fields(self):
+        """Test asking for unknown fields is a bad request"""
+        res = self.client.get(self.url, {'fields': 'id,password'})
+        self.assertEqual(res.status_code, 400)
+        self.assertIn('password', res.json()['error'])
+
+    def get_queries(self, fields):
+        """Return the queries of the bug tables made to list the fields"""
+        with CaptureQueriesContext(connection) as captured:
+            self.client.get(self.url, {'fields': fields})
+        return [
+            query['sql'] for query in captured.captured_queries
+            if '"bugs_bug' in query['sql']
+        ]
+
+    def test_queries_follow_fields(self):
+        """Test relations are only joined and fetched when asked for"""
+        queries = self.get_queries('id,title')
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn('JOIN', queries[0])
+        self.assertNotIn('description', queries[0])
+
+        queries = self.get_queries('id,project,creator')
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(queries[0].count('JOIN'), 2)
+
+        queries = self.get_queries('id,assigned_members')
+        self.assertEqual(len(queries), 2)
+        self.assertIn('bugs_bug_assigned_members', queries[1])
+
+    def test_cursor_pagination(self):
+        """Test the pages follow each other through the next urls"""
+        ids = []
+        url = self.url + '?fields=id&limit=2'
+        while url:
+            page = self.client.get(url).json()
+            ids.extend(bug['id'] for bug in page['results'])
+            url = page['next']
+
+        expected = Bug.objects.order_by('-creationDate', 'id') \
+            .values_list('id', flat=True)
+        self.assertEqual(ids, list(expected))
+
+    def test_previous_page(self):
+        """Test the previous url points back to the first page"""
+        first = self.client.get(self.url, {'limit': 2}).json()
+        second = self.client.get(first['next']).json()
+        self.assertIsNone(first['previous'])
+        self.assertEqual(self.client.get(second['previous']).json(), first)
+
+    def test_invalid_cursor_and_limit(self):
+        """Test invalid cursors and limits are bad requests"""
+        res = self.client.get(self.url, {'cursor': 'invalid'})
+        self.assertEqual(res.status_code, 400)
+        res = self.client.get(self.url, {'limit': 'many'})
+        self.assertEqual(res.status_code, 400)
+
+        for values in ([[1], 1], [{'a': 1}, 1], ['yesterday', 1]):
+            cursor = utils.encode_cursor('n', values)
+            res = self.client.get(self.url, {'cursor': cursor})
+            self.assertEqual(res.status_code, 400)
+
+    def test_etag(self):
+        """Test an unchanged result is not sent again"""
+        res = self.client.get(self.url)
+        etag = res['ETag']
+        self.assertRegex(etag, r'^"[0-9a-f]+"$')
+        self.assertIn('no-cache', res['Cache-Control'])
+
+        res = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, 304)
+        self.assertEqual(res.content, b'')
+
+        self.bugs[0].title = 'Renamed'
+        self.bugs[0].save()
+        res = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, 200)
+        self.assertNotEqual(res['ETag'], etag)
+
+    def test_keyset_cursor_of_rows(self):
+        """Test cursors can be made from the rows of values()"""
+        paginator = KeysetPaginator(
+            Bug.objects.values('id', 'creationDate'),
+            ('-creationDate', 'id'), 2
+        )
+        page = paginator.get_page()
+        following = paginator.get_page(page.next_cursor)
+        self.assertEqual(len(following), 2)
+        self.assertLess(
+            following.object_list[0]['creationDate'],
+            page.object_list[-1]['creationDate']
+        )
@@ -0,0 +1,172 @@
+import threading
+import time
+from types import SimpleNamespace
+from unittest import mock
+
+from django.db import connection
+from django.test import TestCase, SimpleTestCase, Client
+from django.urls import reverse
+from psycopg2 import extensions
+
+from core import utils
+from core.postgresql.base import DatabaseWrapper
+from core.postgresql.pool import ConnectionPool, PoolTimeout
+
+
+class FakeConnection:
+
+    def __init__(self):
+        self.closed = False
+        self.info = SimpleNamespace(
+            transaction_status=extensions.TRANSACTION_STATUS_IDLE
+        )
+        self.rollback = mock.Mock()
+
+    def close(self):
+        self.closed = True
+
+
+class ConnectionPoolTests(SimpleTestCase):
+    """Test the bounded pool of database connections"""
+
+    def test_connections_reused(self):
+        """Test released connections are reused last in, first out"""
+        pool = ConnectionPool(max_size=3, timeout=1)
+        first, second = pool.get(FakeConnection), pool.get(FakeConnection)
+        pool.put(first)
+        pool.put(second)
+
+        self.assertIs(pool.get(FakeConnection), second)
+        stats = pool.stats()
+        self.assertEqual(stats['opened'], 2)
+        self.assertEqual(stats['checkouts'], 3)
+        self.assertEqual(stats['in_use'], 1)
+        self.assertEqual(stats['idle'], 1)
+        self.assertAlmostEqual(stats['saturation'], 1 / 3)
+
+    def test_wait_for_released_connection(self):
+        """Test a full pool waits for a connection to be released"""
+        pool = ConnectionPool(max_size=1, timeout=5)
+        taken = pool.get(FakeConnection)
+        threading.Timer(0.05, pool.put, [taken]).start()
+
+        self.assertIs(pool.get(FakeConnection), taken)
+        self.assertEqual(pool.stats()['waits'], 1)
+        self.assertGreater(pool.stats()['wait_time'], 0)
+
+    def test_released_connection_handed_to_waiter(self):
+        """Test waiting threads get released connections before others"""
+        pool = ConnectionPool(max_size=1, timeout=5)
+        taken = pool.get(FakeConnection)
+        handed = []
+        waiter = threading.Thread(
+            target=lambda: handed.append(pool.get(FakeConnection))
+        )
+        waiter.start()
+        while not pool.stats()['waiting']:
+            time.sleep(0.001)
+
+        pool.put(taken)
+        pool.timeout = 0.01
+        with self.assertLogs('core.postgresql.pool', 'WARNING'):
+            with self.assertRaises(PoolTimeout):
+                pool.get(FakeConnection)
+        waiter.join()
+        self.assertEqual(handed, [taken])
+
+    def test_wait_timeout(self):
+        """Test a full pool raises once the wait timeout is over"""
+        pool = ConnectionPool(max_size=1, timeout=0.01)
+        pool.get(FakeConnection)
+
+        with self.assertLogs('core.postgresql.pool', 'WARNING'):
+            with self.assertRaises(PoolTimeout):
+                pool.get(FakeConnection)
+        self.assertEqual(pool.stats()['timeouts'], 1)
+        self.assertEqual(pool.stats()['saturation'], 1)
+
+    def test_broken_connections_replaced(self):
+        """Test connections failing the check or expired are closed"""
+        pool = ConnectionPool(max_size=2, timeout=1, max_lifetime=60)
+        broken = pool.get(FakeConnection)
+        pool.put(broken)
+
+        replacement = pool.get(FakeConnection, check=lambda c: False)
+        self.assertIsNot(replacement, broken)
+        self.assertTrue(broken.closed)
+
+        pool.opened_at[id(replacement)] -= 60
+        pool.put(replacement)
+        self.assertTrue(replacement.closed)
+        self.assertEqual(pool.stats()['size'], 0)
+
+    def test_open_transactions_rolled_back(self):
+        """Test connections are handed back outside of any transaction"""
+        pool = ConnectionPool(max_size=1, timeout=1)
+        taken = pool.get(FakeConnection)
+        taken.info.transaction_status = extensions.TRANSACTION_STATUS_INTRANS
+        pool.put(taken)
+
+        taken.rollback.assert_called_once()
+        self.assertEqual(pool.stats()['idle'], 1)
+
+
+class DatabaseWrapperTests(TestCase):
+    """Test the persistent and pooled connections of the database backend"""
+
+    def wrapper(self, **settings):
+        wrapper = DatabaseWrapper(
+            dict(connection.settings_dict, **settings), connection.alias
+        )
+        self.addCleanup(wrapper.close)
+        return wrapper
+
+    def test_pooled_connection_reused(self):
+        """Test closed connections go back to the pool"""
+        wrapper = self.wrapper(POOL={'MAX_SIZE': 2, 'TIMEOUT': 1})
+        self.addCleanup(wrapper.pool.close)
+
+        wrapper.ensure_connection()
+        raw = wrapper.connection
+        wrapper.close()
+        self.assertEqual(wrapper.pool.stats()['idle'], 1)
+
+        with wrapper.cursor() as cursor:
+            cursor.execute('SELECT 1')
+        self.assertIs(wrapper.connection, raw)
+        self.assertEqual(wrapper.pool.stats()['opened'], 1)
+        wrapper.close()
+
+    def test_health_check_replaces_dropped_connection(self):
+        """Test a connection dropped by the server is replaced"""
+        wrapper = self.wrapper(CONN_MAX_AGE=60, CONN_HEALTH_CHECKS=True)
+        wrapper.ensure_connection()
+        raw = wrapper.connection
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT pg_terminate_backend(%s)', [raw.get_backend_pid()]
+            )
+
+        # A new request starts
+        wrapper.close_if_unusable_or_obsolete()
+        with wrapper.cursor() as cursor:
+            cursor.execute('SELECT 1')
+        self.assertIsNot(wrapper.connection, raw)
+
+
+class DatabaseStatusViewTests(TestCase):
+    """Test the database status view"""
+
+    def test_superusers_only(self):
+        """Test only superusers see the connection status"""
+        client = Client()
+        url = reverse('database-status')
+
+        client.force_login(utils.sample_member())
+        self.assertEqual(client.get(url).status_code, 403)
+
+        client.force_login(utils.sample_superuser())
+        response = client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('health_checks', response.json()['default'])
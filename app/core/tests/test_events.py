@@ -0,0 +1,226 @@
+import asyncio
+import json
+import select
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.test import TestCase, TransactionTestCase, Client
+from django.urls import reverse
+
+from core import utils
+from core.events import EventBroker, EventStreamRouter, broker, publish
+from bugs.events import event_routes
+
+
+def notification(streams, **event):
+    return json.dumps({'streams': streams, 'event': event})
+
+
+class EventBrokerTests(TestCase):
+    """Test the in-process fan-out of the event broker"""
+
+    def setUp(self):
+        self.broker = EventBroker(queue_size=2)
+        self.broker.ensure_listening = mock.Mock()
+
+    def test_dispatch_to_stream_subscribers(self):
+        """Test events only reach the subscribers of their streams"""
+        async def scenario():
+            bug_queues = [self.broker.subscribe('bug:1') for _ in range(3)]
+            project_queue = self.broker.subscribe('project:1')
+            other_queue = self.broker.subscribe('bug:2')
+
+            self.broker.dispatch(notification(['bug:1', 'project:1'], n=1))
+
+            for queue in bug_queues + [project_queue]:
+                self.assertEqual(
+                    queue.get_nowait(), b'event: message\ndata: {"n": 1}\n\n'
+                )
+            self.assertTrue(other_queue.empty())
+
+            self.broker.unsubscribe('bug:2', other_queue)
+            self.assertEqual(self.broker.num_subscribers, 4)
+            self.assertNotIn('bug:2', self.broker.subscribers)
+
+        asyncio.run(scenario())
+
+    def test_slow_subscribers_lose_oldest_events(self):
+        """Test full queues drop their oldest events"""
+        async def scenario():
+            queue = self.broker.subscribe('bug:1')
+            for n in range(3):
+                self.broker.dispatch(notification(['bug:1'], n=n))
+            self.broker.dispatch('not json')
+
+            self.assertIn(b'"n": 1', queue.get_nowait())
+            self.assertIn(b'"n": 2', queue.get_nowait())
+            self.assertEqual(self.broker.stats['dropped'], 1)
+            self.assertEqual(self.broker.stats['received'], 3)
+
+        asyncio.run(scenario())
+
+
+class EventPublishTests(TransactionTestCase):
+    """Test the events are sent through the database notifications"""
+
+    def test_publish_reaches_listener(self):
+        """Test a published event is received by a listening connection"""
+        listener = EventBroker().connect()
+        try:
+            publish(['bug:1'], {'type': 'message'})
+
+            select.select([listener], [], [], 5)
+            listener.poll()
+            self.assertEqual(len(listener.notifies), 1)
+            self.assertEqual(
+                json.loads(listener.notifies[0].payload),
+                {'streams': ['bug:1'], 'event': {'type': 'message'}}
+            )
+        finally:
+            listener.close()
+
+
+class EventStreamRouterTests(TestCase):
+    """Test the Server-Sent Events streams of the ASGI application"""
+
+    def setUp(self):
+        self.member = utils.sample_member()
+        self.outsider = utils.sample_member(email='outsider@mail.com')
+        self.project = utils.sample_project()
+        self.project.members.add(self.member)
+        self.bug = utils.sample_bug(creator=self.member, project=self.project)
+
+        self.application = mock.AsyncMock()
+        self.router = EventStreamRouter(self.application, event_routes)
+
+        # Like the test client, keep the connection of the test transaction
+        for patcher in [
+            mock.patch.object(broker, 'ensure_listening'),
+            mock.patch('core.events.close_old_connections'),
+        ]:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def request(self, path, user=None, event=None):
+        """Request the path, returning the ASGI messages sent back
+
+        The event is dispatched once the stream is open, and the client
+        disconnects after receiving it.
+        """
+        headers = []
+        if user is not None:
+            client = Client()
+            client.force_login(user)
+            cookie = client.cookies[settings.SESSION_COOKIE_NAME].value
+            headers.append((
+                b'cookie',
+                ('%s=%s' % (settings.SESSION_COOKIE_NAME, cookie)).encode()
+            ))
+
+        scope = {
+            'type': 'http', 'method': 'GET', 'path': path, 'headers': headers
+        }
+        sent = []
+
+        async def scenario():
+            disconnected = asyncio.Event()
+
+            async def receive():
+                await disconnected.wait()
+                return {'type': 'http.disconnect'}
+
+            async def send(message):
+                sent.append(message)
+                if message.get('body') == b': connected\n\n' and event:
+                    broker.dispatch(event)
+                elif len(sent) > 2 or not event:
+                    disconnected.set()
+
+            await asyncio.wait_for(self.router(scope, receive, send), 5)
+
+        async_to_sync(scenario)()
+        return sent
+
+    def test_other_requests_passed_to_django(self):
+        """Test requests outside the event routes reach the application"""
+        self.request('/bugs/%d' % self.bug.id)
+        self.application.assert_awaited_once()
+
+    def test_stream_permissions(self):
+        """Test only members of the project can open its streams"""
+        paths = [
+            '/events/bugs/%d' % self.bug.id,
+            '/events/projects/%d' % self.project.id,
+        ]
+
+        for path in paths:
+            for user, status in [
+                (None, 403), (self.outsider, 403), (self.member, 200)
+            ]:
+                sent = self.request(path, user)
+                self.assertEqual(sent[0]['status'], status)
+
+        sent = self.request('/events/bugs/98765', self.member)
+        self.assertEqual(sent[0]['status'], 403)
+        self.application.assert_not_awaited()
+
+    def test_stream_delivers_events(self):
+        """Test the events of the stream are sent as Server-Sent Events"""
+        event = notification(
+            ['bug:%d' % self.bug.id], type='message', id=3
+        )
+        sent = self.request(
+            '/events/bugs/%d' % self.bug.id, self.member, event
+        )
+
+        self.assertEqual(sent[0]['status'], 200)
+        self.assertIn(
+            (b'content-type', b'text/event-stream'), sent[0]['headers']
+        )
+        self.assertEqual(
+            sent[2]['body'],
+            b'event: message\ndata: {"type": "message", "id": 3}\n\n'
+        )
+        self.assertEqual(broker.num_subscribers, 0)
+
+
+class EventPublishingViewsTests(TestCase):
+    """Test the bug views publish their events"""
+
+    def setUp(self):
+        self.member = utils.sample_member()
+        self.project = utils.sample_project()
+        self.project.members.add(self.member)
+        self.project.supervisors.add(self.member)
+        self.bug = utils.sample_bug(creator=self.member, project=self.project)
+        self.bug.assigned_members.add(self.member)
+
+        self.client = Client()
+        self.client.force_login(self.member)
+
+    def published_events(self, url, payload):
+        """Post to the url, returning the streams and events published"""
+        with mock.patch('bugs.events.publish') as publish_mock:
+            self.client.post(url, payload)
+
+        return [call.args for call in publish_mock.call_args_list]
+
+    def test_views_publish_events(self):
+        """Test messages and status changes notify the bug and project"""
+        streams = ['bug:%d' % self.bug.id, 'project:%d' % self.project.id]
+        requests = [
+            ('bugs:create_message', {'content': 'Hi'}, 'message'),
+            ('bugs:change_status', {'status': 'FIXED'}, 'status'),
+            ('bugs:change_working_status', {'starting': 1}, 'status'),
+        ]
+
+        for url_name, payload, event_type in requests:
+            events = self.published_events(
+                reverse(url_name, args=[self.bug.id]), payload
+            )
+
+            self.assertEqual(len(events), 1, url_name)
+            self.assertEqual(events[0][0], streams)
+            self.assertEqual(events[0][1]['type'], event_type)
+            self.assertEqual(events[0][1]['bug'], self.bug.id)
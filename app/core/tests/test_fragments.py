@@ -0,0 +1,119 @@
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache, caches
+from django.core.management import call_command
+from django.template import Context, Template
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+
+from core import utils
+from core.fragments import FRAGMENT_CACHE, fragment_stats
+
+
+BUG_ROWS = Template(
+    "{% include 'bugs/bug_list_group.html' with show_projects=True %}"
+)
+
+
+@override_settings(FRAGMENT_CACHE_ENABLED=True)
+class FragmentCacheTests(TestCase):
+    """Test the versioned cache of the rendered fragments"""
+
+    def setUp(self):
+        cache.clear()
+        caches[FRAGMENT_CACHE].clear()
+
+        self.member = utils.sample_member()
+        self.project = utils.sample_project(title='Tracker')
+        self.project.members.add(self.member)
+        self.bugs = [
+            utils.sample_bug(self.member, self.project, title='Bug %d' % i)
+            for i in range(3)
+        ]
+
+        self.client = Client()
+        self.client.force_login(self.member)
+
+    def render_rows(self):
+        return BUG_ROWS.render(Context({'bugs': self.bugs}))
+
+    def test_fragments_served_from_cache(self):
+        """Test rendered rows are cached and fetched in one lookup"""
+        first = self.render_rows()
+
+        # Unsaved changes do not bump the version, so the cached row is used
+        self.bugs[0].title = 'Unsaved title'
+        with mock.patch(
+            'core.fragments.get_fragments',
+            side_effect=caches[FRAGMENT_CACHE].get_many
+        ) as get_fragments:
+            second = self.render_rows()
+
+        self.assertEqual(first, second)
+        get_fragments.assert_called_once()
+        self.assertEqual(fragment_stats()['bug_row']['misses'], 3)
+        self.assertEqual(fragment_stats()['bug_row']['hits'], 3)
+
+    def test_changes_make_fragments_stale(self):
+        """Test saving a bug or its project renders its row again"""
+        self.render_rows()
+
+        self.bugs[0].title = 'Renamed bug'
+        self.bugs[0].save()
+        self.assertIn('Renamed bug', self.render_rows())
+
+        self.project.title = 'Renamed project'
+        self.project.save()
+        self.assertEqual(self.render_rows().count('Renamed project'), 3)
+
+    def test_viewer_badges_not_cached(self):
+        """Test the badges of a cached row depend on the viewer"""
+        other = utils.sample_member(email='other@mail.com')
+        self.project.members.add(other)
+        url = reverse('bugs:list')
+
+        self.assertContains(self.client.get(url), 'creator', count=3)
+
+        self.client.force_login(other)
+        response = self.client.get(url)
+        self.assertContains(response, 'Bug 0')
+        self.assertNotContains(response, 'creator')
+        self.assertGreater(fragment_stats()['bug_row']['hits'], 0)
+
+    def test_project_people_changes(self):
+        """Test the project sidebars follow new people and renames"""
+        url = reverse('projects:detail', args=[self.project.id])
+        self.assertContains(self.client.get(url), 'Sample Member')
+
+        newcomer = utils.sample_member(email='new@mail.com', name='Newcomer')
+        self.project.supervisors.add(newcomer)
+        self.assertContains(self.client.get(url), 'Newcomer')
+
+        newcomer.name = 'Renamed Newcomer'
+        newcomer.save(update_fields=['name'])
+        self.assertContains(self.client.get(url), 'Renamed Newcomer')
+
+        newcomer.supervised_projects.clear()
+        self.assertNotContains(self.client.get(url), 'Renamed Newcomer')
+
+    def test_stats_command(self):
+        """Test the stats command reports the hit ratio of the fragments"""
+        self.render_rows()
+        self.render_rows()
+
+        out = StringIO()
+        call_command('fragment_cache_stats', stdout=out)
+        self.assertIn('bug_row', out.getvalue())
+        self.assertIn('50.0%', out.getvalue())
+
+    @override_settings(FRAGMENT_CACHE_ENABLED=False)
+    def test_local_default_cache_skips_fragments(self):
+        """Test fragments are rendered every time without a shared cache"""
+        self.render_rows()
+
+        self.bugs[0].title = 'Unsaved title'
+        with mock.patch('core.fragments.get_fragments') as get_fragments:
+            self.assertIn('Unsaved title', self.render_rows())
+        get_fragments.assert_not_called()
+        self.assertEqual(fragment_stats()['bug_row']['misses'], 0)
@@ -0,0 +1,69 @@
+import gc
+import os
+import runpy
+from unittest import mock
+
+from django.conf import settings
+from django.test import SimpleTestCase
+
+
+MEMCACHED = 'django.core.cache.backends.memcached.MemcachedCache'
+LOCMEM = 'django.core.cache.backends.locmem.LocMemCache'
+
+
+class GunicornConfTests(SimpleTestCase):
+    """Test the gunicorn settings read from the environment"""
+
+    def load(self, **environ):
+        environ.setdefault('GUNICORN_PRELOAD', '0')
+        with mock.patch.dict(os.environ, environ):
+            return runpy.run_path(str(settings.BASE_DIR / 'gunicorn.conf.py'))
+
+    def test_workers_sized_from_cpus(self):
+        """Test the number of workers depends on the CPUs and worker class"""
+        conf = self.load(GUNICORN_WORKER_CLASS='sync', CACHE_BACKEND=MEMCACHED)
+        cpus = conf['available_cpus']()
+        self.assertEqual(conf['workers'], 2 * cpus + 1)
+        self.assertEqual(conf['threads'], 1)
+
+        conf = self.load(
+            GUNICORN_WORKER_CLASS='gthread', CACHE_BACKEND=MEMCACHED
+        )
+        self.assertEqual(conf['workers'], cpus + 1)
+        self.assertEqual(conf['threads'], 4)
+
+        conf = self.load(SERVER_MODE='asgi', GUNICORN_WORKERS='2')
+        self.assertEqual(conf['worker_class'], 'uvicorn.workers.UvicornWorker')
+        self.assertEqual(conf['workers'], 2)
+
+    def test_single_worker_without_shared_cache(self):
+        """Test a single worker runs while the default cache is local"""
+        conf = self.load(GUNICORN_WORKER_CLASS='sync', CACHE_BACKEND=LOCMEM)
+        self.assertEqual(conf['workers'], 1)
+
+        conf = self.load(CACHE_BACKEND=LOCMEM, GUNICORN_WORKERS='3')
+        self.assertEqual(conf['workers'], 3)
+
+    def test_unknown_worker_class(self):
+        """Test only the supported worker classes are accepted"""
+        with self.assertRaises(ValueError):
+            self.load(GUNICORN_WORKER_CLASS='eventlet')
+
+    def test_max_requests_jitter(self):
+        """Test the jitter defaults to a tenth of the max requests"""
+        conf = self.load(GUNICORN_MAX_REQUESTS='500')
+        self.assertEqual(conf['max_requests_jitter'], 50)
+
+    def test_preload_freezes_objects_before_fork(self):
+        """Test the collector only runs in workers, after freezing"""
+        self.addCleanup(gc.enable)
+        self.addCleanup(gc.unfreeze)
+
+        conf = self.load(GUNICORN_PRELOAD='1')
+        self.assertTrue(conf['preload_app'])
+        self.assertFalse(gc.isenabled())
+
+        conf['pre_fork'](None, None)
+        self.assertGreater(gc.get_freeze_count(), 0)
+        conf['post_fork'](None, None)
+        self.assertTrue(gc.isenabled())
@@ -0,0 +1,164 @@
+import threading
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+
+from core import jobs
+from core.models import Job
+from projects.models import Project
+
+
+calls = []
+started = threading.Event()
+release = threading.Event()
+
+
+@jobs.job
+def record(value, title=None):
+    calls.append(value)
+    if title is not None:
+        Project.objects.create(title=title)
+
+
+@jobs.job(max_attempts=2)
+def fail(title):
+    Project.objects.create(title=title)
+    raise ValueError('Task failed')
+
+
+@jobs.job
+def block(value):
+    calls.append(value)
+    started.set()
+    release.wait(5)
+
+
+class JobTests(TestCase):
+    """Test enqueueing and running jobs"""
+
+    def setUp(self):
+        calls.clear()
+
+    def test_enqueue_and_run(self):
+        """Test a job calls its task with its arguments and is deleted"""
+        job = jobs.enqueue(record, 1, title='Saved')
+        self.assertEqual(job.task, 'core.tests.test_jobs.record')
+
+        self.assertEqual(jobs.run_next_job(), job)
+        self.assertEqual(calls, [1])
+        self.assertTrue(Project.objects.filter(title='Saved').exists())
+        self.assertFalse(Job.objects.exists())
+        self.assertIsNone(jobs.run_next_job())
+
+    def test_jobs_run_in_order(self):
+        """Test the jobs due first run first"""
+        jobs.enqueue(record, 1)
+        jobs.enqueue(record, 2)
+        later = jobs.enqueue(record, 3)
+        later.run_at = timezone.now() + timedelta(minutes=1)
+        later.save()
+
+        while jobs.run_next_job():
+            pass
+        self.assertEqual(calls, [1, 2])
+
+    def test_enqueue_rolled_back_with_writes(self):
+        """Test a job enqueued in a rolled back transaction is dropped"""
+        try:
+            with transaction.atomic():
+                Project.objects.create(title='Rolled back')
+                jobs.enqueue(record, 1)
+                raise ValueError
+        except ValueError:
+            pass
+
+        self.assertFalse(Job.objects.exists())
+
+    @mock.patch('core.jobs.random.uniform', return_value=1)
+    def test_failed_job_retried_with_backoff(self, uniform):
+        """Test a failed task is rolled back and retried later"""
+        job = jobs.enqueue(fail, 'Failed')
+
+        before = timezone.now()
+        jobs.run_next_job()
+        job.refresh_from_db()
+        self.assertEqual(job.attempts, 1)
+        self.assertIn('Task failed', job.last_error)
+        self.assertGreaterEqual(
+            job.run_at, before + timedelta(seconds=jobs.BACKOFF)
+        )
+        self.assertIsNone(job.failed_at)
+        self.assertFalse(Project.objects.filter(title='Failed').exists())
+        self.assertIsNone(jobs.run_next_job())
+
+        Job.objects.update(run_at=timezone.now())
+        jobs.run_next_job()
+        job.refresh_from_db()
+        self.assertEqual(job.attempts, 2)
+        self.assertIsNotNone(job.failed_at)
+        self.assertIsNone(jobs.run_next_job())
+
+    @mock.patch('core.jobs.random.uniform', return_value=1)
+    def test_backoff(self, uniform):
+        """Test the retry delay doubles up to the maximum"""
+        self.assertEqual(jobs.backoff(1), timedelta(seconds=jobs.BACKOFF))
+        self.assertEqual(jobs.backoff(3), timedelta(seconds=4 * jobs.BACKOFF))
+        self.assertEqual(
+            jobs.backoff(100), timedelta(seconds=jobs.MAX_BACKOFF)
+        )
+
+    def test_unknown_task_fails(self):
+        """Test a job of a task no longer registered is not retried"""
+        Job.objects.create(task='core.tests.test_jobs.missing')
+
+        jobs.run_next_job()
+        job = Job.objects.get()
+        self.assertEqual(job.attempts, 1)
+        self.assertIsNotNone(job.failed_at)
+
+
+class JobWorkerTests(TransactionTestCase):
+    """Test workers running jobs concurrently"""
+
+    def setUp(self):
+        calls.clear()
+        started.clear()
+        release.clear()
+
+    def test_locked_jobs_skipped(self):
+        """Test a worker skips the job another one is running"""
+        jobs.enqueue(block, 1)
+        jobs.enqueue(record, 2)
+
+        def run():
+            jobs.run_next_job()
+            connection.close()
+
+        worker = threading.Thread(target=run)
+        worker.start()
+        self.assertTrue(started.wait(5))
+
+        self.assertEqual(jobs.run_next_job().args, [2])
+        self.assertIsNone(jobs.run_next_job())
+        release.set()
+        worker.join()
+
+        self.assertEqual(calls, [1, 2])
+        self.assertFalse(Job.objects.exists())
+
+    def test_run_jobs_command(self):
+        """Test the workers of the command run every due job"""
+        for value in range(10):
+            jobs.enqueue(record, value)
+
+        out = StringIO()
+        call_command('run_jobs', '--workers', '3', '--burst', stdout=out)
+
+        self.assertEqual(sorted(calls), list(range(10)))
+        self.assertIn('Ran 10 job(s)', out.getvalue())
+        self.assertFalse(Job.objects.exists())
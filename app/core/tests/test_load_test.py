@@ -0,0 +1,102 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connections
+from django.test import LiveServerTestCase, SimpleTestCase
+
+from bugs.models import Message
+from core import utils
+from core.management.commands.load_test import find_regressions
+
+
+def results(rps, p95):
+    return {'routes': {'bugs:list': {'rps': rps, 'p95': p95}}}
+
+
+class FindRegressionsTests(SimpleTestCase):
+    """Test the results are compared with the baseline"""
+
+    def test_within_tolerance(self):
+        """Test small changes are not regressions"""
+        self.assertEqual(
+            find_regressions(results(90, 11), results(100, 10), 0.2), []
+        )
+
+    def test_regressions(self):
+        """Test slower throughput and latency are both reported"""
+        regressions = find_regressions(
+            results(50, 20), results(100, 10), 0.2
+        )
+        self.assertEqual(len(regressions), 2)
+        self.assertIn('bugs:list: 50.0 req/s, baseline 100.0', regressions)
+
+
+class LoadTestCommandTests(LiveServerTestCase):
+    """Test the load test command against a live server"""
+
+    @classmethod
+    def setUpClass(cls):
+        # The live server threads do not close persistent connections,
+        # which would keep the test database from being dropped
+        database = connections.databases['default']
+        cls.conn_max_age = database['CONN_MAX_AGE']
+        database['CONN_MAX_AGE'] = 0
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        connections.databases['default']['CONN_MAX_AGE'] = cls.conn_max_age
+
+    def setUp(self):
+        member = utils.sample_member()
+        supervisor = utils.sample_member(email='supervisor@mail.com')
+        utils.sample_superuser()
+        project = utils.sample_project()
+        project.members.add(member)
+        project.supervisors.add(supervisor)
+        utils.sample_bug(member, project)
+
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.baseline = os.path.join(directory.name, 'baseline.json')
+
+    def load_test(self, *args):
+        out = StringIO()
+        call_command(
+            'load_test', '--url', self.live_server_url, '--duration', '1',
+            '--concurrency', '3', '--roles',
+            'member=1,supervisor=1,superuser=1', *args, stdout=out
+        )
+        return out.getvalue()
+
+    def test_report(self):
+        """Test every route of the mix is requested without errors"""
+        report = json.loads(self.load_test())
+
+        self.assertGreater(report['total']['requests'], 0)
+        self.assertEqual(report['total']['errors'], 0)
+        self.assertEqual(set(report['routes']), {
+            'bugs:list', 'bugs:detail', 'projects:detail', 'members:detail',
+            'bugs:create_message', 'bugs:change_status',
+            'bugs:assign_member',
+        })
+        self.assertTrue(Message.objects.exists())
+
+    def test_baseline(self):
+        """Test results regressing past the saved baseline fail"""
+        mix = ['--mix', 'bugs:list']
+        self.load_test('--baseline', self.baseline, '--save-baseline', *mix)
+        with open(self.baseline) as f:
+            baseline = json.load(f)
+
+        baseline['routes']['bugs:list']['rps'] *= 100
+        with open(self.baseline, 'w') as f:
+            json.dump(baseline, f)
+
+        with self.assertRaisesMessage(CommandError, 'bugs:list'):
+            self.load_test('--baseline', self.baseline, *mix)
@@ -0,0 +1,83 @@
+from django.test import TestCase, RequestFactory
+from django.http import Http404
+
+from core import utils
+from core.mixins import \
+    IsInProjectMixin, \
+    IsSupervisorMixin, \
+    IsSupervisorOrAssignedMixin, \
+    IsCreatorMixin
+from bugs.models import Bug
+from projects.models import Project
+from projects.roles import get_role_map
+
+
+class ObjectRoleMixinTests(TestCase):
+    """Test the permission mixins that depend on the user role"""
+
+    def setUp(self):
+        self.supervisor = utils.sample_member(email='supervisor@mail.com')
+        self.assigned = utils.sample_member(email='assigned@mail.com')
+        self.member = utils.sample_member(email='member@mail.com')
+        self.outsider = utils.sample_member(email='outsider@mail.com')
+
+        self.project = utils.sample_project()
+        self.project.members.add(self.supervisor, self.assigned, self.member)
+        self.project.supervisors.add(self.supervisor)
+
+        self.bug = utils.sample_bug(
+            creator=self.member, project=self.project
+        )
+        self.bug.assigned_members.add(self.assigned)
+
+    def make_view(self, mixin, model, user, pk=None):
+        """Return a view instance using the mixin set up for a request"""
+        if pk is None:
+            pk = self.bug.pk if model == Bug else self.project.pk
+
+        view = type('View', (mixin,), {'model': model})()
+        view.request = RequestFactory().get('/')
+        view.request.user = user
+        view.kwargs = {'pk': pk}
+        return view
+
+    def test_role_checks(self):
+        """Test each mixin allows exactly the expected roles"""
+        expected = [
+            (IsInProjectMixin, Bug, self.member, True),
+            (IsInProjectMixin, Bug, self.outsider, False),
+            (IsInProjectMixin, Project, self.assigned, True),
+            (IsInProjectMixin, Project, self.outsider, False),
+            (IsSupervisorMixin, Bug, self.supervisor, True),
+            (IsSupervisorMixin, Bug, self.member, False),
+            (IsSupervisorMixin, Project, self.supervisor, True),
+            (IsSupervisorMixin, Project, self.assigned, False),
+            (IsSupervisorOrAssignedMixin, Bug, self.supervisor, True),
+            (IsSupervisorOrAssignedMixin, Bug, self.assigned, True),
+            (IsSupervisorOrAssignedMixin, Bug, self.member, False),
+            (IsCreatorMixin, Bug, self.member, True),
+            (IsCreatorMixin, Bug, self.supervisor, False),
+        ]
+
+        for mixin, model, user, allowed in expected:
+            view = self.make_view(mixin, model, user)
+            self.assertEqual(view.test_func(), allowed, mixin.__name__)
+
+    def test_object_fetched_once(self):
+        """Test the permission check and get_object share a single query"""
+        view = self.make_view(IsSupervisorOrAssignedMixin, Bug, self.assigned)
+        get_role_map(self.assigned)
+
+        with self.assertNumQueries(1):
+            self.assertTrue(view.test_func())
+            bug = view.get_object()
+            self.assertEqual(bug.project, self.project)
+
+        self.assertEqual(bug, self.bug)
+
+    def test_inexistent_object(self):
+        """Test the permission check raises 404 on inexistent objects"""
+        view = self.make_view(IsInProjectMixin, Bug, self.member, pk=98765)
+
+        with self.assertRaises(Http404):
+            view.test_func()
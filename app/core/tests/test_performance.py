@@ -0,0 +1,147 @@
+import multiprocessing
+import os
+import re
+import tempfile
+
+from django.test import TestCase, SimpleTestCase, Client, override_settings
+from django.urls import reverse
+
+from core import utils
+from core.performance import PerformanceStats, get_performance_stats
+
+
+def record_requests(path, count):
+    stats = PerformanceStats(path)
+    for _ in range(count):
+        stats.record('bugs:bug-list', 0.01, 2, 0.004, 0.003)
+
+
+class PerformanceStatsTests(SimpleTestCase):
+    """Test the request histograms shared in a file"""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'performance')
+
+    def test_summary(self):
+        """Test the counters and percentiles of an endpoint"""
+        stats = PerformanceStats(self.path)
+        for i in range(100):
+            stats.record('bug-detail', 0.002 if i < 90 else 0.1, i, 0, 0)
+
+        endpoint, = stats.snapshot()
+        self.assertEqual(endpoint['name'], 'bug-detail')
+        self.assertEqual(endpoint['requests'], 100)
+        self.assertAlmostEqual(endpoint['mean'], 11.8)
+        self.assertTrue(2 <= endpoint['p50'] < 2.5)
+        self.assertTrue(100 <= endpoint['p95'] < 125)
+        self.assertEqual(endpoint['max_queries'], 99)
+        self.assertAlmostEqual(endpoint['mean_queries'], 49.5)
+
+    def test_shared_between_processes(self):
+        """Test the workers of a server add to the same counters"""
+        context = multiprocessing.get_context('fork')
+        workers = [
+            context.Process(target=record_requests, args=(self.path, 200))
+            for _ in range(4)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        endpoint, = PerformanceStats(self.path).snapshot()
+        self.assertEqual(endpoint['requests'], 800)
+        self.assertAlmostEqual(endpoint['mean_queries'], 2)
+
+    def test_reset(self):
+        """Test resetting clears the endpoints seen by every instance"""
+        stats, other = PerformanceStats(self.path), PerformanceStats(self.path)
+        stats.record('bug-detail', 0.01, 1, 0, 0)
+        other.reset()
+        self.assertEqual(stats.snapshot(), [])
+
+        stats.record('project-detail', 0.01, 1, 0, 0)
+        self.assertEqual(
+            [endpoint['name'] for endpoint in other.snapshot()],
+            ['project-detail']
+        )
+
+    def test_full_table(self):
+        """Test endpoints past the size of the table are not recorded"""
+        stats = PerformanceStats(self.path, max_endpoints=2)
+        for name in ('first', 'second', 'third'):
+            stats.record(name, 0.01, 1, 0, 0)
+
+        self.assertEqual(len(stats.snapshot()), 2)
+
+
+class PerformanceMiddlewareTests(TestCase):
+    """Test the requests are timed and reported"""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings = override_settings(
+            PERFORMANCE_STATS_PATH=os.path.join(directory.name, 'stats')
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+        self.member = utils.sample_member()
+        self.superuser = utils.sample_superuser()
+        self.client = Client()
+
+    def test_server_timing(self):
+        """Test the response times its queries and template"""
+        self.client.force_login(self.member)
+        response = self.client.get(reverse('member-profile'))
+
+        timing = re.fullmatch(
+            r'db;desc="(\d+) queries";dur=[\d.]+, template;dur=[\d.]+, '
+            r'total;dur=[\d.]+',
+            response['Server-Timing']
+        )
+        self.assertIsNotNone(timing)
+        self.assertGreater(int(timing.group(1)), 0)
+
+        endpoint, = get_performance_stats().snapshot()
+        self.assertEqual(endpoint['name'], 'member-profile')
+        self.assertEqual(endpoint['max_queries'], int(timing.group(1)))
+        self.assertGreater(endpoint['mean_template_time'], 0)
+
+    def test_report(self):
+        """Test superusers see the endpoints, slowest first"""
+        stats = get_performance_stats()
+        stats.record('bugs:bug-list', 0.01, 3, 0, 0)
+        stats.record('projects:project-detail', 0.5, 40, 0, 0)
+
+        self.client.force_login(self.superuser)
+        response = self.client.get(reverse('performance-report'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [endpoint['name'] for endpoint in response.context['endpoints']],
+            ['projects:project-detail', 'bugs:bug-list']
+        )
+        self.assertContains(response, 'projects:project-detail')
+
+    def test_report_reset(self):
+        """Test superusers can reset the counters"""
+        get_performance_stats().record('bugs:bug-list', 0.01, 3, 0, 0)
+
+        self.client.force_login(self.superuser)
+        response = self.client.post(reverse('performance-report'))
+
+        self.assertRedirects(response, reverse('performance-report'))
+        # Only the resetting request is left
+        endpoint, = get_performance_stats().snapshot()
+        self.assertEqual(endpoint['name'], 'performance-report')
+
+    def test_report_superuser_only(self):
+        """Test members cannot see the report"""
+        self.client.force_login(self.member)
+        response = self.client.get(reverse('performance-report'))
+
+        self.assertEqual(response.status_code, 403)
@@ -0,0 +1,96 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from bugs.models import Bug, Message
+from projects.models import Project
+
+
+class SeedBugtrackerTests(TestCase):
+    """Test the synthetic data generator"""
+
+    def seed(self, *args, seed=1):
+        call_command(
+            'seed_bugtracker', '--members', '40', '--projects', '8',
+            '--bugs', '300', '--messages', '500', '--seed', str(seed),
+            '--chunk-size', '64', *args, stdout=StringIO()
+        )
+        return get_user_model().objects \
+            .filter(email__startswith='seed%d.' % seed)
+
+    def snapshot(self, members):
+        """Return the seeded data with ids relative to the first ones"""
+        first_member = members.order_by('id').first().id
+        projects = Project.objects.filter(members__in=members).distinct()
+        first_project = projects.order_by('id').first().id
+        bugs = Bug.objects.filter(project__in=projects).order_by('id')
+        first_bug = bugs.first().id
+
+        return [
+            (
+                bug.id - first_bug, bug.title, bug.status, bug.creationDate,
+                bug.project_id - first_project, bug.creator_id - first_member,
+                sorted(
+                    m.id - first_member for m in bug.assigned_members.all()
+                ),
+                [
+                    (m.content, m.writer_id - first_member, m.creationDate)
+                    for m in bug.messages.order_by('id')
+                ],
+            )
+            for bug in bugs.prefetch_related('assigned_members', 'messages')
+        ]
+
+    def test_seeded_data(self):
+        """Test the rows are created with consistent counters"""
+        members = self.seed()
+
+        self.assertEqual(members.count(), 40)
+        self.assertEqual(Project.objects.count(), 8)
+        self.assertEqual(Bug.objects.count(), 300)
+        self.assertTrue(0 < Message.objects.count() <= 500)
+        self.assertFalse(Bug.objects.filter(search_vector__isnull=True))
+        self.assertTrue(members.first().check_password('bugtracker'))
+        self.assertEqual(
+            set(Bug.objects.values_list('_status', flat=True)),
+            set(Bug.POSSIBLE_STATUS)
+        )
+        for bug in Bug.objects.filter(assigned_members__isnull=False):
+            self.assertTrue(set(bug.assigned_members.all()) <= set(
+                bug.project.members.all()
+            ))
+
+        for bug in Bug.objects.prefetch_related('transitions')[:50]:
+            transitions = sorted(
+                bug.transitions.all(), key=lambda t: t.changed_at
+            )
+            self.assertEqual(transitions[0].to_status, 'WAITING')
+            self.assertEqual(transitions[-1].to_status, bug.status)
+            self.assertEqual(
+                transitions[-1].changed_at, bug.status_changed_at
+            )
+
+        out = StringIO()
+        call_command('rebuild_bug_counters', '--check', stdout=out)
+        self.assertIn('No drift found', out.getvalue())
+
+    def test_deterministic(self):
+        """Test a seed creates the same data with COPY and bulk_create"""
+        members = self.seed()
+        copied = self.snapshot(members)
+        Project.objects.filter(members__in=members).delete()
+        members.delete()
+
+        members = self.seed('--no-copy')
+        self.assertEqual(self.snapshot(members), copied)
+
+    def test_seeded_twice(self):
+        """Test a seed cannot be used twice on the same database"""
+        self.seed()
+        with self.assertRaises(CommandError):
+            self.seed()
+        self.seed(seed=2)
+        self.assertEqual(Project.objects.count(), 16)
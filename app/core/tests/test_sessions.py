@@ -0,0 +1,124 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.conf import settings
+from django.contrib.sessions.backends.db import SessionStore
+from django.contrib.sessions.models import Session
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from core import checks, utils
+
+
+class SessionStoreTests(TestCase):
+    """Test the selectable session stores"""
+
+    def setUp(self):
+        caches[settings.SESSION_CACHE_ALIAS].clear()
+        self.member = utils.sample_member()
+        self.url = reverse('member-profile')
+
+    def session_queries(self, client):
+        with CaptureQueriesContext(connection) as captured:
+            response = client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return [
+            query for query in captured.captured_queries
+            if Session._meta.db_table in query['sql']
+        ]
+
+    def test_database_store(self):
+        """Test the database store reads the session on each request"""
+        client = Client()
+        client.force_login(self.member)
+
+        self.assertEqual(len(self.session_queries(client)), 1)
+
+    def test_stores_without_queries(self):
+        """Test the cache and cookie stores keep the member logged in
+        without querying the session table"""
+        for store in ('cache', 'signed_cookies'):
+            engine = settings.SESSION_ENGINES[store]
+            with self.subTest(store=store), \
+                    override_settings(SESSION_ENGINE=engine):
+                client = Client()
+                client.force_login(self.member)
+
+                self.assertEqual(self.session_queries(client), [])
+                self.assertEqual(self.session_queries(client), [])
+
+    def test_cached_database_store(self):
+        """Test the write-through store reads the session from the cache"""
+        engine = settings.SESSION_ENGINES['cached_db']
+        with override_settings(SESSION_ENGINE=engine):
+            client = Client()
+            client.force_login(self.member)
+            self.assertTrue(Session.objects.exists())
+
+            self.assertEqual(self.session_queries(client), [])
+
+            # Sessions evicted from the cache are read from the database
+            caches[settings.SESSION_CACHE_ALIAS].clear()
+            self.assertEqual(len(self.session_queries(client)), 1)
+            self.assertEqual(self.session_queries(client), [])
+
+    def test_per_worker_cache_warning(self):
+        """Test sessions cached in each worker memory are warned about"""
+        engine = settings.SESSION_ENGINES['cache']
+        with override_settings(SESSION_ENGINE=engine):
+            warnings = checks.check_session_cache(None)
+        self.assertEqual([w.id for w in warnings], ['core.W001'])
+
+        engine = settings.SESSION_ENGINES['signed_cookies']
+        with override_settings(SESSION_ENGINE=engine):
+            self.assertEqual(checks.check_session_cache(None), [])
+
+
+class SweepSessionsTests(TestCase):
+    """Test the expired sessions are deleted in chunks"""
+
+    def create_sessions(self, count, expire_date):
+        keys = []
+        for _ in range(count):
+            session = SessionStore()
+            session.create()
+            keys.append(session.session_key)
+        Session.objects.filter(session_key__in=keys) \
+            .update(expire_date=expire_date)
+        return keys
+
+    def test_expired_sessions_deleted(self):
+        """Test only the expired sessions are deleted, chunk by chunk"""
+        now = timezone.now()
+        expired = self.create_sessions(5, now - timedelta(days=1))
+        active = self.create_sessions(2, now + timedelta(days=1))
+
+        out = StringIO()
+        with CaptureQueriesContext(connection) as captured:
+            call_command(
+                'sweep_sessions', chunk_size=2, pause=0, stdout=out
+            )
+
+        self.assertIn('Deleted 5 expired sessions', out.getvalue())
+        self.assertFalse(Session.objects.filter(session_key__in=expired))
+        self.assertEqual(
+            Session.objects.filter(session_key__in=active).count(), 2
+        )
+        deletes = [
+            query for query in captured.captured_queries
+            if 'DELETE' in query['sql']
+        ]
+        self.assertEqual(len(deletes), 3)
+
+    def test_nothing_to_sweep(self):
+        """Test stores outside the database have nothing to sweep"""
+        engine = settings.SESSION_ENGINES['signed_cookies']
+        out = StringIO()
+        with override_settings(SESSION_ENGINE=engine):
+            call_command('sweep_sessions', stdout=out)
+        self.assertIn('Nothing to sweep', out.getvalue())
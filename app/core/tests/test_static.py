@@ -0,0 +1,106 @@
+import gzip
+import io
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.templatetags.static import static
+from django.test import SimpleTestCase, override_settings
+
+from core import storage, vendor
+
+
+class CompressedManifestStorageTests(SimpleTestCase):
+    """Test the collected static files are fingerprinted and compressed"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.static_root = tempfile.TemporaryDirectory()
+        cls.root = Path(cls.static_root.name)
+
+        cls.static_settings = override_settings(
+            STATIC_ROOT=cls.static_root.name,
+            STATICFILES_STORAGE='core.storage.'
+                                'CompressedManifestStaticFilesStorage',
+        )
+        cls.static_settings.enable()
+        call_command('collectstatic', interactive=False, verbosity=0)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.static_settings.disable()
+        cls.static_root.cleanup()
+        super().tearDownClass()
+
+    def test_fingerprinted_names(self):
+        """Test the static urls point to names holding a content hash"""
+        url = static('core/base.css')
+        self.assertRegex(url, r'^/static/core/base\.[0-9a-f]{12}\.css$')
+        self.assertTrue((self.root / url[len('/static/'):]).exists())
+
+    def test_compressed_copies(self):
+        """Test text files get compressed copies, images do not"""
+        script = staticfiles_storage.stored_name('core/script.js')
+        content = (self.root / script).read_bytes()
+
+        compressed = (self.root / (script + '.gz')).read_bytes()
+        self.assertEqual(gzip.decompress(compressed), content)
+        if storage.brotli is not None:
+            compressed = (self.root / (script + '.br')).read_bytes()
+            self.assertEqual(storage.brotli.decompress(compressed), content)
+
+        icon = staticfiles_storage.stored_name('core/bug_icon.png')
+        self.assertFalse((self.root / (icon + '.gz')).exists())
+
+    def test_collect_again(self):
+        """Test collecting again replaces the compressed copies"""
+        call_command('collectstatic', interactive=False, verbosity=0)
+
+        script = staticfiles_storage.stored_name('core/script.js')
+        self.assertEqual(list(self.root.glob('core/script.*.js.gz')), [
+            self.root / (script + '.gz')
+        ])
+
+
+class VendorTests(SimpleTestCase):
+    """Test the vendored static files are fetched and verified"""
+
+    def setUp(self):
+        vendor_root = tempfile.TemporaryDirectory()
+        self.addCleanup(vendor_root.cleanup)
+        self.root = Path(vendor_root.name)
+
+        patcher = mock.patch.object(vendor, 'VENDOR_ROOT', self.root)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.content = b'.btn{}'
+        self.files = [(
+            'vendor/lib/lib.css', 'https://cdn.example.com/lib.css',
+            vendor.integrity(self.content),
+        )]
+
+    def fetch(self, content):
+        with mock.patch('urllib.request.urlopen') as urlopen:
+            urlopen.return_value = io.BytesIO(content)
+            vendor.vendor_files(self.files, log=lambda message: None)
+        return urlopen
+
+    def test_files_fetched_once(self):
+        """Test missing files are fetched, vendored ones are kept"""
+        self.fetch(self.content)
+        self.assertEqual(
+            (self.root / 'vendor/lib/lib.css').read_bytes(), self.content
+        )
+
+        urlopen = self.fetch(self.content)
+        urlopen.assert_not_called()
+
+    def test_integrity_checked(self):
+        """Test files not matching their integrity hash are refused"""
+        with self.assertRaises(vendor.IntegrityError):
+            self.fetch(b'.btn{}/* tampered */')
+        self.assertFalse((self.root / 'vendor/lib/lib.css').exists())
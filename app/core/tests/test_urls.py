@@ -19,3 +19,16 @@ class CoreUrlTests(SimpleTestCase):
         url = reverse('member-profile')
         urlViewClass = resolve(url).func.view_class
         self.assertEqual(urlViewClass, MemberProfileView)
+
+    def test_database_status_url(self):
+        """Test the database status view url"""
+        url = reverse('database-status')
+        urlViewClass = resolve(url).func.view_class
+        self.assertEqual(urlViewClass, views.DatabaseStatusView)
+
+    def test_performance_report_url(self):
+        """Test the performance report view url"""
+        url = reverse('performance-report')
+        self.assertEqual(url, '/admin/performance/')
+        urlViewClass = resolve(url).func.view_class
+        self.assertEqual(urlViewClass, views.PerformanceReportView)
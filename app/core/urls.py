@@ -7,4 +7,8 @@ from members.views import MemberProfileView
 urlpatterns = [
     path('', views.IndexView.as_view(), name='index'),
     path('profile/', MemberProfileView.as_view(), name='member-profile'),
+    path(
+        'status/database/', views.DatabaseStatusView.as_view(),
+        name='database-status'
+    ),
 ]
@@ -1,3 +1,6 @@
+import base64
+import json
+
 from django.contrib.auth import get_user_model
 
 from projects.models import Project
@@ -53,3 +56,9 @@ def sample_bug(creator, project, **kwargs):
     arguments.update({'creator': creator, 'project': project})
 
     return Bug.objects.create(**arguments)
+
+
+def encode_cursor(direction, values):
+    """Return a pagination cursor holding any values, valid or not"""
+    payload = json.dumps([direction, values]).encode()
+    return base64.urlsafe_b64encode(payload).decode()
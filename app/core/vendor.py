@@ -0,0 +1,85 @@
+"""
+Third party assets served from our static files instead of their CDN.
+
+They are pinned by version and checked against their subresource integrity
+hash, and downloaded when the images are built rather than kept in the
+repository. Run ``python -m core.vendor`` from the app directory to fetch
+the missing ones.
+"""
+import base64
+import hashlib
+import sys
+import urllib.request
+from pathlib import Path
+
+
+VENDOR_ROOT = Path(__file__).resolve().parent / 'static'
+
+BOOTSTRAP_URL = 'https://cdn.jsdelivr.net/npm/bootstrap@5.0.0-beta1/dist/'
+
+# Static path, source url and integrity hash of each vendored file
+VENDORED_FILES = [
+    (
+        'vendor/bootstrap/bootstrap.min.css',
+        BOOTSTRAP_URL + 'css/bootstrap.min.css',
+        'sha384-giJF6kkoqNQ00vy+HMDP7azOuL0xtbfIcaT9wjKH'
+        'r8RbDVddVHyTfAAsrekwKmP1',
+    ),
+    (
+        'vendor/bootstrap/bootstrap.bundle.min.js',
+        BOOTSTRAP_URL + 'js/bootstrap.bundle.min.js',
+        'sha384-ygbV9kiqUc6oa4msXn9868pTtWMgiQaeYH7/t7LE'
+        'CLbyPA2x65Kgf80OJFdroafW',
+    ),
+]
+
+
+class IntegrityError(Exception):
+    pass
+
+
+def integrity(content, algorithm='sha384'):
+    """Return the subresource integrity hash of the content"""
+    digest = hashlib.new(algorithm, content).digest()
+    return '%s-%s' % (algorithm, base64.b64encode(digest).decode())
+
+
+def is_vendored(path, expected):
+    """Return whether the file exists with the expected integrity hash"""
+    target = VENDOR_ROOT / path
+    if not target.exists():
+        return False
+    algorithm = expected.split('-', 1)[0]
+    return integrity(target.read_bytes(), algorithm) == expected
+
+
+def fetch(path, url, expected):
+    """Download a vendored file, refusing content not matching its hash"""
+    with urllib.request.urlopen(url, timeout=30) as response:
+        content = response.read()
+
+    actual = integrity(content, expected.split('-', 1)[0])
+    if actual != expected:
+        raise IntegrityError(
+            '%s has hash %s instead of %s' % (url, actual, expected)
+        )
+
+    target = VENDOR_ROOT / path
+    target.parent.mkdir(parents=True, exist_ok=True)
+    target.write_bytes(content)
+
+
+def vendor_files(files=VENDORED_FILES, log=print):
+    """Fetch the vendored files missing or not matching their hash"""
+    for path, url, expected in files:
+        if is_vendored(path, expected):
+            continue
+        log('Fetching %s' % url)
+        fetch(path, url, expected)
+
+
+if __name__ == '__main__':
+    try:
+        vendor_files()
+    except (OSError, IntegrityError) as e:
+        sys.exit('Could not vendor the static files: %s' % e)
@@ -1,7 +1,79 @@
+from django.contrib import admin
 from django.contrib.auth.views import LoginView
+from django.db import connections
+from django.http import JsonResponse
+from django.shortcuts import redirect
+from django.views import View
+from django.views.generic import TemplateView
+
+from .mixins import IsSuperuserMixin
+from .performance import get_performance_stats
 
 
 class IndexView(LoginView):
     """Home page view of the application"""
     template_name = 'core/index.html'
     redirect_authenticated_user = True
+
+
+class DatabaseStatusView(IsSuperuserMixin, View):
+    """View showing how the database connections of this worker are used"""
+
+    def get(self, request, *args, **kwargs):
+        status = {}
+        for alias in connections:
+            connection = connections[alias]
+            pool = getattr(connection, 'pool', None)
+            status[alias] = {
+                'conn_max_age': connection.settings_dict['CONN_MAX_AGE'],
+                'health_checks': connection.settings_dict.get(
+                    'CONN_HEALTH_CHECKS', False
+                ),
+                'pool': pool.stats() if pool is not None else None,
+            }
+
+        return JsonResponse(status)
+
+
+class PerformanceReportView(IsSuperuserMixin, TemplateView):
+    """View listing the slowest endpoints and the queries they make"""
+    template_name = 'core/performance_report.html'
+    columns = [
+        ('requests', 'Requests'),
+        ('p50', 'p50'),
+        ('p95', 'p95'),
+        ('p99', 'p99'),
+        ('mean', 'Mean'),
+        ('mean_queries', 'Queries'),
+        ('max_queries', 'Max queries'),
+        ('mean_sql_time', 'SQL'),
+        ('mean_template_time', 'Template'),
+    ]
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context.update(admin.site.each_context(self.request))
+
+        order = self.request.GET.get('order')
+        if order not in dict(self.columns):
+            order = 'p95'
+        endpoints = get_performance_stats().snapshot()
+        # Requests slower than the last bucket have no percentile
+        endpoints.sort(
+            key=lambda endpoint: (
+                endpoint[order] is None, endpoint[order] or 0
+            ),
+            reverse=True
+        )
+
+        context.update({
+            'title': 'Performance',
+            'columns': self.columns,
+            'order': order,
+            'endpoints': endpoints,
+        })
+        return context
+
+    def post(self, request, *args, **kwargs):
+        get_performance_stats().reset()
+        return redirect('performance-report')
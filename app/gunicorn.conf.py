@@ -0,0 +1,120 @@
+"""
+Gunicorn configuration, read from the working directory when gunicorn starts.
+
+Every setting can be overridden with the environment:
+
+GUNICORN_WORKER_CLASS   sync (default) or gthread; SERVER_MODE=asgi uses
+                        the uvicorn worker instead
+GUNICORN_WORKERS        number of worker processes, sized from the CPUs
+                        available to the container by default, or 1 while
+                        the default cache (CACHE_BACKEND) is local to each
+                        process
+GUNICORN_THREADS        threads of each gthread worker (4)
+GUNICORN_PRELOAD        import the application once in the master and fork
+                        the workers from it (1)
+GUNICORN_MAX_REQUESTS   requests served before a worker is replaced (1000),
+                        0 to never replace them
+GUNICORN_MAX_REQUESTS_JITTER
+                        random extra requests, so workers are not all
+                        replaced at once (a tenth of max requests)
+GUNICORN_TIMEOUT        seconds a busy worker may go silent before being
+                        killed (30)
+GUNICORN_GRACEFUL_TIMEOUT
+                        seconds given to workers to finish their requests
+                        on restarts and shutdowns (30)
+GUNICORN_KEEPALIVE      seconds to wait for requests on kept-alive
+                        connections from the proxy (5)
+"""
+import gc
+import math
+import os
+
+
+def available_cpus():
+    """Return the number of CPUs the process may use, quotas included"""
+    cpus = len(os.sched_getaffinity(0))
+
+    try:
+        # cgroup v2 quota, e.g. "200000 100000" for two CPUs
+        with open('/sys/fs/cgroup/cpu.max') as cpu_max:
+            quota, period = cpu_max.read().split()
+    except (OSError, ValueError):
+        return cpus
+
+    if quota == 'max':
+        return cpus
+    return max(1, min(cpus, math.ceil(int(quota) / int(period))))
+
+
+def env_int(name, default):
+    return int(os.environ.get(name, default))
+
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+
+if os.environ.get('SERVER_MODE') == 'asgi':
+    worker_class = 'uvicorn.workers.UvicornWorker'
+else:
+    worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'sync')
+    if worker_class not in ('sync', 'gthread'):
+        raise ValueError(
+            'GUNICORN_WORKER_CLASS must be sync or gthread, not %r'
+            % worker_class
+        )
+
+# Role maps and fragment versions are kept in the default cache. Held in the
+# memory of each process, they go stale in the others when changed, so a
+# single worker runs until CACHE_BACKEND names a shared cache.
+shared_cache = not os.environ.get('CACHE_BACKEND', 'LocMemCache').endswith(
+    'LocMemCache'
+)
+
+# Threaded and asynchronous workers overlap the requests waiting on the
+# database themselves, so they need fewer processes than sync workers
+if not shared_cache:
+    workers = env_int('GUNICORN_WORKERS', 1)
+elif worker_class == 'sync':
+    workers = env_int('GUNICORN_WORKERS', 2 * available_cpus() + 1)
+else:
+    workers = env_int('GUNICORN_WORKERS', available_cpus() + 1)
+threads = env_int('GUNICORN_THREADS', 4) if worker_class == 'gthread' else 1
+
+max_requests = env_int('GUNICORN_MAX_REQUESTS', 1000)
+max_requests_jitter = env_int(
+    'GUNICORN_MAX_REQUESTS_JITTER', max_requests // 10
+)
+
+timeout = env_int('GUNICORN_TIMEOUT', 30)
+graceful_timeout = env_int('GUNICORN_GRACEFUL_TIMEOUT', 30)
+keepalive = env_int('GUNICORN_KEEPALIVE', 5)
+
+# The worker heartbeat files are touched often, keep them off the
+# container overlay filesystem
+if os.path.isdir('/dev/shm'):
+    worker_tmp_dir = '/dev/shm'
+
+preload_app = bool(env_int('GUNICORN_PRELOAD', 1))
+
+if preload_app:
+    # Objects allocated while importing the application are shared with the
+    # workers until written to. The collector writes to every object it
+    # tracks, so it is kept from running until they are frozen right before
+    # forking, as advised by the gc.freeze() documentation.
+    gc.disable()
+
+
+def when_ready(server):
+    if preload_app:
+        # Connections opened while importing must not be shared by workers
+        from django.db import connections
+        connections.close_all()
+
+
+def pre_fork(server, worker):
+    if preload_app:
+        gc.freeze()
+
+
+def post_fork(server, worker):
+    if preload_app:
+        gc.enable()
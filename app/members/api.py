@@ -0,0 +1,24 @@
+from core.api import ApiDetailView, ApiListView, Column, RelatedIds
+from .models import Member
+
+
+MEMBER_FIELDS = {
+    'id': Column('id'),
+    'name': Column('name'),
+    'is_superuser': Column('is_superuser'),
+    'projects': RelatedIds('projects'),
+}
+
+
+class MemberApiMixin:
+    """Members, visible to every logged in member"""
+    model = Member
+    fields = MEMBER_FIELDS
+
+
+class MemberListApiView(MemberApiMixin, ApiListView):
+    """List the members"""
+
+
+class MemberDetailApiView(MemberApiMixin, ApiDetailView):
+    """Return a member"""
@@ -0,0 +1,28 @@
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('members', '0002_default_superuser'),
+    ]
+
+    # The member search compares the upper cased name and email with
+    # LIKE, as icontains does, which trigram indexes of those expressions
+    # serve for prefixes and substrings alike
+    operations = [
+        TrigramExtension(),
+        migrations.RunSQL(
+            """
+            CREATE INDEX member_name_trgm_idx ON members_member
+            USING gin (upper(name) gin_trgm_ops);
+            CREATE INDEX member_email_trgm_idx ON members_member
+            USING gin (upper(email) gin_trgm_ops);
+            """,
+            """
+            DROP INDEX member_name_trgm_idx;
+            DROP INDEX member_email_trgm_idx;
+            """,
+        ),
+    ]
@@ -0,0 +1,28 @@
+from collections import namedtuple
+
+from bugs.models import Bug
+from projects.models import Project
+
+
+MemberPage = namedtuple('MemberPage', ['assigned_bugs', 'projects'])
+
+
+def load_member_page(member, viewer):
+    """Return what the member detail and profile pages show, in two queries
+
+    The active bugs assigned to the member come with their project and the
+    viewer badges, the projects with their stored bug counters, which give
+    their active bug counts. Both are lists, so the template can test and
+    loop over them without querying again.
+    """
+    assigned_bugs = Bug.objects \
+        .filter(assigned_members=member, _status__in=Bug.ACTIVE_STATUS) \
+        .for_viewer(viewer) \
+        .order_by('-creationDate', 'id')
+
+    projects = Project.objects \
+        .filter(members=member) \
+        .only('id', 'title', 'waiting_bug_count', 'working_bug_count') \
+        .order_by('title', 'id')
+
+    return MemberPage(list(assigned_bugs), list(projects))
@@ -0,0 +1,54 @@
+from django.db.models import \
+    BooleanField, Exists, ExpressionWrapper, OuterRef, Q
+
+from bugs.models import Bug
+from projects.models import Project
+from .models import Member
+
+
+# Members of a project each scope keeps, or leaves out
+SCOPES = ('members', 'non_members', 'non_supervisors', 'non_assigned')
+
+
+def search_members(query, project_id=None, scope=None, limit=20,
+                   bug_id=None):
+    """Return the members whose name or email contain the query
+
+    Members whose name or email start with it come first. The matches are
+    served by the trigram indexes on the upper cased name and email, which
+    is what icontains compares. With a project, the scope keeps its members,
+    the members outside of it, its members that do not supervise it or,
+    given the bug, its members not assigned to the bug.
+    """
+    members = Member.objects.filter(
+        Q(name__icontains=query) | Q(email__icontains=query)
+    )
+
+    if project_id is not None:
+        memberships = Project.members.through.objects.filter(
+            project_id=project_id, member_id=OuterRef('pk')
+        )
+        supervisions = Project.supervisors.through.objects.filter(
+            project_id=project_id, member_id=OuterRef('pk')
+        )
+        if scope == 'members':
+            members = members.filter(Exists(memberships))
+        elif scope == 'non_members':
+            members = members.exclude(Exists(memberships))
+        elif scope == 'non_supervisors':
+            members = members.filter(Exists(memberships)) \
+                .exclude(Exists(supervisions))
+        elif scope == 'non_assigned':
+            assignments = Bug.assigned_members.through.objects.filter(
+                bug_id=bug_id, member_id=OuterRef('pk')
+            )
+            members = members.filter(Exists(memberships)) \
+                .exclude(Exists(assignments))
+
+    return members \
+        .annotate(is_prefix=ExpressionWrapper(
+            Q(name__istartswith=query) | Q(email__istartswith=query),
+            output_field=BooleanField()
+        )) \
+        .order_by('-is_prefix', 'name', 'id') \
+        .values('id', 'name')[:limit]
@@ -33,6 +33,11 @@ def member_logout_url():
     return reverse('members:logout')
 
 
+@pytest.fixture
+def member_search_url():
+    return reverse('members:search')
+
+
 @pytest.fixture
 def member_url_names_to_fixtures(
     member_list_url,
@@ -41,6 +46,7 @@ def member_url_names_to_fixtures(
     member_profile_url,
     member_login_url,
     member_logout_url,
+    member_search_url,
 ):
     return {
         'member_list_url': member_list_url,
@@ -49,4 +55,5 @@ def member_url_names_to_fixtures(
         'member_profile_url': member_profile_url,
         'member_login_url': member_login_url,
         'member_logout_url': member_logout_url,
+        'member_search_url': member_search_url,
     }
@@ -0,0 +1,25 @@
+from django.urls import reverse
+
+
+def test_member_api_detail(member_client, member, project, project_member):
+    """Test the members are visible to every member, with their projects"""
+    res = member_client.get(
+        reverse('api:member-detail', args=[project_member.id])
+    )
+
+    assert res.status_code == 200
+    assert res.json() == {
+        'id': project_member.id,
+        'name': project_member.name,
+        'is_superuser': False,
+        'projects': [project.id],
+    }
+
+
+def test_member_api_list(member_client, member):
+    """Test the member list does not expose the member credentials"""
+    res = member_client.get(reverse('api:member-list'))
+
+    rows = res.json()['results']
+    assert member.id in [row['id'] for row in rows]
+    assert all('email' not in row and 'password' not in row for row in rows)
@@ -3,8 +3,13 @@ from pytest_django.asserts import \
     assertRedirects, assertTemplateUsed, assertContains, assertNotContains
 from mixer.backend.django import mixer
 
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
+from bugs.models import Bug
+from projects.models import Project
+
 
 # ----------- Permission Tests -----------
 @pytest.mark.parametrize('method,url_name,should_succed', [
@@ -16,6 +21,7 @@ from django.urls import reverse
     ('post', 'member_register_url', False),
     ('post', 'member_login_url', True),
     ('post', 'member_logout_url', False),
+    ('get', 'member_search_url', False),
 ])
 def test_member_views_unauthenticated_permissions(
     client, member_url_names_to_fixtures, method, url_name, should_succed
@@ -39,6 +45,7 @@ def test_member_views_unauthenticated_permissions(
     ('post', 'member_register_url'),
     ('post', 'member_login_url'),
     ('post', 'member_logout_url'),
+    ('get', 'member_search_url'),
 ])
 def test_member_views_superuser_permissions(
     superuser_client, member_url_names_to_fixtures, method, url_name
@@ -59,6 +66,7 @@ def test_member_views_superuser_permissions(
     ('post', 'member_register_url', False),
     ('post', 'member_login_url', True),
     ('post', 'member_logout_url', True),
+    ('get', 'member_search_url', True),
 ])
 def test_member_views_member_permissions(
     member_client,
@@ -84,6 +92,7 @@ def test_member_views_member_permissions(
     ('member_register_url', ['GET', 'POST', 'PUT']),
     ('member_login_url', ['GET', 'POST', 'PUT']),
     ('member_logout_url', ['GET', 'POST', 'PUT', 'PATCH', 'DELETE']),
+    ('member_search_url', ['GET']),
 ])
 def test_member_views_allowed_methods(
     superuser_client,
@@ -172,6 +181,189 @@ def test_member_detail_successful_request(
     assertContains(res, member.name)
 
 
+def blend_member_page(member, count):
+    """Add projects of the member, each with an active bug assigned"""
+    for project in mixer.cycle(count).blend(Project):
+        project.members.add(member)
+        active = mixer.blend(
+            Bug, project=project, creator=member, _status='WAITING'
+        )
+        fixed = mixer.blend(
+            Bug, project=project, creator=member, _status='FIXED'
+        )
+        active.assigned_members.add(member)
+        fixed.assigned_members.add(member)
+
+
+@pytest.mark.parametrize('url_name', [
+    'member_detail_url', 'member_profile_url'
+])
+def test_member_pages_constant_queries(
+    client, member, member_url_names_to_fixtures, url_name
+):
+    """Test the member pages query the same whatever they show"""
+    url = member_url_names_to_fixtures[url_name]
+    client.force_login(member)
+
+    def count_queries():
+        with CaptureQueriesContext(connection) as queries:
+            res = client.get(url)
+        assert res.status_code == 200
+        return res, len(queries)
+
+    blend_member_page(member, 1)
+    client.get(url)
+    res, num_queries = count_queries()
+    assert len(res.context['assigned_bugs']) == 1
+
+    blend_member_page(member, 5)
+    res, more_queries = count_queries()
+    assert more_queries == num_queries
+    assert len(res.context['assigned_bugs']) == 6
+    assert all(bug.status == 'WAITING' for bug in res.context['assigned_bugs'])
+    assert len(res.context['projects']) == 6
+    assertContains(res, '1 active bug<', count=6)
+
+
+# ----------- Search View Tests -----------
+def search(client, url, **params):
+    """Return the names of the members the search view answers"""
+    res = client.get(url, params)
+    assert res.status_code == 200
+    return [member['name'] for member in res.json()['results']]
+
+
+def test_member_search_by_name_and_email(
+    django_user_model, member_client, member_search_url
+):
+    """Test members are found by part of their name or email"""
+    mixer.blend(django_user_model, name='Ann Smith', email='ann@mail.com')
+    mixer.blend(django_user_model, name='Joanna Ray', email='jo@mail.com')
+    mixer.blend(django_user_model, name='Bob Stone', email='annex@mail.com')
+
+    assert search(member_client, member_search_url, q='ann') == [
+        'Ann Smith', 'Bob Stone', 'Joanna Ray'
+    ]
+    assert search(member_client, member_search_url, q='SMITH') == [
+        'Ann Smith'
+    ]
+    assert search(member_client, member_search_url, q='jo@') == [
+        'Joanna Ray'
+    ]
+    assert search(member_client, member_search_url, q='') == []
+
+    res = member_client.get(member_search_url, {'q': 'ann'})
+    assert set(res.json()['results'][0]) == {'id', 'name'}
+
+
+def test_member_search_limit(
+    django_user_model, member_client, member_search_url
+):
+    """Test the search answers at most the asked number of members"""
+    for i in range(3):
+        mixer.blend(django_user_model, name='Limit %d' % i)
+
+    names = search(member_client, member_search_url, q='limit', limit=2)
+    assert names == ['Limit 0', 'Limit 1']
+
+    for limit in (0, -1):
+        names = search(
+            member_client, member_search_url, q='limit', limit=limit
+        )
+        assert names == ['Limit 0']
+
+
+@pytest.mark.parametrize('scope,expected', [
+    ('members', ['Project Member', 'Project Supervisor']),
+    ('non_members', ['Outsider']),
+    ('non_supervisors', ['Project Member']),
+])
+def test_member_search_scopes(
+    supervisor_client, member_search_url, project, supervisor,
+    project_member, member, scope, expected
+):
+    """Test the scopes keep the right members of the project"""
+    supervisor.name = 'Project Supervisor'
+    supervisor.save()
+    project_member.name = 'Project Member'
+    project_member.save()
+    member.name = 'Outsider'
+    member.save()
+
+    names = search(
+        supervisor_client, member_search_url,
+        q='o', project=project.id, scope=scope
+    )
+    assert names == expected
+
+
+def test_member_search_non_assigned_scope(
+    supervisor_client, member_search_url, project, supervisor,
+    project_member, member
+):
+    """Test the bug scope keeps the project members not assigned to it"""
+    for user in (supervisor, project_member, member):
+        user.name = 'Someone'
+        user.save()
+    bug = mixer.blend(Bug, project=project, creator=supervisor)
+    bug.assigned_members.add(project_member)
+
+    res = supervisor_client.get(member_search_url, {
+        'q': 'someone', 'bug': bug.id, 'scope': 'non_assigned'
+    })
+
+    assert res.status_code == 200
+    assert [m['id'] for m in res.json()['results']] == [supervisor.id]
+
+    res = supervisor_client.get(member_search_url, {
+        'q': 'someone', 'bug': 9876, 'scope': 'non_assigned'
+    })
+    assert res.status_code == 404
+
+
+def test_member_search_non_assigned_outside_project_forbidden(
+    member_client, member_search_url, project, supervisor
+):
+    """Test only the members of the project of a bug can search for it"""
+    bug = mixer.blend(Bug, project=project, creator=supervisor)
+
+    res = member_client.get(member_search_url, {
+        'q': 'a', 'bug': bug.id, 'scope': 'non_assigned'
+    })
+
+    assert res.status_code == 403
+
+
+@pytest.mark.parametrize('params', [
+    {'q': 'a', 'scope': 'unknown', 'project': '1'},
+    {'q': 'a', 'scope': 'members'},
+    {'q': 'a', 'project': 'x', 'scope': 'members'},
+    {'q': 'a', 'limit': 'x'},
+    {'q': 'a', 'scope': 'non_assigned', 'project': '1'},
+    {'q': 'a', 'scope': 'members', 'bug': '1'},
+    {'q': 'a', 'scope': 'non_assigned', 'bug': '1', 'project': '1'},
+    {'q': 'a', 'scope': 'non_assigned', 'bug': 'x'},
+])
+def test_member_search_bad_request(
+    superuser_client, member_search_url, params
+):
+    """Test malformed searches are answered with a 400"""
+    res = superuser_client.get(member_search_url, params)
+
+    assert res.status_code == 400
+
+
+def test_member_search_outside_project_forbidden(
+    member_client, member_search_url, project
+):
+    """Test only the members of a project can search within it"""
+    res = member_client.get(member_search_url, {
+        'q': 'a', 'project': project.id, 'scope': 'members'
+    })
+
+    assert res.status_code == 403
+
+
 # ----------- Register View Tests -----------
 def test_member_register_view_GET(superuser_client, member_register_url):
     """Test successfully GETting member register view with form"""
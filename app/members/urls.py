@@ -12,6 +12,7 @@ urlpatterns = [
         views.MemberDetailView.as_view(),
         name='detail'
     ),
+    path('search', views.MemberSearchView.as_view(), name='search'),
     path('login', views.MemberLoginView.as_view(), name='login'),
     path('logout', views.MemberLogoutView.as_view(), name='logout'),
     path('register', views.MemberCreateView.as_view(), name='register'),
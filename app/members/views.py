@@ -1,5 +1,8 @@
 from django.urls import reverse_lazy
 from django.shortcuts import redirect
+from django.core.exceptions import PermissionDenied, SuspiciousOperation
+from django.http import Http404, JsonResponse
+from django.views import View
 from django.views.generic.list import ListView
 from django.views.generic.detail import DetailView
 from django.views.generic.edit import CreateView
@@ -8,7 +11,11 @@ from django.contrib.auth.mixins import LoginRequiredMixin
 
 from .models import Member
 from .forms import MemberCreateForm
+from .pages import load_member_page
+from .search import SCOPES, search_members
+from bugs.models import Bug
 from core.mixins import IsSuperuserMixin
+from projects.roles import get_role_map
 
 
 class MemberLoginView(LoginView):
@@ -59,13 +66,77 @@ class MemberDetailView(LoginRequiredMixin, DetailView):
     context_object_name = 'member'
     login_url = reverse_lazy('members:login')
 
+    def get_context_data(self, **kwargs):
+        """Add the member active assigned bugs and projects to the context"""
+        context = super().get_context_data(**kwargs)
 
-class MemberProfileView(LoginRequiredMixin, DetailView):
-    model = Member
+        page = load_member_page(self.object, self.request.user)
+        context['assigned_bugs'] = page.assigned_bugs
+        context['projects'] = page.projects
+
+        return context
+
+
+class MemberProfileView(MemberDetailView):
+    """View for displaying the logged member own page"""
     template_name = 'members/profile.html'
-    context_object_name = 'member'
-    login_url = reverse_lazy('members:login')
 
     def get_object(self):
         """Return the current authenticated member"""
         return self.request.user
+
+
+class MemberSearchView(LoginRequiredMixin, View):
+    """Return as json the members matching the 'q' parameter
+
+    The 'project' and 'scope' parameters limit them to the members of a
+    project the user is part of, to those outside of it or to its members
+    that do not supervise it. The 'bug' parameter with the 'non_assigned'
+    scope limits them to the members of the project of the bug that are not
+    assigned to it. Widgets ask for them as the user types.
+    """
+    login_url = reverse_lazy('members:login')
+    max_limit = 50
+
+    def get(self, request):
+        query = request.GET.get('q', '').strip()
+        scope = request.GET.get('scope') or None
+        project_id = request.GET.get('project') or None
+        bug_id = request.GET.get('bug') or None
+
+        try:
+            limit = max(1, min(
+                int(request.GET.get('limit', 20)), self.max_limit
+            ))
+            if project_id is not None:
+                project_id = int(project_id)
+            if bug_id is not None:
+                bug_id = int(bug_id)
+        except ValueError:
+            raise SuspiciousOperation('Invalid project id, bug id or limit!')
+
+        if (scope is not None and scope not in SCOPES) or \
+                (bug_id is not None) != (scope == 'non_assigned') or \
+                (bug_id is not None and project_id is not None):
+            raise SuspiciousOperation('Invalid scope!')
+
+        if bug_id is not None:
+            project_id = Bug.objects.filter(pk=bug_id) \
+                .values_list('project_id', flat=True).first()
+            if project_id is None:
+                raise Http404('No bug found matching the query')
+
+        if (project_id is None) != (scope is None):
+            raise SuspiciousOperation('Invalid project scope!')
+
+        if project_id is not None and not request.user.is_superuser and \
+                project_id not in get_role_map(request.user).member_of:
+            raise PermissionDenied
+
+        results = []
+        if query:
+            results = list(
+                search_members(query, project_id, scope, limit, bug_id)
+            )
+
+        return JsonResponse({'results': results})
@@ -0,0 +1,40 @@
+from urllib.parse import urlencode
+
+from django import forms
+from django.urls import reverse
+
+
+class MemberSearchSelect(forms.SelectMultiple):
+    """Multiple select of members rendering only the chosen ones
+
+    The other members are searched as the user types, through the member
+    search view, limited by the scope to the members of the project or to
+    those outside of it when both are set.
+    """
+
+    def __init__(self, attrs=None, project_id=None, scope=None):
+        super().__init__(attrs)
+        self.project_id = project_id
+        self.scope = scope
+
+    def get_context(self, name, value, attrs):
+        context = super().get_context(name, value, attrs)
+
+        url = reverse('members:search')
+        if self.project_id is not None and self.scope is not None:
+            url += '?' + urlencode(
+                {'project': self.project_id, 'scope': self.scope}
+            )
+        context['widget']['attrs']['data-member-search'] = url
+
+        return context
+
+    def optgroups(self, name, value, attrs=None):
+        """Return the options of the chosen members, in one query"""
+        ids = [pk for pk in value if str(pk).isdigit()]
+        members = self.choices.queryset.filter(pk__in=ids) if ids else []
+
+        return [(None, [
+            self.create_option(name, member.pk, str(member), True, index)
+            for index, member in enumerate(members)
+        ], 0)]
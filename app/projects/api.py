@@ -0,0 +1,55 @@
+from core.api import ApiDetailView, ApiError, ApiListView, Column, RelatedIds
+from .models import Project
+from .roles import get_role_map
+
+
+PROJECT_FIELDS = {
+    'id': Column('id'),
+    'title': Column('title'),
+    'description': Column('description'),
+    'status': Column('_status'),
+    'creationDate': Column('creationDate'),
+    'closingDate': Column('closingDate'),
+    'bug_count': Column('bug_count'),
+    'waiting_bug_count': Column('waiting_bug_count'),
+    'working_bug_count': Column('working_bug_count'),
+    'fixed_bug_count': Column('fixed_bug_count'),
+    'closed_bug_count': Column('closed_bug_count'),
+    'members': RelatedIds('members'),
+    'supervisors': RelatedIds('supervisors'),
+}
+
+
+class ProjectApiMixin:
+    """Projects visible to the user, the ones it is part of"""
+    model = Project
+    fields = PROJECT_FIELDS
+
+    def get_queryset(self):
+        """Return all the projects to superusers, their own to members"""
+        queryset = self.model.objects.all()
+        if not self.request.user.is_superuser:
+            member_of = get_role_map(self.request.user).member_of
+            queryset = queryset.filter(id__in=list(member_of))
+
+        return queryset
+
+
+class ProjectListApiView(ProjectApiMixin, ApiListView):
+    """List the visible projects, filtered by the 'status' parameters"""
+    ordering = ('-creationDate', 'id')
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+
+        status = self.request.GET.getlist('status')
+        if set(status) - set(self.model.POSSIBLE_STATUS):
+            raise ApiError('Invalid status')
+        if status:
+            queryset = queryset.filter(_status__in=status)
+
+        return queryset
+
+
+class ProjectDetailApiView(ProjectApiMixin, ApiDetailView):
+    """Return a visible project"""
@@ -1,6 +1,7 @@
 from django import forms
 
 from .models import Project
+from members.widgets import MemberSearchSelect
 
 
 class ProjectCreateForm(forms.ModelForm):
@@ -11,13 +12,24 @@ class ProjectCreateForm(forms.ModelForm):
     class Meta:
         model = Project
         exclude = ['_status', 'creationDate', 'closingDate', 'supervisors']
+        widgets = {'members': MemberSearchSelect}
 
 
 class ProjectUpdateForm(forms.ModelForm):
     def __init__(self, supervisor_options, *args, **kwargs):
         super(ProjectUpdateForm, self).__init__(*args, **kwargs)
         self.fields['supervisors'].queryset = supervisor_options
+        self.fields['supervisors'].widget.project_id = self.instance.pk
+        self.fields['supervisors'].widget.scope = 'members'
+        # The choices are the saved members, not those added in this form
+        self.fields['supervisors'].help_text = (
+            'Only members already saved in the project can supervise it.'
+        )
 
     class Meta:
         model = Project
         exclude = ['_status', 'creationDate', 'closingDate']
+        widgets = {
+            'members': MemberSearchSelect,
+            'supervisors': MemberSearchSelect,
+        }
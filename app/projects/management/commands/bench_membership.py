@@ -0,0 +1,83 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from bugs.models import Bug
+from members.models import Member
+from projects.membership import \
+    add_project_members, add_project_supervisors, assign_bug_members
+from projects.models import Project
+
+
+def legacy_assign_bug_members(bug, member_ids):
+    """Assign members one id at a time, like the views used to"""
+    for member_id in member_ids:
+        member = Member.objects.get(id=member_id)
+        if member not in bug.project.members.all():
+            raise ValueError('Member must be part of bug project!')
+        bug.assigned_members.add(member)
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure the queries and time of the bulk membership operations. '
+        'Everything is created inside a rolled back transaction.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes', type=int, nargs='+', default=[1, 50, 500],
+            help='Numbers of member ids sent at once'
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write('%-28s %6s %8s %10s' % (
+            'operation', 'ids', 'queries', 'time'
+        ))
+
+        for size in options['sizes']:
+            with transaction.atomic():
+                self.bench(size)
+                transaction.set_rollback(True)
+
+    def bench(self, size):
+        """Run each operation on a fresh project with size new members"""
+        members = Member.objects.bulk_create(
+            Member(
+                name='Membership Benchmark %d' % i,
+                email='bench_membership_%d@bugtracker.local' % i,
+                password='!',
+            )
+            for i in range(size)
+        )
+        member_ids = [m.id for m in members]
+        project = Project.objects.create(title='Membership benchmark')
+        creator = members[0]
+
+        self.measure('add_project_members', size, add_project_members,
+                     project, member_ids)
+        self.measure('add_project_supervisors', size,
+                     add_project_supervisors, project, member_ids)
+        self.measure(
+            'assign_bug_members', size, assign_bug_members,
+            Bug.objects.create(title='B', project=project, creator=creator),
+            member_ids
+        )
+        self.measure(
+            'per id loop (before)', size, legacy_assign_bug_members,
+            Bug.objects.create(title='B', project=project, creator=creator),
+            member_ids
+        )
+
+    def measure(self, name, size, operation, *args):
+        """Write the number of queries and time taken by the operation"""
+        with CaptureQueriesContext(connection) as queries:
+            start = time.perf_counter()
+            operation(*args)
+            elapsed = (time.perf_counter() - start) * 1000
+
+        self.stdout.write('%-28s %6d %8d %8.1fms' % (
+            name, size, len(queries), elapsed
+        ))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from projects.roles import role_map_stats
+
+
+class Command(BaseCommand):
+    help = 'Show the hit and miss counters of the role map cache'
+
+    def handle(self, *args, **options):
+        stats = role_map_stats()
+
+        self.stdout.write('Hits: %d' % stats['hits'])
+        self.stdout.write('Misses: %d' % stats['misses'])
+
+        if stats['hit_ratio'] is not None:
+            self.stdout.write('Hit ratio: %.1f%%' % (stats['hit_ratio'] * 100))
@@ -0,0 +1,95 @@
+from django.db import router, transaction
+from django.db.models.signals import m2m_changed
+
+from members.models import Member
+from .models import Project
+
+
+class InvalidMemberError(ValueError):
+    """Some of the given member ids do not exist"""
+
+
+class NotProjectMemberError(ValueError):
+    """Some of the given members are not part of the project"""
+
+
+@transaction.atomic
+def add_project_members(project, member_ids):
+    """Add the members to the project, returning the ids actually added"""
+    member_ids = _validate_member_ids(member_ids)
+    return _bulk_add(project, 'members', member_ids)
+
+
+@transaction.atomic
+def add_project_supervisors(project, member_ids):
+    """Make project members supervisors, returning the ids actually added"""
+    member_ids = _validate_member_ids(member_ids)
+    _check_project_members(project.pk, member_ids)
+    return _bulk_add(project, 'supervisors', member_ids)
+
+
+@transaction.atomic
+def assign_bug_members(bug, member_ids):
+    """Assign project members to the bug, returning the ids actually added"""
+    member_ids = _validate_member_ids(member_ids)
+    _check_project_members(bug.project_id, member_ids)
+    return _bulk_add(bug, 'assigned_members', member_ids)
+
+
+def _validate_member_ids(member_ids):
+    """Return the member ids as a set, checking they all exist in one query"""
+    member_ids = {int(member_id) for member_id in member_ids}
+    found = Member.objects.filter(id__in=member_ids).count()
+
+    if found != len(member_ids):
+        raise InvalidMemberError('Invalid member id!')
+
+    return member_ids
+
+
+def _check_project_members(project_id, member_ids):
+    """Check in one query that all the members are part of the project"""
+    found = Project.members.through.objects \
+        .filter(project_id=project_id, member_id__in=member_ids) \
+        .count()
+
+    if found != len(member_ids):
+        raise NotProjectMemberError('Member must be part of the project!')
+
+
+def _bulk_add(instance, field_name, member_ids):
+    """Insert the missing rows of a member many to many field at once
+
+    Rows already present are skipped and concurrent inserts of the same
+    rows are ignored. The m2m_changed signals are sent with the ids added,
+    like the related manager add does.
+    """
+    field = instance._meta.get_field(field_name)
+    through = field.remote_field.through
+    source = field.m2m_field_name() + '_id'
+    target = field.m2m_reverse_field_name() + '_id'
+
+    existing = through.objects \
+        .filter(**{source: instance.pk, target + '__in': member_ids}) \
+        .values_list(target, flat=True)
+    added = member_ids.difference(existing)
+    if not added:
+        return added
+
+    signal_kwargs = {
+        'sender': through,
+        'instance': instance,
+        'reverse': False,
+        'model': Member,
+        'pk_set': added,
+        'using': router.db_for_write(through, instance=instance),
+    }
+
+    m2m_changed.send(action='pre_add', **signal_kwargs)
+    through.objects.bulk_create(
+        [through(**{source: instance.pk, target: pk}) for pk in added],
+        ignore_conflicts=True,
+    )
+    m2m_changed.send(action='post_add', **signal_kwargs)
+
+    return added
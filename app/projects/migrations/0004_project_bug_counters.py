@@ -0,0 +1,62 @@
+# Generated by Django 3.1.14 on 2026-10-18 04:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0003_auto_20201214_1344'),
+        ('bugs', '0003_message'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='bug_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='closed_bug_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='fixed_bug_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='waiting_bug_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='working_bug_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunSQL(
+            """
+            UPDATE projects_project SET
+                bug_count = counts.total,
+                waiting_bug_count = counts.waiting,
+                working_bug_count = counts.working,
+                fixed_bug_count = counts.fixed,
+                closed_bug_count = counts.closed
+            FROM (
+                SELECT
+                    project_id,
+                    count(*) AS total,
+                    count(*) FILTER (WHERE _status = 'WAITING') AS waiting,
+                    count(*) FILTER (WHERE _status = 'BEING WORKED') AS working,
+                    count(*) FILTER (WHERE _status = 'FIXED') AS fixed,
+                    count(*) FILTER (WHERE _status = 'CLOSED') AS closed
+                FROM bugs_bug
+                GROUP BY project_id
+            ) AS counts
+            WHERE counts.project_id = projects_project.id;
+            """,
+            migrations.RunSQL.noop,
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 3.1.14 on 2026-10-18 04:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0004_project_bug_counters'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(condition=models.Q(_status__in=['ON-GOING']), fields=['-creationDate'], name='project_active_creation_idx'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 3.1.14 on 2026-10-18 06:37
+
+import datetime
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0006_modified_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='fixed_waiting_time',
+            field=models.DurationField(default=datetime.timedelta(0), editable=False),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='fixed_working_time',
+            field=models.DurationField(default=datetime.timedelta(0), editable=False),
+        ),
+    ]
@@ -1,8 +1,15 @@
+from datetime import timedelta
+
 from django.db import models
+from django.utils import timezone
 
 from members.models import Member
 
 
+# Module level so the partial index of the active projects can use it too
+ACTIVE_STATUS = ['ON-GOING']
+
+
 class Project(models.Model):
     """A project worked on by members and containing bugs"""
     POSSIBLE_STATUS = ['ON-GOING', 'FINISHED', 'PAUSED', 'CLOSED']
@@ -12,13 +19,15 @@ class Project(models.Model):
         'PAUSED': 'secondary',
         'CLOSED': 'danger',
     }
-    ACTIVE_STATUS = ['ON-GOING']
+    ACTIVE_STATUS = ACTIVE_STATUS
 
     title = models.CharField(max_length=255)
     description = models.TextField(blank=True)
     _status = models.CharField(max_length=10, default='ON-GOING')
     creationDate = models.DateTimeField(auto_now_add=True)
     closingDate = models.DateTimeField(null=True, blank=True, default=None)
+    # Bumped by every change shown on the project page, see core.modified
+    modified_at = models.DateTimeField(default=timezone.now, editable=False)
 
     members = models.ManyToManyField(
         Member, related_name='projects', blank=True
@@ -27,6 +36,37 @@ class Project(models.Model):
         Member, related_name='supervised_projects', blank=True
     )
 
+    # Denormalized bug counters, kept up to date by the bugs app
+    bug_count = models.PositiveIntegerField(default=0, editable=False)
+    waiting_bug_count = models.PositiveIntegerField(default=0, editable=False)
+    working_bug_count = models.PositiveIntegerField(default=0, editable=False)
+    fixed_bug_count = models.PositiveIntegerField(default=0, editable=False)
+    closed_bug_count = models.PositiveIntegerField(default=0, editable=False)
+    # Time the fixed bugs spent waiting and being worked on, summed
+    fixed_waiting_time = models.DurationField(
+        default=timedelta(), editable=False
+    )
+    fixed_working_time = models.DurationField(
+        default=timedelta(), editable=False
+    )
+
+    class Meta:
+        indexes = [
+            # Partial index matching get_active
+            models.Index(
+                fields=['-creationDate'],
+                condition=models.Q(_status__in=ACTIVE_STATUS),
+                name='project_active_creation_idx',
+            ),
+        ]
+
+    def save(self, *args, **kwargs):
+        """Save the project, bumping its modification time"""
+        self.modified_at = timezone.now()
+        if kwargs.get('update_fields') is not None:
+            kwargs['update_fields'] = {*kwargs['update_fields'], 'modified_at'}
+        super().save(*args, **kwargs)
+
     @property
     def status(self):
         return self._status
@@ -53,9 +93,19 @@ class Project(models.Model):
 
     @property
     def active_bugs(self):
-        if not self.bugs.exists():
-            return self.bugs
-        return self.bugs.filter(_status__in=self.bugs.first().ACTIVE_STATUS)
+        return self.bugs.filter(_status__in=self.bugs.model.ACTIVE_STATUS)
+
+    @property
+    def active_bug_count(self):
+        return self.waiting_bug_count + self.working_bug_count
+
+    @property
+    def mean_time_to_fix(self):
+        """Mean time the fixed bugs waited and were worked on, if any"""
+        if not self.fixed_bug_count:
+            return None
+        return (self.fixed_waiting_time + self.fixed_working_time) / \
+            self.fixed_bug_count
 
     def __str__(self):
         """Return the string representation of the project object"""
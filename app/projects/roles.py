@@ -0,0 +1,107 @@
+import time
+from collections import namedtuple
+
+from django.core.cache import cache
+from django.db.models import Value, IntegerField
+
+from .models import Project
+
+
+RoleMap = namedtuple('RoleMap', ['member_of', 'supervisor_of'])
+EMPTY_ROLE_MAP = RoleMap(frozenset(), frozenset())
+
+ROLE_MAP_TIMEOUT = 60 * 60
+VERSION_KEY = 'roles:version:%s'
+ROLE_MAP_KEY = 'roles:map:%s:%s'
+HITS_KEY = 'roles:hits'
+MISSES_KEY = 'roles:misses'
+
+
+def get_role_map(member):
+    """Return the ids of the projects the member is part of and supervises
+
+    The map is kept in the cache under a per member version, which is bumped
+    whenever the member memberships change, and memoized on the member
+    instance for the rest of the request.
+    """
+    if not member.is_authenticated:
+        return EMPTY_ROLE_MAP
+
+    role_map = getattr(member, '_role_map', None)
+    if role_map is not None:
+        return role_map
+
+    key = ROLE_MAP_KEY % (member.pk, _get_version(member.pk))
+    role_map = cache.get(key)
+
+    if role_map is None:
+        _count(MISSES_KEY)
+        role_map = _load_role_map(member.pk)
+        cache.set(key, role_map, ROLE_MAP_TIMEOUT)
+    else:
+        _count(HITS_KEY)
+
+    member._role_map = role_map
+    return role_map
+
+
+def invalidate_role_maps(member_ids):
+    """Make the cached role maps of the given members stale"""
+    for member_id in member_ids:
+        try:
+            cache.incr(VERSION_KEY % member_id)
+        except ValueError:
+            # No version stored means no map can be cached for the member
+            pass
+
+
+def role_map_stats():
+    """Return the role map cache hits, misses and hit ratio"""
+    hits = cache.get(HITS_KEY, 0)
+    misses = cache.get(MISSES_KEY, 0)
+    total = hits + misses
+
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': hits / total if total else None,
+    }
+
+
+def _load_role_map(member_id):
+    """Build the role map of the member from the database in one query"""
+    member_of = Project.members.through.objects \
+        .filter(member_id=member_id) \
+        .values_list('project_id', Value(0, output_field=IntegerField()))
+    supervisor_of = Project.supervisors.through.objects \
+        .filter(member_id=member_id) \
+        .values_list('project_id', Value(1, output_field=IntegerField()))
+
+    roles = ([], [])
+    for project_id, is_supervisor in member_of.union(supervisor_of, all=True):
+        roles[is_supervisor].append(project_id)
+
+    return RoleMap(frozenset(roles[0]), frozenset(roles[1]))
+
+
+def _get_version(member_id):
+    """Return the current role map version of the member"""
+    key = VERSION_KEY % member_id
+    version = cache.get(key)
+
+    if version is None:
+        # Start from a fresh value so maps cached under a version that was
+        # evicted are never read again
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key)
+
+    return version
+
+
+def _count(key):
+    """Increment a cache counter, creating it if needed"""
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, 1, None):
+            cache.incr(key)
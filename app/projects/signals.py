@@ -0,0 +1,97 @@
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_save, pre_delete
+from django.dispatch import receiver
+
+from core.fragments import bump_versions
+from core.modified import touch
+from members.models import Member
+from .models import Project
+from .roles import invalidate_role_maps
+
+
+def _invalidate(member_ids):
+    """Invalidate the role maps now and again once the transaction commits
+
+    The second invalidation drops maps cached by concurrent requests that
+    read the memberships before the change was committed.
+    """
+    member_ids = list(member_ids)
+    invalidate_role_maps(member_ids)
+    transaction.on_commit(lambda: invalidate_role_maps(member_ids))
+
+
+@receiver(m2m_changed, sender=Project.members.through)
+@receiver(m2m_changed, sender=Project.supervisors.through)
+def project_roles_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """Invalidate the role maps of the members whose roles changed"""
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+
+    if reverse:
+        member_ids = [instance.pk]
+    elif action == 'pre_clear':
+        member_ids = sender.objects \
+            .filter(project_id=instance.pk) \
+            .values_list('member_id', flat=True)
+    else:
+        member_ids = pk_set
+
+    _invalidate(member_ids)
+
+
+@receiver(pre_delete, sender=Project)
+def project_deleted(sender, instance, **kwargs):
+    """Invalidate the role maps of the members of a deleted project"""
+    member_ids = set(instance.members.values_list('id', flat=True))
+    member_ids.update(instance.supervisors.values_list('id', flat=True))
+
+    _invalidate(member_ids)
+
+
+@receiver(post_save, sender=Project)
+def project_saved(sender, instance, **kwargs):
+    """Make the cached fragments showing the project stale"""
+    bump_versions(Project, [instance.pk])
+
+
+@receiver(m2m_changed, sender=Project.members.through)
+@receiver(m2m_changed, sender=Project.supervisors.through)
+def project_people_changed(sender, instance, action, reverse, pk_set,
+                           **kwargs):
+    """Make the cached fragments of the projects whose people changed stale"""
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+
+    if not reverse:
+        project_ids = [instance.pk]
+    elif action == 'pre_clear':
+        project_ids = list(
+            sender.objects
+            .filter(member_id=instance.pk)
+            .values_list('project_id', flat=True)
+        )
+    else:
+        project_ids = pk_set
+
+    bump_versions(Project, project_ids)
+    touch(Project, project_ids)
+
+
+@receiver(post_save, sender=Member)
+def member_saved(sender, instance, created, update_fields, **kwargs):
+    """Make the cached fragments of the projects listing the member stale"""
+    if created or (update_fields is not None and 'name' not in update_fields):
+        return
+
+    project_ids = Project.members.through.objects \
+        .filter(member_id=instance.pk) \
+        .values_list('project_id', flat=True) \
+        .union(
+            Project.supervisors.through.objects
+            .filter(member_id=instance.pk)
+            .values_list('project_id', flat=True)
+        )
+
+    project_ids = list(project_ids)
+    bump_versions(Project, project_ids)
+    touch(Project, project_ids)
@@ -12,6 +12,11 @@ def project_detail_url(project):
     return reverse('projects:detail', args=[project.id])
 
 
+@pytest.fixture
+def project_metrics_url(project):
+    return reverse('projects:metrics', args=[project.id])
+
+
 @pytest.fixture
 def project_create_url():
     return reverse('projects:create')
@@ -41,6 +46,7 @@ def project_change_status_url(project):
 def project_url_names_to_fixtures(
     project_list_url,
     project_detail_url,
+    project_metrics_url,
     project_create_url,
     project_update_url,
     project_add_member_url,
@@ -50,6 +56,7 @@ def project_url_names_to_fixtures(
     return {
         'project_list_url': project_list_url,
         'project_detail_url': project_detail_url,
+        'project_metrics_url': project_metrics_url,
         'project_create_url': project_create_url,
         'project_update_url': project_update_url,
         'project_add_member_url': project_add_member_url,
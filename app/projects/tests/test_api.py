@@ -0,0 +1,62 @@
+import pytest
+from mixer.backend.django import mixer
+
+from django.urls import reverse
+
+from projects.models import Project
+
+
+@pytest.fixture
+def project_api_detail_url(project):
+    return reverse('api:project-detail', args=[project.id])
+
+
+def test_project_api_visibility(
+    client, project, project_member, member, superuser
+):
+    """Test members only see the projects they are part of"""
+    other = mixer.blend(Project)
+    url = reverse('api:project-list')
+
+    client.force_login(project_member)
+    res = client.get(url)
+    assert [row['id'] for row in res.json()['results']] == [project.id]
+
+    client.force_login(member)
+    res = client.get(url)
+    assert res.json()['results'] == []
+
+    client.force_login(superuser)
+    res = client.get(url)
+    assert {row['id'] for row in res.json()['results']} == \
+        {project.id, other.id}
+
+
+def test_project_api_detail(
+    client, project, project_member, supervisor, member,
+    project_api_detail_url
+):
+    """Test the project fields list the ids of its members"""
+    client.force_login(project_member)
+    res = client.get(project_api_detail_url)
+
+    assert res.status_code == 200
+    data = res.json()
+    assert data['id'] == project.id
+    assert data['members'] == sorted([project_member.id, supervisor.id])
+    assert data['supervisors'] == [supervisor.id]
+
+    client.force_login(member)
+    res = client.get(project_api_detail_url)
+    assert res.status_code == 404
+
+
+def test_project_api_status_filter(superuser_client, project):
+    """Test the projects can be filtered by status"""
+    url = reverse('api:project-list')
+
+    res = superuser_client.get(url, {'status': 'CLOSED'})
+    assert res.json()['results'] == []
+
+    res = superuser_client.get(url, {'status': 'ON-GOING'})
+    assert [row['id'] for row in res.json()['results']] == [project.id]
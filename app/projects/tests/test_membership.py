@@ -0,0 +1,85 @@
+import pytest
+from mixer.backend.django import mixer
+
+from django.core.cache import cache
+
+from bugs.models import Bug
+from projects.membership import \
+    InvalidMemberError, \
+    NotProjectMemberError, \
+    add_project_members, \
+    add_project_supervisors, \
+    assign_bug_members
+from projects.roles import get_role_map
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+
+
+@pytest.fixture
+def bug(project, project_member):
+    return mixer.blend(Bug, project=project, creator=project_member)
+
+
+@pytest.mark.parametrize('count', [1, 10, 50])
+def test_add_project_members_constant_queries(
+    django_user_model, django_assert_num_queries, project, count
+):
+    """Test adding members costs the same queries for any number of ids"""
+    members = mixer.cycle(count).blend(django_user_model)
+    member_ids = [m.id for m in members]
+
+    # Validation, existing rows, insert and the project modification time,
+    # plus the savepoint queries
+    with django_assert_num_queries(6):
+        added = add_project_members(project, member_ids)
+
+    assert added == set(member_ids)
+    assert set(member_ids) <= set(project.members.values_list('id', flat=True))
+
+
+def test_add_project_members_skips_existing(project, project_member, member):
+    """Test members already in the project are left untouched"""
+    added = add_project_members(project, [project_member.id, str(member.id)])
+
+    assert added == {member.id}
+    assert project.members.filter(id=project_member.id).count() == 1
+
+
+def test_add_project_supervisors_requires_members(project, member):
+    """Test no supervisor is added if any member is not in the project"""
+    with pytest.raises(NotProjectMemberError):
+        add_project_supervisors(project, [member.id])
+
+    add_project_members(project, [member.id])
+    assert add_project_supervisors(project, [member.id]) == {member.id}
+
+
+def test_assign_bug_members_is_all_or_nothing(
+    bug, project_member, supervisor, member
+):
+    """Test a single invalid id prevents every assignment"""
+    with pytest.raises(InvalidMemberError):
+        assign_bug_members(bug, [project_member.id, 98765])
+
+    with pytest.raises(NotProjectMemberError):
+        assign_bug_members(bug, [project_member.id, member.id])
+
+    assert not bug.assigned_members.exists()
+
+    assign_bug_members(bug, [project_member.id, supervisor.id])
+    assert set(bug.assigned_members.all()) == {project_member, supervisor}
+
+
+def test_bulk_add_invalidates_role_maps(django_user_model, project, member):
+    """Test the cached role maps follow the bulk inserted memberships"""
+    assert get_role_map(member).member_of == set()
+
+    add_project_members(project, [member.id])
+    add_project_supervisors(project, [member.id])
+    member = django_user_model.objects.get(pk=member.pk)
+
+    assert get_role_map(member).member_of == {project.id}
+    assert get_role_map(member).supervisor_of == {project.id}
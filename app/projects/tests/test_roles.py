@@ -0,0 +1,100 @@
+import pytest
+from mixer.backend.django import mixer
+
+from django.core.cache import cache
+from django.core.management import call_command
+
+from core import checks
+from projects.models import Project
+from projects.roles import get_role_map, role_map_stats
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+
+
+def fresh(member):
+    """Return a new instance of the member, without the memoized role map"""
+    return type(member).objects.get(pk=member.pk)
+
+
+def test_role_map_contents(project, project_member, supervisor, member):
+    """Test the role map holds the member and supervised project ids"""
+    other = mixer.blend(Project)
+    other.members.add(project_member)
+
+    assert get_role_map(project_member).member_of == {project.id, other.id}
+    assert get_role_map(project_member).supervisor_of == set()
+    assert get_role_map(supervisor).member_of == {project.id}
+    assert get_role_map(supervisor).supervisor_of == {project.id}
+    assert get_role_map(member).member_of == set()
+
+
+def test_role_map_cached(project, project_member, django_assert_num_queries):
+    """Test the role map is read from the cache after the first load"""
+    first, second = fresh(project_member), fresh(project_member)
+
+    with django_assert_num_queries(1):
+        get_role_map(first)
+
+    with django_assert_num_queries(0):
+        role_map = get_role_map(second)
+
+    assert role_map.member_of == {project.id}
+    assert role_map_stats() == {'hits': 1, 'misses': 1, 'hit_ratio': 0.5}
+
+
+def test_role_map_invalidated_on_change(project, project_member, member):
+    """Test membership changes on both sides of the relation invalidate"""
+    get_role_map(fresh(member))
+
+    project.members.add(member)
+    assert get_role_map(fresh(member)).member_of == {project.id}
+
+    project.supervisors.add(member)
+    assert get_role_map(fresh(member)).supervisor_of == {project.id}
+
+    member.supervised_projects.remove(project)
+    assert get_role_map(fresh(member)).supervisor_of == set()
+
+    project.members.clear()
+    assert get_role_map(fresh(member)).member_of == set()
+    assert get_role_map(fresh(project_member)).member_of == set()
+
+
+def test_role_map_invalidated_on_project_delete(project, supervisor):
+    """Test deleting a project invalidates the role maps of its members"""
+    get_role_map(fresh(supervisor))
+
+    project.delete()
+
+    assert get_role_map(fresh(supervisor)) == (set(), set())
+
+
+def test_role_cache_stats_command(project, project_member, capsys):
+    """Test the role cache stats command shows the counters"""
+    get_role_map(fresh(project_member))
+    get_role_map(fresh(project_member))
+
+    call_command('role_cache_stats')
+
+    out = capsys.readouterr().out
+    assert 'Hits: 1' in out
+    assert 'Misses: 1' in out
+    assert 'Hit ratio: 50.0%' in out
+
+
+def test_local_cache_with_workers_check(settings):
+    """Test role maps cached in the memory of several workers fail checks"""
+    settings.GUNICORN_WORKERS = 1
+    assert checks.check_shared_cache(None) == []
+
+    settings.GUNICORN_WORKERS = 3
+    assert [e.id for e in checks.check_shared_cache(None)] == ['core.E001']
+
+    settings.CACHES = dict(settings.CACHES, default={
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'cache',
+    })
+    assert checks.check_shared_cache(None) == []
@@ -4,15 +4,21 @@ from pytest_django.asserts import \
 from mixer.backend.django import mixer
 import datetime
 
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
 
 from projects.models import Project
+from bugs.models import Bug, DailyBugStats
 
 
 # ----------- Permission Tests -----------
 @pytest.mark.parametrize('method,url_name', [
     ('get', 'project_list_url'),
     ('get', 'project_detail_url'),
+    ('get', 'project_metrics_url'),
     ('get', 'project_create_url'),
     ('get', 'project_update_url'),
     ('post', 'project_create_url'),
@@ -34,6 +40,7 @@ def test_project_views_unauthenticated_permissions(
 @pytest.mark.parametrize('method,url_name', [
     ('get', 'project_list_url'),
     ('get', 'project_detail_url'),
+    ('get', 'project_metrics_url'),
     ('get', 'project_create_url'),
     ('get', 'project_update_url'),
     ('post', 'project_create_url'),
@@ -55,6 +62,7 @@ def test_project_views_superuser_permissions(
 @pytest.mark.parametrize('method,url_name', [
     ('get', 'project_list_url'),
     ('get', 'project_detail_url'),
+    ('get', 'project_metrics_url'),
     ('get', 'project_create_url'),
     ('get', 'project_update_url'),
     ('post', 'project_create_url'),
@@ -77,6 +85,7 @@ def test_project_views_supervisor_permissions(
 @pytest.mark.parametrize('method,url_name,should_succed', [
     ('get', 'project_list_url', True),
     ('get', 'project_detail_url', True),
+    ('get', 'project_metrics_url', True),
     ('get', 'project_create_url', True),
     ('get', 'project_update_url', False),
     ('post', 'project_create_url', True),
@@ -107,6 +116,7 @@ def test_project_views_project_member_permissions(
 @pytest.mark.parametrize('method,url_name,should_succed', [
     ('get', 'project_list_url', True),
     ('get', 'project_detail_url', False),
+    ('get', 'project_metrics_url', False),
     ('get', 'project_create_url', True),
     ('get', 'project_update_url', False),
     ('post', 'project_create_url', True),
@@ -137,6 +147,7 @@ def test_project_views_non_project_member_permissions(
 @pytest.mark.parametrize('url_name,allowed_methods', [
     ('project_list_url', ['GET']),
     ('project_detail_url', ['GET']),
+    ('project_metrics_url', ['GET']),
     ('project_create_url', ['GET', 'POST', 'PUT']),
     ('project_update_url', ['GET', 'POST', 'PUT']),
     ('project_add_member_url', ['POST']),
@@ -274,7 +285,115 @@ def test_project_detail_supervisor_buttons(
     assertNotContains(res, project_add_supervisor_url)
 
 
+def test_project_detail_bug_rows_constant_queries(
+    supervisor_client, supervisor, project, project_detail_url
+):
+    """Test the project bug rows do not query the database per row"""
+    def count_queries():
+        with CaptureQueriesContext(connection) as queries:
+            res = supervisor_client.get(project_detail_url)
+        assert res.status_code == 200
+        return len(queries)
+
+    def blend_bugs(count):
+        return mixer.cycle(count).blend(
+            Bug, project=project, creator=supervisor, _status='WAITING'
+        )
+
+    for bug in blend_bugs(1):
+        bug.assigned_members.add(supervisor)
+    blend_bugs(1)
+    supervisor_client.get(project_detail_url)
+    num_queries = count_queries()
+
+    for bug in blend_bugs(5):
+        bug.assigned_members.add(supervisor)
+    blend_bugs(5)
+
+    res = supervisor_client.get(project_detail_url)
+    assert len(res.context['user_bugs']) == 6
+    assert len(res.context['other_bugs']) == 6
+    assert count_queries() == num_queries
+
+
+# ----------- Metrics View Tests -----------
+def test_project_metrics_view_reads_rollups(
+    supervisor_client, project, project_metrics_url
+):
+    """Test the project metrics add up the daily rollups of the project"""
+    today = timezone.localdate()
+    yesterday = today - datetime.timedelta(days=1)
+    for day, status, stats in [
+        (today - datetime.timedelta(days=40), 'WAITING', {'entered': 3}),
+        (yesterday, 'WAITING', {'entered': 2, 'created': 2, 'left': 1}),
+        (yesterday, 'FIXED', {
+            'entered': 1, 'closed': 1,
+            'time_to_close': datetime.timedelta(hours=6),
+        }),
+        (today, 'CLOSED', {'entered': 0}),
+    ]:
+        DailyBugStats.objects.create(
+            project=project, day=day, status=status, **stats
+        )
+    DailyBugStats.objects.create(
+        project=mixer.blend(Project), day=today, status='WAITING', entered=5
+    )
+
+    with CaptureQueriesContext(connection) as queries:
+        res = supervisor_client.get(project_metrics_url)
+    assert res.status_code == 200
+    assertTemplateUsed(res, 'projects/metrics.html')
+    assert not [
+        query for query in queries
+        if 'bugs_bug' in query['sql'] or 'statustransition' in query['sql']
+    ]
+
+    days = res.context['days']
+    assert len(days) == 30
+    assert [
+        (d['day'], d['created'], d['closed'], d['mean_hours_to_close'],
+         d['open_bugs'], d['closed_bugs'])
+        for d in days[:3]
+    ] == [
+        (today, 0, 0, None, 4, 1),
+        (yesterday, 2, 1, 6, 4, 1),
+        (yesterday - datetime.timedelta(days=1), 0, 0, None, 3, 0),
+    ]
+    assert len(res.context['bugs_chart']) == 30
+
+    res = supervisor_client.get(project_metrics_url + '?days=90')
+    assert len(res.context['days']) == 90
+    res = supervisor_client.get(project_metrics_url + '?days=7')
+    assert len(res.context['days']) == 30
+
+
 # ----------- Create View Tests -----------
+def test_project_detail_not_modified(
+    supervisor_client, supervisor, project, project_detail_url
+):
+    """Test an unchanged project page is not sent again"""
+    supervisor_client.get(project_detail_url)
+    etag = supervisor_client.get(project_detail_url)['ETag']
+
+    res = supervisor_client.get(project_detail_url, HTTP_IF_NONE_MATCH=etag)
+    assert res.status_code == 304
+
+    bug = mixer.blend(Bug, project=project, creator=supervisor)
+    res = supervisor_client.get(project_detail_url, HTTP_IF_NONE_MATCH=etag)
+    assert res.status_code == 200
+    etag = res['ETag']
+
+    bug.set_status('BEING WORKED')
+    bug.save()
+    res = supervisor_client.get(project_detail_url, HTTP_IF_NONE_MATCH=etag)
+    assert res.status_code == 200
+    etag = res['ETag']
+
+    project.members.add(mixer.blend(get_user_model()))
+    res = supervisor_client.get(project_detail_url, HTTP_IF_NONE_MATCH=etag)
+    assert res.status_code == 200
+
+
 def test_project_create_view_GET(member_client, project_create_url):
     """Test successfully GETting project create view with form"""
     res = member_client.get(project_create_url)
@@ -373,6 +492,27 @@ def test_project_update_view_GET(
     assertContains(res, project_change_status_url)
 
 
+def test_project_update_view_renders_only_chosen_members(
+    django_user_model, supervisor_client, project, project_member, member,
+    project_update_url, project_detail_url
+):
+    """Test the member selects leave the other members to the search"""
+    member.name = 'Not In Project'
+    member.save()
+    mixer.cycle(3).blend(django_user_model, name='Outsider')
+
+    res = supervisor_client.get(project_update_url)
+    assertContains(res, 'data-member-search')
+    assertContains(res, 'value="%d"' % project_member.id)
+    assertContains(res, 'Only members already saved in the project')
+    assertNotContains(res, 'Not In Project')
+    assertNotContains(res, 'Outsider')
+
+    res = supervisor_client.get(project_detail_url)
+    assertContains(res, reverse('members:search'))
+    assertNotContains(res, 'Not In Project')
+
+
 def test_project_update_view_POST_successful(
     django_user_model,
     supervisor_client,
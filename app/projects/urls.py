@@ -8,6 +8,9 @@ app_name = 'projects'
 urlpatterns = [
     path('', views.ProjectListView.as_view(), name='list'),
     path('<int:pk>', views.ProjectDetailView.as_view(), name='detail'),
+    path(
+        '<int:pk>/metrics', views.ProjectMetricsView.as_view(), name='metrics'
+    ),
     path('create', views.ProjectCreateView.as_view(), name='create'),
     path('<int:pk>/edit', views.ProjectUpdateView.as_view(), name='update'),
     path(
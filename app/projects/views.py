@@ -1,8 +1,10 @@
-from django.shortcuts import get_object_or_404, redirect
+from datetime import timedelta
+
+from django.shortcuts import redirect
 from django.core.exceptions import SuspiciousOperation
 from django.urls import reverse_lazy
 from django.contrib.auth import get_user_model
-from django.db.models import Q
+from django.db.models import F, Q
 from django.utils import timezone
 
 from django.views import View
@@ -13,7 +15,11 @@ from django.contrib.auth.mixins import LoginRequiredMixin
 
 from .models import Project
 from .forms import ProjectCreateForm, ProjectUpdateForm
-from core.mixins import IsInProjectMixin, IsSupervisorMixin
+from .membership import \
+    NotProjectMemberError, add_project_members, add_project_supervisors
+from bugs.rollups import project_metrics
+from core.mixins import \
+    ConditionalGetMixin, IsInProjectMixin, IsSupervisorMixin
 
 
 class ProjectListView(LoginRequiredMixin, ListView):
@@ -32,33 +38,103 @@ class ProjectListView(LoginRequiredMixin, ListView):
         return queryset.order_by('-creationDate')
 
 
-class ProjectDetailView(IsInProjectMixin, DetailView):
+class ProjectDetailView(ConditionalGetMixin, IsInProjectMixin, DetailView):
     """View for displaying project details"""
     model = Project
     template_name = 'projects/detail.html'
     context_object_name = 'project'
 
+    def get_modified_state(self):
+        """Return the modification time of the project"""
+        return self.model.objects.filter(pk=self.kwargs['pk']) \
+            .values('modified_at', project_id=F('id')) \
+            .first()
+
     def get_context_data(self, **kwargs):
         """Add additional data to the context"""
         context = super().get_context_data(**kwargs)
 
-        context['user_bugs'] = self.object.active_bugs.filter(
-            assigned_members__id__contains=self.request.user.id
-        )
-        context['other_bugs'] = self.object.active_bugs.exclude(
-            assigned_members__id__contains=self.request.user.id
-        )
+        active_bugs = self.object.active_bugs.for_viewer(self.request.user)
+        context['user_bugs'] = active_bugs.filter(is_assigned_to_viewer=True)
+        context['other_bugs'] = active_bugs.filter(is_assigned_to_viewer=False)
 
         context['isAdminOrSupervisor'] = (
             self.request.user.is_superuser or
-            self.request.user in self.object.supervisors.all()
+            self.object.is_project_supervisor
         )
 
         context['status_class'] = self.object.STATUS_CLASSES[
             self.object.status
         ]
 
-        context['all_members'] = get_user_model().objects.all()
+        return context
+
+
+def bar_chart(*series):
+    """Return the bars of each day stacking the series, scaled to 100 high
+
+    Each bar is the day index followed by the top and height of each
+    series, bottom first. Missing values count as zero.
+    """
+    totals = [sum(values) for values in zip(*(
+        [value or 0 for value in values] for values in series
+    ))]
+    top = max(totals, default=0) or 1
+
+    bars = []
+    for x, values in enumerate(zip(*series)):
+        bar, y = [x], 100
+        for value in values:
+            height = 100 * (value or 0) / top
+            y -= height
+            bar.extend([y, height])
+        bars.append(bar)
+    return bars
+
+
+class ProjectMetricsView(IsInProjectMixin, DetailView):
+    """View charting the daily bug metrics of a project
+
+    Only the daily rollups of the project are read, written by the
+    rollup_bug_stats command, so today shows the changes up to its last run.
+    """
+    model = Project
+    template_name = 'projects/metrics.html'
+    context_object_name = 'project'
+    period_choices = (30, 90, 365)
+
+    def get_context_data(self, **kwargs):
+        """Add the metrics of the days of the period and their charts"""
+        context = super().get_context_data(**kwargs)
+
+        period = self.request.GET.get('days', '')
+        period = int(period) if period.isdigit() else 0
+        if period not in self.period_choices:
+            period = self.period_choices[0]
+        end = timezone.localdate()
+        days = project_metrics(
+            self.object, end - timedelta(days=period - 1), end
+        )
+
+        for day in days:
+            mean = day['mean_time_to_close']
+            day['mean_hours_to_close'] = \
+                None if mean is None else mean / timedelta(hours=1)
+
+        context.update({
+            'period': period,
+            'period_choices': self.period_choices,
+            'days': days[::-1],
+            'chart_width': len(days),
+            'bugs_chart': bar_chart(
+                [day['open_bugs'] for day in days],
+                [day['closed_bugs'] for day in days],
+            ),
+            'created_chart': bar_chart([day['created'] for day in days]),
+            'close_time_chart': bar_chart(
+                [day['mean_hours_to_close'] for day in days]
+            ),
+        })
 
         return context
 
@@ -124,20 +200,15 @@ class ProjectAddMemberView(IsSupervisorMixin, View):
     model = Project
 
     def post(self, request, pk):
-        project = get_object_or_404(Project, pk=pk)
+        project = self.get_object()
         member_ids = request.POST.getlist('member_ids')
-        MemberModel = get_user_model()
 
         if not member_ids:
             raise SuspiciousOperation('member_ids must be passed!')
 
         try:
-            member_ids = [int(m_id) for m_id in member_ids]
-
-            for member_id in member_ids:
-                member = MemberModel.objects.get(id=member_id)
-                project.members.add(member)
-        except (MemberModel.DoesNotExist, ValueError):
+            add_project_members(project, member_ids)
+        except ValueError:
             raise SuspiciousOperation('Invalid member id!')
 
         return redirect('projects:detail', pk=pk)
@@ -148,25 +219,19 @@ class ProjectAddSupervisorView(IsSupervisorMixin, View):
     model = Project
 
     def post(self, request, pk):
-        project = get_object_or_404(Project, pk=pk)
+        project = self.get_object()
         supervisor_ids = request.POST.getlist('supervisor_ids')
-        MemberModel = get_user_model()
 
         if not supervisor_ids:
             raise SuspiciousOperation('supervisors_ids must be passed!')
 
         try:
-            supervisor_ids = [int(m_id) for m_id in supervisor_ids]
-
-            for supervisor_id in supervisor_ids:
-                member = MemberModel.objects.get(id=supervisor_id)
-                if member not in project.members.all():
-                    raise SuspiciousOperation(
-                        'Member must be in the project to be assigned \
-                        supervisor!'
-                    )
-                project.supervisors.add(member)
-        except (MemberModel.DoesNotExist, ValueError):
+            add_project_supervisors(project, supervisor_ids)
+        except NotProjectMemberError:
+            raise SuspiciousOperation(
+                'Member must be in the project to be assigned supervisor!'
+            )
+        except ValueError:
             raise SuspiciousOperation('Invalid member id!')
 
         return redirect('projects:detail', pk=pk)
@@ -177,7 +242,7 @@ class ProjectChangeStatusView(IsSupervisorMixin, View):
     model = Project
 
     def post(self, request, pk):
-        project = get_object_or_404(Project, pk=pk)
+        project = self.get_object()
         status = request.POST.get('status')
 
         if not status:
@@ -4,8 +4,16 @@ set -e
 
 if [ ! -f /files/is_initialized ]; then
 	python manage.py migrate --noinput
-	python manage.py collectstatic --noinput
 	touch /files/is_initialized
 fi
 
-gunicorn app.wsgi -b 0.0.0.0:8000
\ No newline at end of file
+# The fingerprinted names change with the code, collect them on every start
+python manage.py build_static
+
+# The server settings are in gunicorn.conf.py, SERVER_MODE=asgi also serves
+# the bug and project event streams
+if [ "$SERVER_MODE" = "asgi" ]; then
+	exec gunicorn app.asgi:application
+else
+	exec gunicorn app.wsgi
+fi
\ No newline at end of file